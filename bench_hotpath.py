@@ -0,0 +1,264 @@
+"""
+Micro-benchmark jalur request di HttpServer (tanpa socket).
+
+Setiap kasus memanggil proses / proses_request / http_get / http_post /
+response langsung dengan payload persis seperti yang dikirim ClientInterface
+(join, set state JSON dan biner, ambil state, ambil ID, world_state) pada
+server dengan --players pemain. Untuk setiap kasus dilaporkan:
+
+    ops/s       panggilan per detik (terbaik dari --repeat putaran)
+    peak_bytes  memori sementara terbesar dalam satu panggilan (tracemalloc)
+    blocks      blok memori yang tertinggal per panggilan (harus ~0)
+
+Hasil bisa disimpan sebagai baseline lalu dibandingkan setelah perubahan;
+--compare keluar dengan kode 1 jika ada kasus yang lebih lambat atau lebih
+boros dari --threshold, sehingga bisa dipakai sebelum deploy.
+
+    python3 bench_hotpath.py --save baseline.json
+    python3 bench_hotpath.py --compare baseline.json --threshold 0.1
+    python3 bench_hotpath.py --cases set_state_json world_state_binary
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import http as game_http
+import wire_protocol
+
+# lebih besar dari room.WORLD_HISTORY_SIZE
+WARMUP = 2000
+
+# state seperti Player.get_state_dict()
+STATE = {'position': [312, 188], 'health': 5, 'facing_right': False, 'is_attacking': True,
+	'is_hit': False, 'shield_active': False, 'attacker_id': None}
+
+
+def client_request(method, target, headers=None, body=b''):
+	"""Request mentah seperti ClientInterface.send_request (termasuk trailer \\r\\n\\r\\n)."""
+	head = "{} {} HTTP/1.1\r\n".format(method, target)
+	for name, value in (headers or {}).items():
+		head += "{}: {}\r\n".format(name, value)
+	if body:
+		head += "Content-Length: {}\r\n".format(len(body))
+	return head.encode() + b"\r\n" + body + b"\r\n\r\n"
+
+
+def parsed(request):
+	"""(method, target, headers, body) untuk proses_request, seperti hasil http_parser."""
+	head, _, body = request.partition(b"\r\n\r\n")
+	lines = head.decode().split("\r\n")
+	method, target, _ = lines[0].split(" ")
+	headers = {}
+	for line in lines[1:]:
+		key, _, value = line.partition(':')
+		headers[key.strip().lower()] = value.strip()
+	return method, target, headers, body[:int(headers.get('content-length', 0))]
+
+
+class Cases:
+	"""Kasus benchmark; setiap method case_* mengembalikan callable tanpa argumen."""
+
+	def __init__(self, players):
+		self.server = game_http.HttpServer()
+		self.room = self.server.default_room
+		self.players = players
+		for player_id in range(1, players + 1):
+			self.room.join(player_id)
+		self.tick = 0
+
+	def churn(self):
+		# satu pemain bergerak sebelum setiap GET, seperti 60 Hz di game sungguhan
+		self.tick += 1
+		player_id = self.tick % self.players + 1
+		self.room.update_player_state(player_id, dict(STATE, position=[self.tick % 600, 188]))
+
+	def case_join_leave(self):
+		server = self.server
+		player_id = self.players + 1
+		join = client_request('POST', '/join_game', body=json.dumps({'player_id': player_id}).encode())[:-4].decode('latin-1')
+		leave = client_request('POST', '/leave_game', body=json.dumps({'player_id': player_id}).encode())[:-4].decode('latin-1')
+		def run():
+			server.proses(join)
+			server.proses(leave)
+		return run
+
+	def set_state_bodies(self):
+		# dua posisi bergantian supaya setiap panggilan benar-benar mengubah state
+		return [json.dumps({'id': 1, 'state': dict(STATE, position=[x, 188]), 'view_version': 1}).encode() for x in (312, 316)]
+
+	def case_set_state_legacy(self):
+		# jalur lama menerima str tanpa trailer \r\n\r\n
+		requests = itertools.cycle([client_request('POST', '/set_player_state', body=body)[:-4].decode('latin-1')
+			for body in self.set_state_bodies()])
+		return lambda: self.server.proses(next(requests))
+
+	def case_set_state_json(self):
+		requests = itertools.cycle([parsed(client_request('POST', '/set_player_state', body=body))
+			for body in self.set_state_bodies()])
+		return lambda: self.server.proses_request(*next(requests))
+
+	def case_set_state_binary(self):
+		requests = itertools.cycle([parsed(client_request('POST', '/set_player_state', {'Content-Type': wire_protocol.CONTENT_TYPE},
+			wire_protocol.encode_state(1, dict(STATE, position=[x, 188])) + wire_protocol.VIEW_VERSION.pack(1)))
+			for x in (312, 316)])
+		return lambda: self.server.proses_request(*next(requests))
+
+	def case_http_post_set_state(self):
+		bodies = itertools.cycle(self.set_state_bodies())
+		return lambda: self.server.http_post('/set_player_state', {}, next(bodies))
+
+	def case_sync_json(self):
+		# state masuk dan delta dunia keluar dalam satu request, since = versi sebelumnya
+		bodies = itertools.cycle([dict(STATE, position=[x, 188]) for x in (312, 316)])
+		def run():
+			body = json.dumps({'id': 1, 'since': self.room.world_version, 'state': next(bodies)}).encode()
+			self.server.http_post('/sync', {}, body)
+		return run
+
+	def case_sync_binary(self):
+		headers = {'content-type': wire_protocol.CONTENT_TYPE, 'accept': wire_protocol.CONTENT_TYPE}
+		states = itertools.cycle([dict(STATE, position=[x, 188]) for x in (312, 316)])
+		def run():
+			self.server.http_post('/sync', headers, wire_protocol.encode_sync_state(self.room.world_version, 1, next(states)))
+		return run
+
+	def case_get_player_ids(self):
+		def run():
+			self.churn()
+			self.server.http_get('/get_player_ids', {})
+		return run
+
+	def case_get_player_state(self):
+		return lambda: self.server.http_get('/get_player_state?id=1', {})
+
+	def case_world_state_json(self):
+		def run():
+			self.churn()
+			self.server.http_get('/world_state', {})
+		return run
+
+	def case_world_state_binary(self):
+		headers = {'accept': wire_protocol.CONTENT_TYPE}
+		def run():
+			self.churn()
+			self.server.http_get('/world_state?since={}'.format(self.room.world_version - 1), headers)
+		return run
+
+	def case_world_state_cached(self):
+		# banyak client meminta versi yang sama: cache response
+		return lambda: self.server.http_get('/world_state', {})
+
+	def case_response(self):
+		body = json.dumps({'status': 'OK'})
+		return lambda: self.server.response(200, 'OK', body, {'Content-Type': 'application/json'})
+
+
+CASES = [name[len('case_'):] for name in dir(Cases) if name.startswith('case_')]
+
+
+def measure_rate(func, seconds, repeat):
+	"""Panggilan per detik terbaik dari beberapa putaran."""
+	best = 0.0
+	for _ in range(repeat):
+		count = 0
+		batch = 64
+		started = time.perf_counter()
+		deadline = started + seconds
+		while True:
+			for _ in range(batch):
+				func()
+			count += batch
+			now = time.perf_counter()
+			if now >= deadline:
+				break
+		best = max(best, count / (now - started))
+	return best
+
+
+def measure_memory(func, calls=200):
+	"""(median byte puncak per panggilan, blok tertinggal per panggilan)."""
+	# isi dulu history dan cache room sampai batasnya, supaya yang tersisa memang bocor
+	for _ in range(WARMUP):
+		func()
+	tracemalloc.start()
+	try:
+		peaks = []
+		for _ in range(calls):
+			current, _ = tracemalloc.get_traced_memory()
+			tracemalloc.reset_peak()
+			func()
+			_, peak = tracemalloc.get_traced_memory()
+			peaks.append(peak - current)
+	finally:
+		tracemalloc.stop()
+	blocks_before = sys.getallocatedblocks()
+	for _ in range(calls):
+		func()
+	blocks = (sys.getallocatedblocks() - blocks_before) / calls
+	return statistics.median(peaks), blocks
+
+
+def run(names, players, seconds, repeat):
+	results = {}
+	for name in names:
+		cases = Cases(players)
+		func = getattr(cases, 'case_' + name)()
+		# join mencetak ke stdout seperti di server sungguhan, jangan ikut ditampilkan
+		with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+			peak_bytes, blocks = measure_memory(func)
+			ops = measure_rate(func, seconds, repeat)
+		results[name] = {'ops': ops, 'peak_bytes': peak_bytes, 'blocks': blocks}
+		print("{:<22} {:>10.0f} ops/s  {:>8.0f} peak_bytes  {:>6.2f} blocks".format(name, ops, peak_bytes, blocks))
+	return results
+
+
+def compare(results, baseline, threshold):
+	"""Cetak perbandingan dengan baseline, return daftar kasus yang regresi."""
+	regressions = []
+	print("\nvs baseline ({}):".format(baseline.get('python', '?')))
+	for name, result in results.items():
+		base = baseline['results'].get(name)
+		if base is None:
+			print("{:<22} (tidak ada di baseline)".format(name))
+			continue
+		speed = result['ops'] / base['ops'] - 1 if base['ops'] else 0.0
+		memory = result['peak_bytes'] / base['peak_bytes'] - 1 if base['peak_bytes'] else 0.0
+		slower = speed < -threshold
+		bigger = memory > threshold
+		flag = "REGRESSION" if slower or bigger else ""
+		print("{:<22} ops {:>+7.1%}  peak_bytes {:>+7.1%}  {}".format(name, speed, memory, flag))
+		if flag:
+			regressions.append(name)
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--cases', nargs='+', default=CASES, choices=CASES)
+	parser.add_argument('--players', type=int, default=8, help="jumlah pemain di room saat benchmark")
+	parser.add_argument('--time', type=float, default=1.0, help="lama satu putaran per kasus (detik)")
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('--save', help="simpan hasil sebagai baseline JSON")
+	parser.add_argument('--compare', help="bandingkan dengan baseline JSON")
+	parser.add_argument('--threshold', type=float, default=0.1, help="batas regresi relatif (0.1 = 10%%)")
+	args = parser.parse_args()
+
+	results = run(args.cases, args.players, args.time, args.repeat)
+	if args.save:
+		with open(args.save, 'w') as f:
+			json.dump({'python': platform.python_version(), 'players': args.players, 'results': results}, f, indent=2)
+	if args.compare:
+		with open(args.compare) as f:
+			baseline = json.load(f)
+		if compare(results, baseline, args.threshold):
+			sys.exit(1)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,137 @@
+r"""
+Fuzz dan benchmark http_parser.RequestParser vs jalur lama (str + HttpServer.proses).
+
+    python3 bench_http_parser.py --fuzz 2000 --requests 20000
+
+Fuzz: request acak (GET/POST, body JSON/biner, trailer \r\n\r\n dari ClientInterface)
+digabung lalu dipotong di posisi acak, hasil parse harus sama dengan aslinya.
+Sampah acak hanya boleh menghasilkan ParseError.
+
+Throughput: framing + parsing + dispatch ke HttpServer untuk aliran request yang sama.
+"""
+import argparse
+import json
+import random
+import time
+
+import http as game_http
+import http_parser
+import wire_protocol
+
+
+def make_request(rng):
+	kind = rng.randrange(4)
+	if kind == 0:
+		return ('GET', '/get_player_ids', {}, b'')
+	if kind == 1:
+		return ('GET', '/world_state?since={}'.format(rng.randrange(100)), {'accept': wire_protocol.CONTENT_TYPE}, b'')
+	state = {'position': [rng.randrange(600), rng.randrange(600)], 'health': rng.randrange(7),
+		'facing_right': rng.random() < 0.5, 'is_attacking': False, 'is_hit': False}
+	if kind == 2:
+		body = json.dumps({'id': rng.randrange(1, 5), 'state': state}).encode()
+		return ('POST', '/set_player_state', {'content-length': str(len(body))}, body)
+	body = wire_protocol.encode_state(rng.randrange(1, 5), state)
+	return ('POST', '/set_player_state', {'content-type': wire_protocol.CONTENT_TYPE, 'content-length': str(len(body))}, body)
+
+
+def serialize(request):
+	method, target, headers, body = request
+	head = "{} {} HTTP/1.1\r\n".format(method, target)
+	for name, value in headers.items():
+		head += "{}: {}\r\n".format(name, value)
+	# sama seperti ClientInterface.send_request: request + \r\n\r\n
+	return head.encode() + b"\r\n" + body + b"\r\n\r\n"
+
+
+def split_randomly(rng, data):
+	chunks = []
+	offset = 0
+	while offset < len(data):
+		size = rng.choice([1, 2, 3, 7, 64, 1024, 4096])
+		chunks.append(data[offset:offset + size])
+		offset += size
+	return chunks
+
+
+def fuzz(iterations, seed):
+	rng = random.Random(seed)
+	for i in range(iterations):
+		expected = [make_request(rng) for _ in range(rng.randrange(1, 8))]
+		stream = b''.join(serialize(r) for r in expected)
+		parser = http_parser.RequestParser()
+		parsed = []
+		for chunk in split_randomly(rng, stream):
+			parsed.extend(parser.feed(chunk))
+		got = [(r.method, r.target, r.headers, r.body) for r in parsed]
+		if got != expected:
+			raise AssertionError("mismatch on iteration {}:\n{}\n{}".format(i, expected, got))
+
+		garbage = bytes(rng.randrange(256) for _ in range(rng.randrange(1, 200)))
+		try:
+			http_parser.RequestParser(max_header_size=1024).feed(garbage)
+		except http_parser.ParseError:
+			pass
+	print("fuzz: {} iterations OK".format(iterations))
+
+
+def legacy_path(httpserver, chunks):
+	"""Salinan loop lama ProcessTheClient.run (decode tiap chunk, string concat, split ulang)."""
+	rcv = ""
+	handled = 0
+	for data in chunks:
+		rcv = rcv + data.decode('latin-1')
+		while '\r\n\r\n' in rcv.lstrip('\r\n'):
+			rcv = rcv.lstrip('\r\n')
+			header_end = rcv.find('\r\n\r\n') + 4
+			# jalur lama tidak mengenal pipelining, jadi hanya header request ini yang dibaca
+			lines = rcv[:header_end].split('\r\n')
+			content_length = 0
+			for line in lines:
+				if line.lower().startswith('content-length:'):
+					content_length = int(line.split(':')[1].strip())
+					break
+			if len(rcv) - header_end < content_length:
+				break
+			httpserver.proses(rcv[:header_end + content_length])
+			rcv = rcv[header_end + content_length:]
+			handled += 1
+	return handled
+
+
+def parser_path(httpserver, chunks):
+	parser = http_parser.RequestParser()
+	handled = 0
+	for data in chunks:
+		for request in parser.feed(data):
+			httpserver.proses_request(request.method, request.target, request.headers, request.body)
+			handled += 1
+	return handled
+
+
+def throughput(count, seed):
+	rng = random.Random(seed)
+	httpserver = game_http.HttpServer()
+	for player_id in range(1, 5):
+		httpserver.default_room.join(player_id)
+	stream = b''.join(serialize(make_request(rng)) for _ in range(count))
+	for label, chunk_size in (('recv(1024)', 1024), ('recv(64K)', 65536)):
+		chunks = [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+		for name, func in (('legacy', legacy_path), ('parser', parser_path)):
+			started = time.perf_counter()
+			handled = func(httpserver, chunks)
+			elapsed = time.perf_counter() - started
+			print("{:>7} {:<10} {:>6} req  {:>9.0f} req/s  {:>7.2f} MB/s".format(
+				name, label, handled, handled / elapsed, len(stream) / elapsed / 1e6))
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--fuzz', type=int, default=2000)
+	parser.add_argument('--requests', type=int, default=20000)
+	parser.add_argument('--seed', type=int, default=1)
+	args = parser.parse_args()
+	fuzz(args.fuzz, args.seed)
+	throughput(args.requests, args.seed)
+
+if __name__ == "__main__":
+	main()
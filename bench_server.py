@@ -0,0 +1,171 @@
+"""
+Benchmark server_thread_http.py vs server_async_http.py vs server_prefork_http.py.
+
+Tiap server dijalankan sebagai subprocess, lalu N koneksi persistent
+mengirim request GET /get_player_ids berulang-ulang (protokol yang sama
+dengan ClientInterface) selama beberapa detik.
+
+    python3 bench_server.py --connections 10 100 500 --duration 5
+    python3 bench_server.py --servers prefork --workers 1 2 4 8 --connections 200
+
+Server prefork dijalankan sekali untuk setiap jumlah worker (rps vs worker).
+Generator beban sendiri berjalan di satu proses; gunakan --load-procs agar
+client tidak menjadi bottleneck saat worker server lebih dari satu.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import subprocess
+import sys
+import time
+
+SERVERS = {
+	'thread': 'server_thread_http.py',
+	'async': 'server_async_http.py',
+	'prefork': 'server_prefork_http.py',
+}
+
+REQUEST = b"GET /get_player_ids HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n"
+
+
+def wait_for_port(port, timeout=10.0):
+	deadline = time.time() + timeout
+	while time.time() < deadline:
+		try:
+			with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+				return True
+		except OSError:
+			time.sleep(0.1)
+	return False
+
+
+async def read_response(reader):
+	header_block = await reader.readuntil(b"\r\n\r\n")
+	content_length = 0
+	for line in header_block.split(b"\r\n"):
+		if line.lower().startswith(b'content-length:'):
+			content_length = int(line.split(b':', 1)[1])
+	await reader.readexactly(content_length)
+	# server selalu menambahkan \r\n\r\n di akhir response
+	await reader.readexactly(4)
+
+
+async def client_loop(port, stop_at, latencies, errors):
+	try:
+		reader, writer = await asyncio.open_connection('127.0.0.1', port)
+	except OSError:
+		errors.append('connect')
+		return
+	try:
+		while time.perf_counter() < stop_at:
+			start = time.perf_counter()
+			writer.write(REQUEST)
+			await writer.drain()
+			await read_response(reader)
+			latencies.append(time.perf_counter() - start)
+	except (OSError, asyncio.IncompleteReadError) as e:
+		errors.append(type(e).__name__)
+	finally:
+		writer.close()
+
+
+async def run_load(port, connections, duration):
+	latencies = []
+	errors = []
+	stop_at = time.perf_counter() + duration
+	started = time.perf_counter()
+	await asyncio.gather(*[client_loop(port, stop_at, latencies, errors) for _ in range(connections)])
+	elapsed = time.perf_counter() - started
+	return latencies, errors, elapsed
+
+
+def percentile(values, pct):
+	if not values:
+		return 0.0
+	values = sorted(values)
+	index = min(len(values) - 1, int(len(values) * pct / 100))
+	return values[index]
+
+
+def load_worker(port, connections, duration, queue):
+	latencies, errors, elapsed = asyncio.run(run_load(port, connections, duration))
+	queue.put((latencies, errors, elapsed))
+
+
+def run_load_procs(port, connections, duration, procs):
+	"""Bagi koneksi ke beberapa proses generator beban, gabungkan hasilnya."""
+	if procs <= 1:
+		return asyncio.run(run_load(port, connections, duration))
+	queue = multiprocessing.Queue()
+	shares = [connections // procs + (1 if i < connections % procs else 0) for i in range(procs)]
+	workers = [multiprocessing.Process(target=load_worker, args=(port, share, duration, queue)) for share in shares if share]
+	for worker in workers:
+		worker.start()
+	latencies = []
+	errors = []
+	elapsed = 0.0
+	for _ in workers:
+		part_latencies, part_errors, part_elapsed = queue.get()
+		latencies.extend(part_latencies)
+		errors.extend(part_errors)
+		elapsed = max(elapsed, part_elapsed)
+	for worker in workers:
+		worker.join()
+	return latencies, errors, elapsed
+
+
+def bench_server(name, port, connection_counts, duration, workers=None, load_procs=1):
+	command = [sys.executable, SERVERS[name], '--port', str(port), '--udp-port', '0', '--log-level', 'ERROR']
+	if workers:
+		command += ['--workers', str(workers)]
+	proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+	results = []
+	try:
+		if not wait_for_port(port):
+			raise RuntimeError("{} did not start on port {}".format(name, port))
+		for connections in connection_counts:
+			latencies, errors, elapsed = run_load_procs(port, connections, duration, load_procs)
+			result = {
+				'server': name,
+				'workers': workers or 1,
+				'connections': connections,
+				'requests': len(latencies),
+				'rps': len(latencies) / elapsed if elapsed else 0.0,
+				'p50_ms': percentile(latencies, 50) * 1000,
+				'p99_ms': percentile(latencies, 99) * 1000,
+				'errors': len(errors),
+			}
+			print("{server:>7} workers={workers:<3} conns={connections:<5} rps={rps:>9.0f} p50={p50_ms:7.2f}ms p99={p99_ms:7.2f}ms errors={errors}".format(**result))
+			results.append(result)
+	finally:
+		proc.terminate()
+		proc.wait()
+	return results
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--servers', nargs='+', default=list(SERVERS), choices=list(SERVERS))
+	parser.add_argument('--connections', nargs='+', type=int, default=[10, 100, 500])
+	parser.add_argument('--duration', type=float, default=5.0)
+	parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help="jumlah worker untuk server prefork")
+	parser.add_argument('--load-procs', type=int, default=1, help="jumlah proses generator beban")
+	parser.add_argument('--port', type=int, default=18885)
+	parser.add_argument('--json', help="simpan hasil ke file JSON")
+	args = parser.parse_args()
+
+	results = []
+	port = args.port
+	for name in args.servers:
+		for workers in (args.workers if name == 'prefork' else [None]):
+			results.extend(bench_server(name, port, args.connections, args.duration, workers, args.load_procs))
+			port += 1
+
+	if args.json:
+		with open(args.json, 'w') as f:
+			json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+	main()
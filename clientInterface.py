@@ -1,43 +1,141 @@
+import os
 import socket
 import logging
 import json
+import threading
+import time
 from time import sleep
+from urllib.parse import quote
+
+import static_files
+import wire_protocol
 
 class ClientInterface:
-    def __init__(self, server_address=('127.0.0.1', 8885)):
+    def __init__(self, server_address=('127.0.0.1', 8885), wire_format='json', use_udp=False, udp_address=None, use_push=False, room=None, view_radius=None):
         self.server_address = server_address
+        # Nama room di server (dikirim lewat header X-Room), None = room default
+        self.room = room
+        self.room_number = 0
+        # Jika diisi, server hanya mengirim pemain dalam radius ini dari pemain lokal
+        self.view_radius = view_radius
+        # 'json' atau 'binary'; binary hanya dipakai jika server mendukungnya (lihat join_game)
+        self.wire_format = wire_format
+        self.binary = False
+        # Kanal UDP opsional untuk set_player_state dan snapshot dunia.
+        # udp_address mengganti port yang diiklankan server (misal untuk udp_shim.py)
+        self.use_udp = use_udp
+        self.udp_address = udp_address
+        self.udp_sock = None
+        self.udp_seq = 0
+        self.udp_sent = False
+        # True jika server menjalankan simulasi (client hanya mengirim input)
+        self.authoritative = False
+        self.tick_rate = None
+        # True jika server mendukung POST /sync (state + dunia dalam satu request)
+        self.can_sync = False
+        # True jika server menghitung hit pedang; hit untuk pemain lokal dikumpulkan di pending_hits
+        self.server_hits = False
+        self.pending_hits = []
         self.sock = None
         self.player_id = None
+        self.recv_buffer = b""
+        # Salinan lokal dunia, diperbarui dengan delta dari /world_state?since=N
+        self.world_version = None
+        self.world_players = {}
+        self.world_lock = threading.Lock()
+        # Server push: koneksi kedua ke /subscribe dibaca oleh thread terpisah
+        self.use_push = use_push
+        self.push_sock = None
+        self.push_thread = None
+        # Mode asinkron: NetworkThread memegang socket, game loop tidak menunggu jaringan
+        self.network = None
 
     def send_command(self, command_str):
         # sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
             # sock.connect(self.server_address)
             logging.warning(f"Connecting to {self.server_address} to send: {command_str}")
-            self.sock.sendall(command_str.encode() + "\r\n\r\n".encode())
-            data_received = b""
-            while True:
-                data = self.sock.recv(1024)
-                if data:
-                    data_received += data
-                    if b"\r\n\r\n" in data_received:
-                        break
-                else:
-                    break
-
-            parts = data_received.split(b"\r\n\r\n", 1)
-            if len(parts) > 1:
-              body_data = parts[1].decode()
-              return json.loads(body_data)
-            else:
-              logging.error("Incomplete response received from server.")
+            status, headers, body = self.send_request(command_str.encode())
+            if status is None:
               return None
-            # cleaned_data = data_received.split("\r\n\r\n", 1)[0]
-            # return json.loads(cleaned_data)
+            return json.loads(body.decode())
         except Exception as e:
             logging.error(f"Error during command execution: {e}")
             return None
 
+    def send_request(self, request, retry=True):
+        """Kirim request (bytes) dan return (status, headers, body) tanpa men-decode body."""
+        try:
+            self.sock.sendall(self.with_room(request) + "\r\n\r\n".encode())
+            status, headers, body = self.read_response()
+        except OSError as e:
+            logging.warning(f"Connection lost: {e}")
+            status, headers, body = None, None, None
+        except Exception as e:
+            logging.error(f"Error during command execution: {e}")
+            return None, None, None
+        if status is None and retry and self.sock is not None:
+            # server menutup koneksi keep-alive yang idle: sambung ulang sekali lalu kirim lagi
+            if self.reconnect():
+                return self.send_request(request, retry=False)
+        if status is None:
+          logging.error("Incomplete response received from server.")
+        return status, headers, body
+
+    def reconnect(self):
+        try:
+            self.sock.close()
+            self.sock = socket.create_connection(self.server_address)
+            self.recv_buffer = b""
+            return True
+        except OSError as e:
+            logging.error(f"Reconnect failed: {e}")
+            return False
+
+    def with_room(self, request):
+        """Sisipkan header X-Room setelah request line."""
+        if not self.room:
+            return request
+        request_line, _, rest = request.partition(b"\r\n")
+        return request_line + f"\r\nX-Room: {self.room}\r\n".encode() + rest
+
+    def read_response(self):
+        r"""
+        Membaca satu response dari socket: header sampai \r\n\r\n,
+        lalu body sesuai Content-Length. Sisa data disimpan untuk response berikutnya.
+        """
+        buffer = self.recv_buffer
+        while True:
+            # server menambahkan \r\n\r\n setelah setiap response
+            buffer = buffer.lstrip(b"\r\n")
+            header_end = buffer.find(b"\r\n\r\n")
+            if header_end >= 0:
+                break
+            data = self.sock.recv(4096)
+            if not data:
+                self.recv_buffer = b""
+                return None, None, None
+            buffer += data
+
+        lines = buffer[:header_end].decode().split("\r\n")
+        status = int(lines[0].split(" ")[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        content_length = int(headers.get('content-length', 0))
+
+        body_start = header_end + 4
+        while len(buffer) < body_start + content_length:
+            data = self.sock.recv(4096)
+            if not data:
+                self.recv_buffer = b""
+                return None, None, None
+            buffer += data
+
+        self.recv_buffer = buffer[body_start + content_length:]
+        return status, headers, buffer[body_start:body_start + content_length]
+
     def join_game(self, player_id):
       """
       - Open socket connection
@@ -49,12 +147,30 @@ class ClientInterface:
       try:
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.connect(self.server_address)
+        self.recv_buffer = b""
+        self.world_version = None
+        self.world_players = {}
         self.player_id = player_id
 
-        body = json.dumps({'player_id': player_id})
+        join = {'player_id': player_id}
+        if self.room:
+          # room dibuat otomatis jika belum ada
+          join['create'] = True
+        body = json.dumps(join)
         command = f"POST /join_game HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}"
         result = self.send_command(command)
         if result and result.get('status') == 'OK':
+          self.binary = self.wire_format == 'binary' and wire_protocol.CONTENT_TYPE in result.get('formats', [])
+          self.authoritative = result.get('authoritative', False)
+          self.can_sync = result.get('sync', False)
+          self.tick_rate = result.get('tick_rate')
+          self.server_hits = result.get('server_hits', False)
+          self.pending_hits = []
+          self.room_number = result.get('room_number', 0)
+          if self.use_udp:
+            self.open_udp(result.get('udp_port'))
+          if self.use_push:
+            self.subscribe()
           logging.info(f"Player {player_id} joined the game successfully.")
           return True
         elif result and result.get('status') == 'Error':
@@ -69,10 +185,43 @@ class ClientInterface:
           self.sock = None
       return False
 
+    def open_udp(self, udp_port):
+      address = self.udp_address
+      if address is None and udp_port:
+        address = (self.server_address[0], udp_port)
+      if address is None:
+        logging.warning("Server does not offer a UDP channel, using TCP only")
+        return
+      self.udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+      self.udp_sock.connect(address)
+      self.udp_sock.setblocking(False)
+      self.udp_seq = 0
+      self.udp_sent = False
+
+    def start_network(self, player_id, interval=1 / 60):
+        """
+        - Jalankan NetworkThread: sync() dipanggil dari thread itu, bukan dari game loop
+        - interval: jarak minimum antar request, misal 1/20 untuk 20 update per detik
+        - Setelah ini game loop memakai self.network.exchange() dan tidak memakai socket langsung
+        """
+        if self.network is None:
+            self.network = NetworkThread(self, player_id, interval)
+            self.network.start()
+        return self.network
+
+    def stop_network(self):
+        """Hentikan NetworkThread (menunggu request yang sedang berjalan selesai)."""
+        if self.network is not None:
+            self.network.stop()
+            self.network.join(timeout=5)
+            self.network = None
+
     def leave_game(self):
       """
       - Close socket connection
       """
+      # socket kembali dipakai thread ini
+      self.stop_network()
       try:
         body = json.dumps({'player_id': self.player_id})
         command = f"POST /leave_game HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}"
@@ -81,12 +230,57 @@ class ClientInterface:
           logging.info(f"Player {self.player_id} left the game successfully.")
           self.sock.close()
           self.sock = None
+          if self.udp_sock:
+            self.udp_sock.close()
+            self.udp_sock = None
+          self.unsubscribe()
           return True
         return False
       except Exception as e:
         logging.error(f"Error leaving game: {e}")
       return False
 
+    def download_assets(self, folder='assets'):
+        """
+        - Samakan folder aset lokal dengan GET /assets/ di server
+        - Hanya file yang ETag-nya berbeda dari salinan lokal yang diunduh
+        - Return jumlah file yang diperbarui, atau None jika server tidak bisa dihubungi
+        """
+        temporary = self.sock is None
+        try:
+            if temporary:
+                self.sock = socket.create_connection(self.server_address)
+                self.recv_buffer = b""
+            status, headers, body = self.send_request(b"GET /assets/ HTTP/1.1")
+            if status != 200:
+                return None
+            updated = 0
+            for entry in json.loads(body.decode()).get('files', []):
+                name = static_files.safe_relative_path(entry.get('path', ''))
+                if name is None:
+                    continue
+                path = os.path.join(folder, *name.split('/'))
+                if os.path.isfile(path) and static_files.content_etag(path) == entry.get('etag'):
+                    continue
+                status, headers, body = self.send_request(f"GET /assets/{quote(name)} HTTP/1.1".encode())
+                if status != 200:
+                    logging.warning(f"Asset {name} not downloaded (status {status})")
+                    continue
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                # tulis ke file sementara dulu supaya file lama tidak pernah setengah tertulis
+                with open(path + '.part', 'wb') as f:
+                    f.write(body)
+                os.replace(path + '.part', path)
+                updated += 1
+            return updated
+        except (OSError, ValueError) as e:
+            logging.error(f"Error downloading assets: {e}")
+            return None
+        finally:
+            if temporary and self.sock:
+                self.sock.close()
+                self.sock = None
+
     def get_all_player_ids(self):
         command = "GET /get_player_ids HTTP/1.1\r\nHost: {self.server_address[0]}"
         result = self.send_command(command)
@@ -94,18 +288,369 @@ class ClientInterface:
             return result.get('players', [])
         return []
 
+    def get_world_state(self):
+        """
+        - Ambil perubahan state pemain sejak versi terakhir dalam satu request
+        - Return dict {player_id: state} semua pemain, atau None jika request gagal
+        """
+        if self.push_sock:
+            # dunia diperbarui oleh push thread, tidak perlu request
+            with self.world_lock:
+                return dict(self.world_players)
+        if self.udp_sock:
+            return self.get_udp_world_state()
+
+        command = f"GET /world_state{self.world_query(self.world_version)} HTTP/1.1"
+        if self.binary:
+            command += f"\r\nAccept: {wire_protocol.CONTENT_TYPE}"
+            return self.read_world(*self.send_request(command.encode()))
+        result = self.send_command(command)
+        if not result or result.get('status') != 'OK':
+            return None
+        self.apply_world(result)
+        return dict(self.world_players)
+
+    def sync(self, player_id, state=None, inputs=None):
+        """
+        - Kirim state pemain lokal (atau input, mode server-authoritative) dan ambil
+          perubahan dunia dalam satu request POST /sync: satu RTT per frame
+        - inputs: list (seq, tombol, dt)
+        - Return dict {player_id: state} semua pemain, atau None jika request gagal
+        """
+        if self.authoritative:
+            state = None
+        if self.udp_sock or self.push_sock or not self.can_sync or (state is None and not inputs):
+            # UDP dan push tidak menunggu response; server lama belum punya /sync
+            for seq, buttons, dt in inputs or ():
+                self.send_input(player_id, seq, buttons, dt)
+            if state is not None:
+                self.set_player_state(player_id, state)
+            return self.get_world_state()
+
+        since = self.world_version
+        query = f"?radius={self.view_radius}" if self.view_radius else ""
+        if self.binary:
+            if inputs:
+                body = wire_protocol.encode_sync_inputs(since, player_id, inputs)
+            else:
+                body = wire_protocol.encode_sync_state(since, player_id, state)
+            command = (f"POST /sync{query} HTTP/1.1\r\nContent-Type: {wire_protocol.CONTENT_TYPE}\r\n"
+                       f"Accept: {wire_protocol.CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+        else:
+            body = {'id': player_id, 'since': since}
+            if inputs:
+                body['inputs'] = [list(command) for command in inputs]
+            else:
+                body['state'] = state
+            body = json.dumps(body)
+            command = f"POST /sync{query} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}".encode()
+        return self.read_world(*self.send_request(command))
+
+    def read_world(self, status, headers, body):
+        """Terapkan response /world_state atau /sync (JSON atau biner) ke salinan lokal dunia."""
+        if status != 200:
+            return None
+        if headers.get('content-type') == wire_protocol.CONTENT_TYPE:
+            result = wire_protocol.decode_world(body)
+        else:
+            result = json.loads(body.decode())
+        if not result or result.get('status') != 'OK':
+            return None
+        self.apply_world(result)
+        return dict(self.world_players)
+
+    def world_query(self, since):
+        """Query string /world_state dan /subscribe (versi terakhir dan area of interest)."""
+        params = []
+        if since is not None:
+            params.append(f"since={since}")
+        if self.view_radius:
+            params.append(f"viewer={self.player_id}&radius={self.view_radius}")
+        return "?" + "&".join(params) if params else ""
+
+    def apply_world(self, result):
+        """Gabungkan snapshot/delta /world_state ke salinan lokal dunia."""
+        with self.world_lock:
+            if result.get('full'):
+                self.world_players = {}
+            for p_id in result.get('left', []):
+                self.world_players.pop(int(p_id), None)
+            # key JSON selalu string, samakan dengan ID dari get_all_player_ids
+            for p_id, state in result.get('players', {}).items():
+                self.world_players[int(p_id)] = state
+            for hit_version, attacker_id, victim_id in result.get('hits', []):
+                # snapshot UDP bisa memuat event yang sama lebih dari sekali
+                if self.world_version is not None and hit_version <= self.world_version:
+                    continue
+                if self.player_id is not None and int(victim_id) == int(self.player_id):
+                    self.pending_hits.append(attacker_id)
+            self.world_version = result.get('version')
+
+    def pop_hits(self):
+        """ID penyerang untuk setiap hit server pada pemain lokal sejak panggilan terakhir."""
+        with self.world_lock:
+            hits = self.pending_hits
+            self.pending_hits = []
+        return hits
+
+    def subscribe(self):
+        """
+        - Buka koneksi kedua ke /subscribe
+        - Server mengirim delta dunia (chunked) setiap kali state berubah
+        """
+        try:
+            self.push_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.push_sock.connect(self.server_address)
+            command = f"GET /subscribe{self.world_query(None)} HTTP/1.1"
+            if self.binary:
+                command += f"\r\nAccept: {wire_protocol.CONTENT_TYPE}"
+            self.push_sock.sendall(self.with_room(command.encode()) + "\r\n\r\n".encode())
+        except OSError as e:
+            logging.error(f"Error subscribing: {e}")
+            self.push_sock = None
+            return False
+        self.push_thread = threading.Thread(target=self.read_push_stream, args=(self.push_sock,), daemon=True)
+        self.push_thread.start()
+        return True
+
+    def unsubscribe(self):
+        if self.push_sock:
+            try:
+                self.push_sock.close()
+            except OSError:
+                pass
+            self.push_sock = None
+
+    def read_push_stream(self, sock):
+        buffer = b""
+
+        def read_until(marker):
+            nonlocal buffer
+            while marker not in buffer:
+                data = sock.recv(4096)
+                if not data:
+                    raise ConnectionError("push stream closed")
+                buffer += data
+            line, buffer = buffer.split(marker, 1)
+            return line
+
+        def read_exactly(size):
+            nonlocal buffer
+            while len(buffer) < size:
+                data = sock.recv(4096)
+                if not data:
+                    raise ConnectionError("push stream closed")
+                buffer += data
+            data, buffer = buffer[:size], buffer[size:]
+            return data
+
+        try:
+            header_block = read_until(b"\r\n\r\n").decode()
+            binary = wire_protocol.CONTENT_TYPE in header_block
+            while True:
+                size = int(read_until(b"\r\n").split(b";")[0], 16)
+                body = read_exactly(size)
+                read_exactly(2)
+                if size == 0:
+                    break
+                if binary:
+                    self.apply_world(wire_protocol.decode_world(body))
+                else:
+                    self.apply_world(json.loads(body.decode()))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Push stream ended: {e}")
+        if self.push_sock is sock:
+            # kembali ke polling biasa
+            self.push_sock = None
+
+    def get_udp_world_state(self):
+        """
+        - Ambil snapshot yang sudah datang lewat UDP tanpa blocking
+        - Jika frame ini belum mengirim state, kirim POLL agar server membalas snapshot
+        """
+        try:
+            if not self.udp_sent:
+                self.udp_seq += 1
+                self.udp_sock.send(wire_protocol.encode_udp_poll(self.udp_seq, self.world_version, self.player_id, self.room_number))
+            self.udp_sent = False
+            while True:
+                try:
+                    data = self.udp_sock.recv(65535)
+                except BlockingIOError:
+                    break
+                try:
+                    kind, seq, payload = wire_protocol.decode_udp(data)
+                except ValueError:
+                    continue
+                # seq snapshot = versi dunia, snapshot yang lebih tua dibuang
+                if kind != wire_protocol.UDP_SNAPSHOT:
+                    continue
+                if self.world_version is not None and seq <= self.world_version:
+                    continue
+                self.apply_world(wire_protocol.decode_world(payload))
+        except OSError as e:
+            logging.error(f"UDP error: {e}")
+        return dict(self.world_players)
+
     def get_player_state(self, player_id):
         command = f"GET /get_player_state?id={player_id} HTTP/1.1"
         return self.send_command(command)
 
     def set_player_state(self, player_id, state):
+        """Kirim state pemain lokal, return True jika terkirim (dan diterima server lewat TCP)."""
+        if self.authoritative:
+            # state dimiliki server, gunakan send_input
+            return False
+        if self.udp_sock:
+            self.udp_seq += 1
+            try:
+                self.udp_sock.send(wire_protocol.encode_udp_state(self.udp_seq, self.world_version, player_id, state, self.room_number))
+                self.udp_sent = True
+                return True
+            except OSError as e:
+                logging.error(f"UDP error: {e}")
+            return False
+        # versi dunia yang sedang ditampilkan, dipakai server untuk lag compensation
+        view_version = self.world_version
+        if self.binary:
+            body = wire_protocol.encode_state(player_id, state)
+            if view_version is not None:
+                body += wire_protocol.VIEW_VERSION.pack(view_version)
+            command = f"POST /set_player_state HTTP/1.1\r\nContent-Type: {wire_protocol.CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\n\r\n"
+            status, _, _ = self.send_request(command.encode() + body)
+            return status == 200
         body = {
             'id': player_id,
             'state': state
         }
+        if view_version is not None:
+            body['view_version'] = view_version
         body = json.dumps(body)
         command = f"POST /set_player_state HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}"
-        self.send_command(command)
+        result = self.send_command(command)
+        return bool(result) and result.get('status') == 'OK'
+
+    def send_input(self, player_id, seq, buttons, dt):
+        """
+        - Kirim satu input command (bit INPUT_* dari game_rules) ke simulasi server
+        - seq naik per input, dt adalah lama frame input tersebut dalam detik
+        - Return True jika terkirim (dan diterima server lewat TCP)
+        """
+        if self.udp_sock:
+            self.udp_seq += 1
+            try:
+                self.udp_sock.send(wire_protocol.encode_udp_input(self.udp_seq, self.world_version, player_id, seq, buttons, dt, self.room_number))
+                self.udp_sent = True
+                return True
+            except OSError as e:
+                logging.error(f"UDP error: {e}")
+            return False
+        if self.binary:
+            body = wire_protocol.encode_input(player_id, seq, buttons, dt)
+            command = f"POST /send_input HTTP/1.1\r\nContent-Type: {wire_protocol.CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\n\r\n"
+            status, _, _ = self.send_request(command.encode() + body)
+            return status == 200
+        body = json.dumps({'id': player_id, 'seq': seq, 'buttons': buttons, 'dt': dt})
+        command = f"POST /send_input HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}"
+        result = self.send_command(command)
+        return bool(result) and result.get('status') == 'OK'
+
+class NetworkThread(threading.Thread):
+    """
+    Thread jaringan untuk mode client asinkron (ClientInterface.start_network).
+
+    Game loop hanya memanggil exchange(): state terbaru (dan input yang
+    terkumpul) dititipkan, lalu snapshot dunia terbaru yang sudah diterima
+    dikembalikan tanpa menunggu. Thread ini yang memanggil sync() yang blocking.
+    Dunia di-double-buffer: client.world_players adalah buffer belakang yang
+    diubah apply_world, salinannya diterbitkan sebagai buffer depan setelah
+    setiap response, sehingga game loop tidak pernah membaca dunia setengah jadi
+    dan waktu frame tidak bergantung pada RTT.
+    """
+    def __init__(self, client, player_id, interval=1 / 60):
+        threading.Thread.__init__(self, name="client-network", daemon=True)
+        self.client = client
+        self.player_id = player_id
+        # jarak minimum antar request (1 / update rate); tanpa state baru dunia tetap diambil
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = False
+        # data keluar: hanya state terakhir yang penting, input tidak boleh hilang
+        self.state = None
+        self.inputs = []
+        # buffer depan: snapshot terakhir dan nomor urutnya
+        self.world = None
+        self.world_seq = 0
+        self.read_seq = 0
+        self.received_at = None
+        # waktu terima snapshot terakhir yang dikembalikan exchange() (untuk interpolasi)
+        self.read_at = None
+        self.rtt = None
+        self.failures = 0
+
+    def submit(self, state=None, inputs=None):
+        with self.lock:
+            if state is not None:
+                self.state = state
+            if inputs:
+                self.inputs.extend(inputs)
+        self.wakeup.set()
+
+    def latest(self):
+        """(snapshot dunia terbaru atau None, nomor urutnya, waktu terima time.monotonic())."""
+        with self.lock:
+            return self.world, self.world_seq, self.received_at
+
+    def exchange(self, state=None, inputs=None):
+        """
+        - Pengganti client.sync() di game loop, tidak pernah blocking
+        - Return snapshot dunia jika ada yang baru sejak panggilan terakhir, selain itu None
+        """
+        self.submit(state, inputs)
+        world, seq, received_at = self.latest()
+        if seq == self.read_seq:
+            return None
+        self.read_seq = seq
+        self.read_at = received_at
+        return world
+
+    def stop(self):
+        self.stopped = True
+        self.wakeup.set()
+
+    def run(self):
+        next_request = time.perf_counter()
+        while not self.stopped:
+            self.wakeup.wait(self.interval)
+            # state dan input yang datang selama menunggu ikut terkirim di request berikutnya
+            delay = next_request - time.perf_counter()
+            if delay > 0:
+                sleep(delay)
+            self.wakeup.clear()
+            if self.stopped:
+                break
+            with self.lock:
+                state, self.state = self.state, None
+                inputs, self.inputs = self.inputs, []
+            started = time.perf_counter()
+            next_request = started + self.interval
+            world = self.client.sync(self.player_id, state=state, inputs=inputs)
+            if world is None:
+                self.failures += 1
+                with self.lock:
+                    # input dikirim ulang bersama input berikutnya; state diganti yang lebih baru
+                    self.inputs[:0] = inputs
+                    if self.state is None:
+                        self.state = state
+                # jangan membanjiri server yang sedang bermasalah
+                sleep(self.interval)
+                continue
+            with self.lock:
+                self.world = world
+                self.world_seq += 1
+                self.rtt = time.perf_counter() - started
+                self.received_at = time.monotonic()
 
 if __name__ == "__main__":
   client = ClientInterface()
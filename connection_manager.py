@@ -0,0 +1,217 @@
+"""
+Pengelola koneksi TCP untuk server.
+
+ConnectionStats hanya menghitung koneksi (dipakai server_async_http), sedangkan
+ConnectionManager (server_thread_http) juga menjalankan pool worker berukuran
+tetap. Koneksi yang sedang tidak mengirim apa pun (keep-alive menganggur) tidak
+memegang worker: satu thread poller menunggu semuanya dengan `selectors`, dan
+baru menyerahkan koneksi ke worker saat ada data untuk dibaca. Setelah request
+dijawab koneksi kembali ke poller. Jadi jumlah pemain tidak dibatasi --workers,
+hanya oleh max_connections (koneksi di atasnya dijawab 503 lalu ditutup).
+Koneksi yang menganggur lebih dari idle_timeout, atau berhenti mengirim di
+tengah request lebih dari read_timeout, ditutup poller dan slot-nya dikembalikan.
+"""
+import logging
+import queue
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+
+import http_parser
+
+IDLE_TIMEOUT = 30.0
+READ_TIMEOUT = 5.0
+# interval poller memeriksa koneksi yang melewati timeout
+REAP_INTERVAL = 0.5
+
+# hasil handler ConnectionManager: koneksi kembali ke poller, ditutup, atau
+# diambil alih handler (misal stream /subscribe) yang lalu memanggil close()
+KEEP = 'keep'
+CLOSE = 'close'
+DETACH = 'detach'
+
+
+def raise_open_file_limit():
+	# Ribuan koneksi persistent butuh lebih dari default 1024 file descriptor
+	try:
+		import resource
+	except ImportError:
+		return
+	soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+	if hard == resource.RLIM_INFINITY or soft < hard:
+		try:
+			resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+		except (ValueError, OSError):
+			pass
+
+
+class ConnectionStats:
+	def __init__(self, idle_timeout=IDLE_TIMEOUT, read_timeout=READ_TIMEOUT):
+		self.idle_timeout = idle_timeout
+		self.read_timeout = read_timeout
+		self.lock = threading.Lock()
+		self.counts = {'accepted': 0, 'closed': 0, 'timed_out': 0, 'errors': 0, 'rejected': 0}
+
+	def count(self, name):
+		with self.lock:
+			self.counts[name] += 1
+
+	def timeout_for(self, parser):
+		"""Timeout data berikutnya: read_timeout jika request baru diterima sebagian."""
+		return self.read_timeout if parser.in_progress() else self.idle_timeout
+
+	def stats(self):
+		with self.lock:
+			stats = dict(self.counts)
+		stats['open'] = stats['accepted'] - stats['closed']
+		return stats
+
+
+class Client:
+	"""Satu koneksi yang dikelola ConnectionManager, beserta parser request-nya."""
+	__slots__ = ('connection', 'address', 'parser', 'deadline')
+
+	def __init__(self, connection, address):
+		self.connection = connection
+		self.address = address
+		self.parser = http_parser.RequestParser()
+		self.deadline = None
+
+
+class ConnectionManager(ConnectionStats):
+	"""
+	Pool `max_workers` thread ditambah satu thread poller.
+	Paling banyak `max_connections` koneksi terbuka (menganggur + dilayani).
+	handler(client) dipanggil di thread worker setiap kali koneksi bisa dibaca
+	dan mengembalikan KEEP, CLOSE atau DETACH.
+	"""
+	def __init__(self, handler, max_workers=64, max_connections=4096,
+			idle_timeout=IDLE_TIMEOUT, read_timeout=READ_TIMEOUT):
+		ConnectionStats.__init__(self, idle_timeout, read_timeout)
+		self.handler = handler
+		self.max_workers = max_workers
+		self.max_connections = max(max_connections, max_workers)
+		self.slots = threading.BoundedSemaphore(self.max_connections)
+		# koneksi yang bisa dibaca, menunggu worker
+		self.queue = queue.Queue()
+		self.busy = 0
+		self.workers = []
+		# koneksi yang diserahkan ke poller (baru di-accept atau selesai dilayani worker);
+		# hanya thread poller yang mengubah selector
+		self.selector = selectors.DefaultSelector()
+		self.returned = deque()
+		self.waiting = 0
+		self.detached = 0
+		self.wakeup_r, self.wakeup_w = socket.socketpair()
+		self.wakeup_r.setblocking(False)
+		self.wakeup_w.setblocking(False)
+
+	def start(self):
+		self.selector.register(self.wakeup_r, selectors.EVENT_READ)
+		threading.Thread(target=self.poll, name="conn-poller", daemon=True).start()
+		for index in range(self.max_workers):
+			worker = threading.Thread(target=self.work, name="conn-worker-{}".format(index), daemon=True)
+			worker.start()
+			self.workers.append(worker)
+
+	def try_acquire_slot(self):
+		"""False jika sudah ada max_connections koneksi terbuka."""
+		return self.slots.acquire(blocking=False)
+
+	def release_slot(self):
+		self.slots.release()
+
+	def submit(self, connection, address):
+		"""Serahkan koneksi yang baru di-accept (slot sudah diambil) ke poller."""
+		self.count('accepted')
+		# timeout tetap berlaku untuk sendall ke client yang berhenti membaca
+		connection.settimeout(self.idle_timeout)
+		self.wait_readable(Client(connection, address))
+
+	def wait_readable(self, client):
+		client.deadline = time.monotonic() + self.timeout_for(client.parser)
+		self.returned.append(client)
+		try:
+			self.wakeup_w.send(b'\0')
+		except OSError:
+			# buffer wakeup penuh: poller memang sudah akan bangun
+			pass
+
+	def close(self, client):
+		"""Tutup koneksi dan lepaskan slot-nya."""
+		try:
+			client.connection.close()
+		finally:
+			with self.lock:
+				self.counts['closed'] += 1
+			self.release_slot()
+
+	def poll(self):
+		next_reap = time.monotonic() + REAP_INTERVAL
+		while True:
+			while self.returned:
+				client = self.returned.popleft()
+				self.selector.register(client.connection, selectors.EVENT_READ, client)
+				self.waiting += 1
+			for key, _ in self.selector.select(REAP_INTERVAL):
+				if key.fileobj is self.wakeup_r:
+					try:
+						while self.wakeup_r.recv(4096):
+							pass
+					except BlockingIOError:
+						pass
+					continue
+				self.selector.unregister(key.fileobj)
+				self.waiting -= 1
+				self.queue.put(key.data)
+
+			now = time.monotonic()
+			if now >= next_reap:
+				next_reap = now + REAP_INTERVAL
+				self.reap(now)
+
+	def reap(self, now):
+		expired = [key for key in self.selector.get_map().values()
+			if key.data is not None and key.data.deadline <= now]
+		for key in expired:
+			self.selector.unregister(key.fileobj)
+			self.waiting -= 1
+			self.count('timed_out')
+			logging.info("connection {} timed out".format(key.data.address))
+			self.close(key.data)
+
+	def work(self):
+		while True:
+			client = self.queue.get()
+			with self.lock:
+				self.busy += 1
+			result = CLOSE
+			try:
+				result = self.handler(client)
+			except Exception:
+				self.count('errors')
+				logging.exception("error while serving {}".format(client.address))
+			finally:
+				with self.lock:
+					self.busy -= 1
+					if result == DETACH:
+						self.detached += 1
+				if result == KEEP:
+					self.wait_readable(client)
+				elif result != DETACH:
+					self.close(client)
+
+	def close_detached(self, client):
+		"""close() untuk koneksi yang diambil alih handler (DETACH)."""
+		with self.lock:
+			self.detached -= 1
+		self.close(client)
+
+	def stats(self):
+		stats = ConnectionStats.stats(self)
+		stats.update({'workers': self.max_workers, 'busy': self.busy,
+			'queued': self.queue.qsize(), 'idle': self.waiting, 'detached': self.detached,
+			'max_connections': self.max_connections})
+		return stats
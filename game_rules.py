@@ -0,0 +1,219 @@
+"""
+Aturan game tanpa pygame: konstanta, geometri arena, dan simulasi satu pemain.
+
+Dipakai oleh server (simulation.py) untuk mode server-authoritative,
+sehingga logika gerak, tabrakan tembok, serangan dan shield sama dengan player.py.
+Rect ditulis sebagai tuple (x, y, w, h).
+"""
+
+ARENA_WIDTH = 600
+ARENA_HEIGHT = 600
+SPAWN_POSITION = (100, 100)
+
+PLAYER_WIDTH = 32        # knight 16x28 diskalakan 2x
+PLAYER_HEIGHT = 56
+PLAYER_SPEED = 200
+MAX_HEALTH = 6
+
+ATTACK_DURATION = 0.25
+HIT_DURATION = 0.2
+SHIELD_DURATION = 1.5
+SHIELD_COOLDOWN = 5.0
+
+SWORD_WIDTH = 20         # sword.png 10x21 diskalakan 2x
+SWORD_HEIGHT = 42
+SWORD_OFFSET_X = 40
+SWORD_OFFSET_Y = 10
+
+# Bit tombol untuk input command (client -> server)
+INPUT_LEFT = 0x01
+INPUT_RIGHT = 0x02
+INPUT_UP = 0x04
+INPUT_DOWN = 0x08
+INPUT_ATTACK = 0x10
+INPUT_SHIELD = 0x20
+INPUT_RESPAWN = 0x40
+
+# dt satu input dibatasi (misal frame client yang tersendat); total dt semua
+# input dalam satu tick dibatasi terpisah oleh jatah waktu nyata di simulation.py
+MAX_INPUT_DT = 0.1
+
+
+def arena_walls(width=ARENA_WIDTH, height=ARENA_HEIGHT):
+    """Tembok arena, sama dengan yang digambar di main_multiplayer."""
+    walls = []
+
+    # 4 Corner Walls
+    walls.append((0, 0, 10, height))
+    walls.append((width - 10, 0, 10, height))
+    walls.append((0, 0, width, 10))
+    walls.append((0, height - 10, width, 10))
+
+    # Extra Walls (int() sama seperti konstruktor pygame.Rect)
+    scaling_factor = 2.307
+    extra = [
+        (130, 0, 5, 45),
+        (130, 45, 98, 5),
+        (145, 103, 115, 5),
+        (0, 210, 160, 5),
+    ]
+    for x, y, w, h in extra:
+        walls.append((int(x * scaling_factor), int(y * scaling_factor), int(w * scaling_factor), int(h * scaling_factor)))
+    return walls
+
+
+def rects_collide(a, b):
+    """Sama dengan pygame.Rect.colliderect."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and ax + aw > bx and ay < by + bh and ay + ah > by
+
+
+def sword_rect(x, y, facing_right, is_attacking):
+    """Hitbox pedang, sama dengan Player.get_sword_render_info."""
+    if is_attacking:
+        # pedang diputar 90 derajat saat menyerang
+        width, height = SWORD_HEIGHT, SWORD_WIDTH
+    else:
+        width, height = SWORD_WIDTH, SWORD_HEIGHT
+    center_x = x + PLAYER_WIDTH // 2 + (SWORD_OFFSET_X if facing_right else -SWORD_OFFSET_X)
+    center_y = y + PLAYER_HEIGHT // 2 + SWORD_OFFSET_Y
+    return (center_x - width // 2, center_y - height // 2, width, height)
+
+
+def move_and_collide(x, y, vx, vy, dt, walls):
+    """Gerak sumbu x lalu y, masing-masing diikuti tabrakan tembok (Player.handle_collision)."""
+    x += vx * dt
+    for wx, wy, ww, wh in walls:
+        if rects_collide((x, y, PLAYER_WIDTH, PLAYER_HEIGHT), (wx, wy, ww, wh)):
+            if vx > 0: x = wx - PLAYER_WIDTH
+            if vx < 0: x = wx + ww
+    y += vy * dt
+    for wx, wy, ww, wh in walls:
+        if rects_collide((x, y, PLAYER_WIDTH, PLAYER_HEIGHT), (wx, wy, ww, wh)):
+            if vy > 0: y = wy - PLAYER_HEIGHT
+            if vy < 0: y = wy + wh
+    return x, y
+
+
+class PlayerSim:
+    """State satu pemain di simulasi server (padanan logika Player.update lokal)."""
+
+    def __init__(self, id, x=SPAWN_POSITION[0], y=SPAWN_POSITION[1]):
+        self.id = id
+        self.x = float(x)
+        self.y = float(y)
+        self.health = MAX_HEALTH
+        self.facing_right = True
+        self.is_attacking = False
+        self.attack_timer = 0
+        self.hit_during_attack = set()
+        self.is_hit = False
+        self.hit_timer = 0
+        self.shield_active = False
+        self.shield_timer = 0
+        self.shield_cooldown_timer = 0
+        self.input_seq = 0
+
+    def rect(self):
+        return (self.x, self.y, PLAYER_WIDTH, PLAYER_HEIGHT)
+
+    def sword_rect(self):
+        if not self.is_attacking:
+            return None
+        return sword_rect(self.x, self.y, self.facing_right, self.is_attacking)
+
+    def respawn(self, x=SPAWN_POSITION[0], y=SPAWN_POSITION[1]):
+        self.health = MAX_HEALTH
+        self.x, self.y = float(x), float(y)
+        self.is_hit = False
+        self.is_attacking = False
+
+    def register_hit(self):
+        if not self.is_hit and not self.shield_active:
+            self.health = max(0, self.health - 1)
+            self.is_hit = True
+            self.hit_timer = 0
+            return True
+        return False
+
+    def apply_input(self, buttons, dt, walls, others=()):
+        """
+        Jalankan satu input command selama dt detik.
+        Return daftar id pemain yang terkena pedang pada langkah ini.
+        """
+        dt = max(0.0, min(dt, MAX_INPUT_DT))
+        if buttons & INPUT_RESPAWN and self.health <= 0:
+            self.respawn()
+
+        vx = vy = 0
+        if not self.is_hit and self.health > 0:
+            if buttons & INPUT_LEFT:
+                vx = -PLAYER_SPEED
+                self.facing_right = False
+            if buttons & INPUT_RIGHT:
+                vx = PLAYER_SPEED
+                self.facing_right = True
+            if buttons & INPUT_UP:
+                vy = -PLAYER_SPEED
+            if buttons & INPUT_DOWN:
+                vy = PLAYER_SPEED
+
+            if buttons & INPUT_ATTACK and not self.is_attacking:
+                self.is_attacking = True
+                self.attack_timer = 0
+                self.hit_during_attack.clear()
+
+            if buttons & INPUT_SHIELD and not self.shield_active and self.shield_cooldown_timer <= 0:
+                self.shield_active = True
+                self.shield_timer = 0
+                self.shield_cooldown_timer = SHIELD_COOLDOWN
+
+        if self.shield_active:
+            self.shield_timer += dt
+            if self.shield_timer >= SHIELD_DURATION:
+                self.shield_active = False
+
+        if self.shield_cooldown_timer > 0:
+            self.shield_cooldown_timer -= dt
+
+        hits = []
+        if self.is_attacking:
+            self.attack_timer += dt
+            hits = self.perform_attack(others)
+            if self.attack_timer >= ATTACK_DURATION:
+                self.is_attacking = False
+
+        if self.is_hit:
+            self.hit_timer += dt
+            if self.hit_timer >= HIT_DURATION:
+                self.is_hit = False
+                self.hit_timer = 0
+
+        self.x, self.y = move_and_collide(self.x, self.y, vx, vy, dt, walls)
+        return hits
+
+    def perform_attack(self, others):
+        attack_rect = self.sword_rect()
+        hits = []
+        for other in others:
+            if other.id == self.id or other.id in self.hit_during_attack:
+                continue
+            if rects_collide(attack_rect, other.rect()):
+                if other.register_hit():
+                    hits.append(other.id)
+                self.hit_during_attack.add(other.id)
+        return hits
+
+    def to_state(self):
+        state = {
+            'position': [int(round(self.x)), int(round(self.y))],
+            'health': self.health,
+            'facing_right': self.facing_right,
+            'is_attacking': self.is_attacking,
+            'is_hit': self.is_hit,
+            'shield_active': self.shield_active,
+            'attacker_id': self.id if self.is_attacking else None,
+            'input_seq': self.input_seq
+        }
+        return state
@@ -3,11 +3,24 @@ import os.path
 import uuid
 from glob import glob
 from datetime import datetime
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qs, unquote, urlparse
 import json
+import threading
+import time
+import wire_protocol
+from room import Room
+from simulation import Simulation
+from metrics import Metrics
+from static_files import AssetStore
 
-# Dictionary to store player states
-player_states = {}
+# Response GET yang hanya bergantung pada versi dunia, disimpan utuh (bytes)
+CACHEABLE_PATHS = ('/get_player_ids', '/get_player_state', '/world_state')
+
+# Room yang dipakai jika request tidak menyebut room (?room=... atau header X-Room)
+DEFAULT_ROOM = 'default'
+MAX_ROOMS = 1024
+MAX_ROOM_NAME = 32
+ASSET_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
 
 class HttpServer:
 	def __init__(self):
@@ -16,32 +29,123 @@ class HttpServer:
 		self.types['.jpg']='image/jpeg'
 		self.types['.txt']='text/plain'
 		self.types['.html']='text/html'
+		self.types['.png']='image/png'
+		self.types['.gif']='image/gif'
+		self.types['.json']='application/json'
+		self.types['.wav']='audio/wav'
+		self.types['.ogg']='audio/ogg'
+		self.types['.ttf']='font/ttf'
+		# GET /assets/<path>: gambar dan data level untuk diunduh client
+		self.assets = AssetStore(ASSET_ROOT, self.types)
+
+		# nama room -> Room, dan nomor room -> Room untuk kanal UDP
+		self.rooms = {}
+		self.rooms_by_number = {}
+		self.rooms_lock = threading.Lock()
+		self.next_room_number = 0
+		self.max_rooms = MAX_ROOMS
+
+		self.date_second = None
+		self.date_header = None
+
+		# Port kanal UDP (server_udp.py), diisi oleh main server jika aktif
+		self.udp_port = None
+		# Tick rate simulasi server-authoritative, 0 = client mengirim state sendiri
+		self.tick_rate = 0
+		# Radius pandang default untuk snapshot yang menyebut viewer, 0 = semua pemain
+		self.view_radius = 0
+		# ConnectionManager / ConnectionStats server (connection_manager.py), untuk /connections
+		self.connections = None
+		# hitungan, latensi dan byte per route untuk /metrics, plus access log tersampel
+		self.metrics = Metrics()
+
+		self.default_room = self.create_room(DEFAULT_ROOM)
+
+	def create_room(self, name):
+		"""Return Room baru, atau None jika nama sudah dipakai / batas room tercapai."""
+		with self.rooms_lock:
+			if name in self.rooms or len(self.rooms) >= self.max_rooms:
+				return None
+			# nomor room dipakai ulang setelah room dihapus, tetap muat di uint16
+			while self.next_room_number in self.rooms_by_number:
+				self.next_room_number = (self.next_room_number + 1) % 65536
+			room = Room(name, self.next_room_number)
+			self.rooms[name] = room
+			self.rooms_by_number[room.number] = room
+		if self.tick_rate:
+			Simulation(room, self.tick_rate, metrics=self.metrics).start()
+		return room
+
+	def set_default_room(self, room):
+		"""Ganti room default (server prefork memakai shared_state.SharedRoom)."""
+		with self.rooms_lock:
+			old = self.default_room
+			del self.rooms[old.name]
+			del self.rooms_by_number[old.number]
+			self.rooms[room.name] = room
+			self.rooms_by_number[room.number] = room
+			self.default_room = room
+		old.close()
+
+	def remove_room(self, room):
+		# room default tidak pernah dihapus
+		if room is self.default_room:
+			return
+		with self.rooms_lock:
+			with room.players.lock:
+				if len(room.players) or self.rooms.get(room.name) is not room:
+					return
+				room.closed = True
+			del self.rooms[room.name]
+			del self.rooms_by_number[room.number]
+		room.close()
+
+	def enable_simulation(self, tick_rate):
+		"""Mode server-authoritative: satu Simulation per room."""
+		self.tick_rate = tick_rate
+		with self.rooms_lock:
+			rooms = list(self.rooms.values())
+		for room in rooms:
+			if not room.simulation:
+				Simulation(room, tick_rate, metrics=self.metrics).start()
+
+	def room_name(self, headers, query):
+		"""Nama room tujuan request: ?room=nama, header X-Room, atau room default."""
+		return parse_qs(query).get('room', [None])[0] or self.get_header(headers, 'x-room') or DEFAULT_ROOM
+
+	def get_room(self, headers, query):
+		return self.rooms.get(self.room_name(headers, query))
+
+	def room_list(self):
+		with self.rooms_lock:
+			rooms = list(self.rooms.values())
+		return [{'room': room.name, 'players': len(room.players), 'authoritative': bool(room.simulation)} for room in rooms]
 
 	# response(kode, message, messagebody, headers)
-	def response(self, kode=404, message='Not Found', messagebody=bytes(), headers={}):
-		tanggal = datetime.now().strftime('%c')
-		resp=[]
-		resp.append("HTTP/1.1 {} {}\r\n" . format(kode,message))
-		resp.append("Date: {}\r\n" . format(tanggal))
-		resp.append("Connection: close\r\n")
-		resp.append("Server: myserver/1.0\r\n")
-		resp.append("Content-Length: {}\r\n" . format(len(messagebody)))
-		for kk in headers:
-			resp.append("{}:{}\r\n" . format(kk,headers[kk]))
-		resp.append("\r\n")
+	def http_date(self):
+		# strftime hanya dipanggil sekali per detik
+		now = int(time.time())
+		if now != self.date_second:
+			self.date_header = "Date: {}\r\n".format(datetime.now().strftime('%c'))
+			self.date_second = now
+		return self.date_header
 
-		response_headers=''
-		for i in resp:
-			response_headers="{}{}" . format(response_headers,i)
-		#menggabungkan resp menjadi satu string dan menggabungkan dengan messagebody yang berupa bytes
-		#response harus berupa bytes
+	def response(self, kode=404, message='Not Found', messagebody=bytes(), headers={}):
 		#message body harus diubah dulu menjadi bytes
 		if (type(messagebody) is not bytes):
 			messagebody = messagebody.encode()
-
-		response = response_headers.encode() + messagebody
 		#response adalah bytes
-		return response
+		return self.response_head(kode, message, len(messagebody), headers) + messagebody
+
+	def response_head(self, kode, message, content_length, headers):
+		resp = ["HTTP/1.1 {} {}\r\n".format(kode, message),
+			self.http_date(),
+			"Connection: close\r\nServer: myserver/1.0\r\n",
+			"Content-Length: {}\r\n".format(content_length)]
+		for kk in headers:
+			resp.append("{}:{}\r\n".format(kk, headers[kk]))
+		resp.append("\r\n")
+		return "".join(resp).encode()
 
 	def proses(self,data):
 		requests = data.split("\r\n")
@@ -50,6 +154,10 @@ class HttpServer:
 		#print(baris)
 
 		all_headers = [n for n in requests[1:] if n!='']
+		header_dict = {}
+		for header in all_headers:
+			key, _, value = header.partition(':')
+			header_dict[key.strip().lower()] = value.strip()
 		content_length = 0
 		for header in all_headers:
 			if header.lower().startswith('content-length:'):
@@ -67,25 +175,65 @@ class HttpServer:
 				# The body is after the headers
 				# The data received by the server is a string representation of bytes, so we need to handle the escaped characters
 				body_raw = data[body_start:]
-				# We need to decode the escaped string
-				body = bytes(body_raw, "utf-8").decode("unicode_escape")
+				if self.get_header(header_dict, 'content-type') == wire_protocol.CONTENT_TYPE:
+					# Body biner: server men-decode socket dengan latin-1 sehingga byte aslinya bisa dikembalikan
+					body = body_raw.encode('latin-1')[:content_length]
+				else:
+					# We need to decode the escaped string
+					body = bytes(body_raw, "utf-8").decode("unicode_escape")
 
 
 		j = baris.split(" ")
 		try:
 			method=j[0].upper().strip()
+			object_address = j[1].strip()
+		except IndexError:
+			return self.response(400,'Bad Request','',{})
+		return self.proses_request(method, object_address, header_dict, body)
+
+	def proses_request(self, method, object_address, headers, body):
+		"""
+		Request yang sudah di-parse (http_parser.RequestParser).
+		headers: dict nama header lowercase -> value, body: bytes
+		"""
+		started = time.perf_counter()
+		hasil = self.dispatch(method, object_address, headers, body)
+		if isinstance(hasil, Subscription):
+			status, size = '200', 0
+		elif isinstance(hasil, FileResponse):
+			status, size = hasil.head[9:12].decode(), len(hasil.head) + hasil.length
+		else:
+			# "HTTP/1.1 200 ..." -> '200'
+			status, size = hasil[9:12].decode(), len(hasil)
+		self.metrics.observe(method, object_address, status, time.perf_counter() - started, len(body), size)
+		return hasil
+
+	def dispatch(self, method, object_address, headers, body):
+		try:
 			if (method=='GET'):
-				object_address = j[1].strip()
-				return self.http_get(object_address, all_headers)
+				return self.http_get(object_address, headers)
 			elif (method=='POST'):
-				object_address = j[1].strip()
-				return self.http_post(object_address, all_headers, body)
-
+				return self.http_post(object_address, headers, body)
 			else:
 				return self.response(400,'Bad Request','',{})
-		except IndexError:
-			return self.response(400,'Bad Request','',{})
+		except (ValueError, TypeError, AttributeError):
+			# body JSON rusak atau tidak sesuai format
+			return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Malformed request'}), {'Content-Type': 'application/json'})
+
+	def get_header(self, headers, name):
+		return headers.get(name.lower())
+
+	def accepts_binary(self, headers):
+		accept = self.get_header(headers, 'accept')
+		return accept is not None and wire_protocol.CONTENT_TYPE in accept
 
+	def view_params(self, params):
+		"""(viewer, radius) dari query; radius default self.view_radius (0 = tanpa filter)."""
+		viewer = params.get('viewer', [None])[0]
+		radius = params.get('radius', [None])[0]
+		viewer = int(viewer) if viewer is not None else None
+		radius = float(radius) if radius is not None else self.view_radius
+		return viewer, radius
 
 	def http_get(self,object_address,headers):
 		
@@ -97,23 +245,137 @@ class HttpServer:
 		if (path == '/'):
 			return self.response(200,'OK','Ini Adalah web Server percobaan',dict())
 
-		elif (path == '/get_player_ids'):
-			ids = list(player_states.keys())
+		elif (path == '/rooms'):
+			return self.response(200, 'OK', json.dumps({'status': 'OK', 'rooms': self.room_list()}), {'Content-Type': 'application/json'})
+
+		elif path == '/assets' or path.startswith('/assets/'):
+			return self.serve_asset(unquote(path[len('/assets/'):]), headers)
+
+		elif (path == '/metrics'):
+			with self.rooms_lock:
+				rooms = list(self.rooms.values())
+			connections = self.connections.stats() if self.connections is not None else None
+			return self.response(200, 'OK', self.metrics.render(connections, rooms), {'Content-Type': 'text/plain; version=0.0.4'})
+
+		elif (path == '/access_log'):
+			limit = parse_qs(query).get('limit', [None])[0]
+			entries = self.metrics.access_log.recent(int(limit) if limit is not None else None)
+			return self.response(200, 'OK', json.dumps({'status': 'OK', 'sample': self.metrics.access_log.sample, 'entries': entries}), {'Content-Type': 'application/json'})
+
+		elif (path == '/connections'):
+			stats = self.connections.stats() if self.connections is not None else {}
+			return self.response(200, 'OK', json.dumps({'status': 'OK', 'connections': stats}), {'Content-Type': 'application/json'})
+
+		room = self.get_room(headers, query)
+		if room is None:
+			return self.response(404, 'Not Found', json.dumps({'status': 'Error', 'message': 'Room not found'}), {'Content-Type': 'application/json'})
+
+		if path in CACHEABLE_PATHS:
+			# Banyak client meminta data yang sama pada versi yang sama:
+			# cukup lookup dict, tanpa json.dumps dan format header ulang
+			self.http_date()
+			key = (object_address, self.accepts_binary(headers))
+			hasil = room.cached_response(key, self.date_second)
+			if hasil is None:
+				version = room.world_version
+				hasil = self.build_get_response(room, path, query, headers)
+				room.store_response(key, version, hasil)
+			return hasil
+		return self.build_get_response(room, path, query, headers)
+
+	def serve_asset(self, name, headers):
+		"""File dari folder aset dengan ETag/If-None-Match dan Range; path kosong = manifest."""
+		if not name:
+			return self.response(200, 'OK', json.dumps({'status': 'OK', 'files': self.assets.manifest()}), {'Content-Type': 'application/json'})
+		asset = self.assets.get(name)
+		if asset is None:
+			return self.response(404, 'Not Found', json.dumps({'status': 'Error', 'message': 'Asset not found'}), {'Content-Type': 'application/json'})
+		asset_headers = {'Content-Type': asset.content_type, 'ETag': asset.etag,
+			'Accept-Ranges': 'bytes', 'Cache-Control': 'no-cache'}
+		if_none_match = self.get_header(headers, 'if-none-match')
+		if if_none_match and (if_none_match.strip() == '*' or asset.etag in [tag.strip() for tag in if_none_match.split(',')]):
+			return self.response(304, 'Not Modified', '', {'ETag': asset.etag})
+
+		offset, length = 0, asset.size
+		kode, message = 200, 'OK'
+		byte_range = self.get_header(headers, 'range')
+		if byte_range:
+			parsed = parse_range(byte_range, asset.size)
+			if parsed is False:
+				return self.response(416, 'Range Not Satisfiable', '', {'Content-Range': 'bytes */{}'.format(asset.size)})
+			if parsed is not None:
+				offset, length = parsed
+				kode, message = 206, 'Partial Content'
+				asset_headers['Content-Range'] = 'bytes {}-{}/{}'.format(offset, offset + length - 1, asset.size)
+
+		if asset.data is not None:
+			return self.response(kode, message, asset.data[offset:offset + length], asset_headers)
+		# file besar: isi file dikirim server langsung dari disk (sendfile)
+		return FileResponse(self.response_head(kode, message, length, asset_headers), asset.path, offset, length)
+
+	def build_get_response(self, room, path, query, headers):
+
+		if (path == '/get_player_ids'):
+			ids = room.players.ids()
 			return self.response(200, 'OK', json.dumps({'status': 'OK', 'players': ids}), {'Content-Type': 'application/json'})
 
 		elif (path == '/get_player_state'):
 			params = parse_qs(query)
 			player_id = params.get('id', [None])[0]
 			player_id = int(player_id) if player_id is not None else None
-			if player_id and player_id in player_states:
-				return self.response(200, 'OK', json.dumps(player_states[player_id]), {'Content-Type': 'application/json'})
+			state = room.players.get(player_id) if player_id else None
+			if state is not None:
+				return self.response(200, 'OK', json.dumps(state), {'Content-Type': 'application/json'})
 			return self.response(404, 'Not Found', json.dumps({'status': 'Error', 'message': 'Player not found'}), {'Content-Type': 'application/json'})
 
+		elif (path == '/world_state'):
+			# Semua state pemain (termasuk attacker_id) dalam satu response,
+			# pengganti get_player_ids + get_player_state per pemain.
+			# Dengan ?since=N hanya perubahan sejak versi N yang dikirim
+			params = parse_qs(query)
+			since = params.get('since', [None])[0]
+			try:
+				since = int(since) if since is not None else None
+			except ValueError:
+				return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid version'}), {'Content-Type': 'application/json'})
+			# ?viewer=ID[&radius=R]: hanya pemain di sekitar viewer (area of interest)
+			viewer, radius = self.view_params(params)
+			if self.accepts_binary(headers):
+				return self.response(200, 'OK', wire_protocol.encode_world(room.world_delta(since, viewer, radius)), {'Content-Type': wire_protocol.CONTENT_TYPE})
+			return self.response(200, 'OK', json.dumps(room.world_delta(since, viewer, radius)), {'Content-Type': 'application/json'})
+
+		elif (path == '/subscribe'):
+			# Server push: response chunked yang tidak pernah selesai,
+			# satu chunk (delta dunia) setiap versi berubah. Lihat Subscription.
+			params = parse_qs(query)
+			since = params.get('since', [None])[0]
+			try:
+				since = int(since) if since is not None else None
+			except ValueError:
+				return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid version'}), {'Content-Type': 'application/json'})
+			viewer, radius = self.view_params(params)
+			return Subscription(room, self.accepts_binary(headers), since, viewer, radius)
+
 		return self.response(404, 'Not Found', 'Endpoint not found', {})
 
 	def http_post(self,object_address,headers,body):
 		parsed_url = urlparse(object_address)
 		path = parsed_url.path
+		query = parsed_url.query
+
+		"""
+		Room
+		Setiap room adalah arena terpisah dengan state pemainnya sendiri
+		"""
+		if path == '/create_room':
+			body_data = json.loads(body) if body else {}
+			name = body_data.get('room') or uuid.uuid4().hex[:8]
+			if not isinstance(name, str) or len(name) > MAX_ROOM_NAME:
+				return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid room name'}), {'Content-Type': 'application/json'})
+			room = self.create_room(name)
+			if room is None:
+				return self.response(409, 'Conflict', json.dumps({'status': 'Error', 'message': 'Room already exists or server is full'}), {'Content-Type': 'application/json'})
+			return self.response(200, 'OK', json.dumps({'status': 'OK', 'room': room.name}), {'Content-Type': 'application/json'})
 
 		"""
 		Game Authentication
@@ -123,27 +385,46 @@ class HttpServer:
 			body_data = json.loads(body)
 			player_id = body_data.get('player_id')
 			player_id = int(player_id) if player_id is not None else None
-			if player_id and player_id not in player_states:
-				player_states[player_id] = {
-					'position': [0, 0],
-					'health': 100,
-					'facing_right': True,
-					'is_attacking': False,
-					'is_hit': False
-				}
-				print(f"Player {player_id} joined. State: {player_states[player_id]}")
-				return self.response(200, 'OK', json.dumps({'status': 'OK'}), {'Content-Type': 'application/json'})
-			elif player_id and player_id in player_states:
-				print(f"Player {player_id} already exists!")
-				return self.response(409, 'Conflict', json.dumps({'status': 'Error', 'message': 'Player ID already in use'}), {'Content-Type': 'application/json'})
-			return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid player ID'}), {'Content-Type': 'application/json'})
+			name = self.room_name(headers, query)
+			if name not in self.rooms and body_data.get('create') and len(name) <= MAX_ROOM_NAME:
+				# join-or-create, supaya client cukup menyebut nama room
+				self.create_room(name)
+			room = self.rooms.get(name)
+			if room is None or room.closed:
+				return self.response(404, 'Not Found', json.dumps({'status': 'Error', 'message': 'Room not found'}), {'Content-Type': 'application/json'})
+			if not player_id or player_id > room.players.max_player_id:
+				return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid player ID'}), {'Content-Type': 'application/json'})
+			if room.join(player_id):
+				print(f"Player {player_id} joined room {room.name}. State: {room.players.get(player_id)}")
+				# 'formats' dan 'udp_port' dipakai client untuk negosiasi encoding dan transport state,
+				# 'sync' berarti server mendukung POST /sync (state + dunia dalam satu request)
+				result = {'status': 'OK', 'room': room.name, 'formats': ['application/json', wire_protocol.CONTENT_TYPE], 'sync': True}
+				if self.udp_port:
+					result['udp_port'] = self.udp_port
+					result['room_number'] = room.number
+				if room.hits is not None:
+					# hit dihitung server dan dikirim sebagai 'hits' di snapshot
+					result['server_hits'] = True
+				if room.simulation:
+					result['authoritative'] = True
+					result['tick_rate'] = room.simulation.tick_rate
+				return self.response(200, 'OK', json.dumps(result), {'Content-Type': 'application/json'})
+			if room.closed:
+				# room dihapus (pemain terakhir keluar) tepat sebelum join
+				return self.response(404, 'Not Found', json.dumps({'status': 'Error', 'message': 'Room not found'}), {'Content-Type': 'application/json'})
+			print(f"Player {player_id} already exists!")
+			return self.response(409, 'Conflict', json.dumps({'status': 'Error', 'message': 'Player ID already in use'}), {'Content-Type': 'application/json'})
 
 		elif path == '/leave_game':
 			body_data = json.loads(body)
 			player_id = body_data.get('player_id')
 			player_id = int(player_id) if player_id is not None else None
-			if player_id and player_id in player_states:
-				del player_states[player_id]
+			room = self.get_room(headers, query)
+			if room is None:
+				return self.response(404, 'Not Found', json.dumps({'status': 'Error', 'message': 'Room not found'}), {'Content-Type': 'application/json'})
+			if player_id and room.leave(player_id):
+				# room kosong dibersihkan (kecuali room default)
+				self.remove_room(room)
 				return self.response(204, 'OK', json.dumps({'status': 'OK'}), {'Content-Type': 'application/json'})
 			return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid player ID'}), {'Content-Type': 'application/json'})
 
@@ -152,24 +433,177 @@ class HttpServer:
 		Game State Management
 		Manajemen state dari masing-masing pemain
 		"""
+		room = self.get_room(headers, query)
+		if room is None:
+			return self.response(404, 'Not Found', json.dumps({'status': 'Error', 'message': 'Room not found'}), {'Content-Type': 'application/json'})
+
 		if path == '/set_player_state':
-			body_data = json.loads(body)
-			player_id = body_data.get('id')
-			player_id = int(player_id) if player_id is not None else None
-			state_data = body_data.get('state')
-			if player_id:
-				player_states[player_id] = {
-					'position': state_data.get('position', [0, 0]),
-					'health': state_data.get('health', 100),
-					'facing_right': state_data.get('facing_right', True),
-					'is_attacking': state_data.get('is_attacking', False),
-					'is_hit': state_data.get('is_hit', False)
-				}
+			if room.simulation:
+				return self.response(403, 'Forbidden', json.dumps({'status': 'Error', 'message': 'Server is authoritative, use /send_input'}), {'Content-Type': 'application/json'})
+			if self.get_header(headers, 'content-type') == wire_protocol.CONTENT_TYPE:
+				try:
+					player_id, state_data, _ = wire_protocol.decode_state(body)
+					view_version = None
+					if len(body) >= wire_protocol.RECORD.size + wire_protocol.VIEW_VERSION.size:
+						view_version = wire_protocol.VIEW_VERSION.unpack_from(body, wire_protocol.RECORD.size)[0]
+				except Exception:
+					return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid state record'}), {'Content-Type': 'application/json'})
+			else:
+				body_data = json.loads(body)
+				player_id = body_data.get('id')
+				player_id = int(player_id) if player_id is not None else None
+				state_data = body_data.get('state')
+				# versi dunia yang dilihat client, untuk lag compensation hit
+				view_version = body_data.get('view_version')
+				view_version = int(view_version) if view_version is not None else None
+			if player_id and player_id in room.players:
+				room.update_player_state(player_id, state_data, view_version)
 				return self.response(200, 'OK', json.dumps({'status': 'OK'}), {'Content-Type': 'application/json'})
 			return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid player ID'}), {'Content-Type': 'application/json'})
 
+		elif path == '/send_input':
+			# Mode server-authoritative: client hanya mengirim tombol yang ditekan
+			if not room.simulation:
+				return self.response(409, 'Conflict', json.dumps({'status': 'Error', 'message': 'Server simulation is not running'}), {'Content-Type': 'application/json'})
+			if self.get_header(headers, 'content-type') == wire_protocol.CONTENT_TYPE:
+				try:
+					player_id, seq, buttons, dt = wire_protocol.decode_input(body)
+				except Exception:
+					return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid input record'}), {'Content-Type': 'application/json'})
+			else:
+				body_data = json.loads(body)
+				player_id = body_data.get('id')
+				player_id = int(player_id) if player_id is not None else None
+				seq = int(body_data.get('seq', 0))
+				buttons = int(body_data.get('buttons', 0))
+				dt = float(body_data.get('dt', 0))
+			if player_id and player_id in room.players:
+				room.simulation.queue_input(player_id, seq, buttons, dt)
+				return self.response(200, 'OK', json.dumps({'status': 'OK'}), {'Content-Type': 'application/json'})
+			return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid player ID'}), {'Content-Type': 'application/json'})
+
+		elif path == '/sync':
+			# Satu request per frame: state (atau input) pemain lokal masuk, delta dunia keluar.
+			# since sekaligus view_version untuk lag compensation, seperti kanal UDP
+			if self.get_header(headers, 'content-type') == wire_protocol.CONTENT_TYPE:
+				try:
+					player_id, since, state_data, inputs = wire_protocol.decode_sync(body)
+				except Exception:
+					return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid sync record'}), {'Content-Type': 'application/json'})
+			else:
+				body_data = json.loads(body)
+				player_id = body_data.get('id')
+				player_id = int(player_id) if player_id is not None else None
+				since = body_data.get('since')
+				since = int(since) if since is not None else None
+				state_data = body_data.get('state')
+				inputs = body_data.get('inputs')
+				if inputs is not None:
+					inputs = [(int(seq), int(buttons), float(dt)) for seq, buttons, dt in inputs]
+			if not player_id or player_id not in room.players:
+				return self.response(400, 'Bad Request', json.dumps({'status': 'Error', 'message': 'Invalid player ID'}), {'Content-Type': 'application/json'})
+			# Mode server-authoritative hanya memakai input, mode biasa hanya state
+			simulation = room.simulation
+			if simulation and inputs:
+				for seq, buttons, dt in inputs:
+					simulation.queue_input(player_id, seq, buttons, dt)
+			elif not simulation and state_data is not None:
+				room.update_player_state(player_id, state_data, since)
+			radius = parse_qs(query).get('radius', [None])[0]
+			radius = float(radius) if radius is not None else self.view_radius
+			world = room.world_delta(since, player_id, radius)
+			if self.accepts_binary(headers):
+				return self.response(200, 'OK', wire_protocol.encode_world(world), {'Content-Type': wire_protocol.CONTENT_TYPE})
+			return self.response(200, 'OK', json.dumps(world), {'Content-Type': 'application/json'})
+
 		return self.response(404, 'Not Found', 'Endpoint not found', {})
 
 
+def parse_range(value, size):
+	"""
+	(offset, panjang) untuk header Range "bytes=a-b" / "bytes=a-" / "bytes=-n".
+	None = abaikan (bukan bytes atau banyak range, kirim seluruh file),
+	False = range tidak bisa dipenuhi (416).
+	"""
+	unit, _, spec = value.partition('=')
+	if unit.strip().lower() != 'bytes' or ',' in spec:
+		return None
+	start, _, end = spec.strip().partition('-')
+	try:
+		if not start:
+			suffix = int(end)
+			if suffix <= 0:
+				return False
+			start = max(0, size - suffix)
+			end = size - 1
+		else:
+			start = int(start)
+			end = min(int(end), size - 1) if end else size - 1
+	except ValueError:
+		return None
+	if start >= size or end < start:
+		return False
+	return start, end - start + 1
+
+
+class FileResponse:
+	r"""
+	Response untuk file besar: server mengirim `head`, lalu `length` byte file
+	mulai `offset` dengan socket.sendfile / loop.sendfile (tanpa menyalin isi
+	file ke Python), lalu \r\n\r\n seperti response lain.
+	"""
+	def __init__(self, head, path, offset, length):
+		self.head = head
+		self.path = path
+		self.offset = offset
+		self.length = length
+
+	def read_body(self):
+		"""Isi file sebagai bytes, untuk pemanggil yang tidak punya socket."""
+		with open(self.path, 'rb') as f:
+			f.seek(self.offset)
+			return f.read(self.length)
+
+
+class Subscription:
+	"""
+	Hasil proses() untuk /subscribe. Server (thread maupun asyncio) mengirim
+	headers() sekali lalu next_chunk() setiap kali versi dunia naik.
+	Setiap chunk berisi delta sejak chunk sebelumnya (chunk pertama snapshot penuh).
+	"""
+	def __init__(self, room, binary=False, since=None, viewer=None, radius=None):
+		self.room = room
+		self.viewer = viewer
+		self.radius = radius
+		self.binary = binary
+		self.version = since
+
+	def headers(self):
+		content_type = wire_protocol.CONTENT_TYPE if self.binary else 'application/json'
+		return ("HTTP/1.1 200 OK\r\n"
+			"Server: myserver/1.0\r\n"
+			"Content-Type: {}\r\n"
+			"Transfer-Encoding: chunked\r\n"
+			"Cache-Control: no-cache\r\n\r\n").format(content_type).encode()
+
+	def has_update(self):
+		return self.version is None or self.room.world_version > self.version
+
+	def next_chunk(self):
+		world = self.room.world_delta(self.version, self.viewer, self.radius)
+		self.version = world['version']
+		if self.binary:
+			body = wire_protocol.encode_world(world)
+		else:
+			body = json.dumps(world).encode()
+		return "{:x}\r\n".format(len(body)).encode() + body + b"\r\n"
+
+	def wait_chunk(self, timeout=None):
+		"""Blocking, untuk server thread. None jika tidak ada perubahan sampai timeout."""
+		if not self.room.wait_for_version(self.version, timeout):
+			return None
+		return self.next_chunk()
+
+
 if __name__=="__main__":
 	httpserver = HttpServer()
\ No newline at end of file
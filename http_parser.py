@@ -0,0 +1,117 @@
+r"""
+Parser HTTP request inkremental berbasis bytes.
+
+Data dari recv() langsung dimasukkan ke feed(); parser menyimpan sisa data di
+bytearray, membaca header sekali, memotong body sesuai Content-Length, dan
+mengembalikan semua request lengkap (termasuk beberapa request pipelined dalam
+satu recv). Baris kosong sebelum request line dilewati, karena ClientInterface
+menambahkan \r\n\r\n setelah setiap request.
+"""
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class ParseError(Exception):
+	pass
+
+
+class Request:
+	__slots__ = ('method', 'target', 'version', 'headers', 'body')
+
+	def __init__(self, method, target, version, headers, body):
+		self.method = method
+		self.target = target
+		self.version = version
+		# nama header lowercase -> value
+		self.headers = headers
+		self.body = body
+
+	def __repr__(self):
+		return "Request({} {} body={}B)".format(self.method, self.target, len(self.body))
+
+
+class RequestParser:
+	def __init__(self, max_header_size=MAX_HEADER_SIZE, max_body_size=MAX_BODY_SIZE):
+		self.buffer = bytearray()
+		self.max_header_size = max_header_size
+		self.max_body_size = max_body_size
+		# request yang header-nya sudah dibaca dan sedang menunggu body
+		self.pending = None
+		self.body_length = 0
+		# posisi awal pencarian \r\n\r\n, supaya buffer tidak di-scan ulang tiap recv
+		self.scan_from = 0
+
+	def in_progress(self):
+		"""True jika ada request yang baru diterima sebagian."""
+		return self.pending is not None or bool(self.buffer.strip(b"\r\n"))
+
+	def feed(self, data):
+		"""Tambahkan bytes dari socket, return list Request yang sudah lengkap."""
+		self.buffer += data
+		requests = []
+		buffer = self.buffer
+		view = memoryview(buffer)
+		offset = 0
+		try:
+			while True:
+				if self.pending is None:
+					# lewati baris kosong sebelum request line
+					while buffer[offset:offset + 2] == b"\r\n":
+						offset += 2
+					header_end = buffer.find(b"\r\n\r\n", max(offset, self.scan_from))
+					if header_end < 0:
+						if len(buffer) - offset > self.max_header_size:
+							raise ParseError("header too large")
+						# 3 byte terakhir bisa jadi awal \r\n\r\n yang terpotong
+						self.scan_from = max(offset, len(buffer) - 3)
+						break
+					self.pending = self.parse_head(bytes(view[offset:header_end]))
+					offset = header_end + 4
+					self.scan_from = 0
+
+				if len(buffer) - offset < self.body_length:
+					break
+				body = bytes(view[offset:offset + self.body_length])
+				offset += self.body_length
+				method, target, version, headers = self.pending
+				requests.append(Request(method, target, version, headers, body))
+				self.pending = None
+				self.body_length = 0
+		finally:
+			view.release()
+			if offset:
+				scan_shift = self.scan_from - offset
+				del buffer[:offset]
+				self.scan_from = max(0, scan_shift)
+		return requests
+
+	def parse_head(self, head):
+		lines = head.split(b"\r\n")
+		parts = lines[0].split(b" ")
+		if len(parts) != 3:
+			raise ParseError("bad request line")
+		try:
+			method = parts[0].decode('ascii').upper()
+			target = parts[1].decode('ascii')
+			version = parts[2].decode('ascii')
+		except UnicodeDecodeError:
+			raise ParseError("bad request line")
+
+		headers = {}
+		for line in lines[1:]:
+			name, sep, value = line.partition(b":")
+			if not sep:
+				raise ParseError("bad header line")
+			headers[name.strip().lower().decode('latin-1')] = value.strip().decode('latin-1')
+
+		length = headers.get('content-length')
+		self.body_length = 0
+		if length is not None:
+			try:
+				self.body_length = int(length)
+			except ValueError:
+				raise ParseError("bad content-length")
+			if self.body_length < 0 or self.body_length > self.max_body_size:
+				raise ParseError("bad content-length")
+		return method, target, version, headers
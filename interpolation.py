@@ -0,0 +1,74 @@
+"""
+Interpolasi snapshot untuk pemain remote.
+
+Setiap snapshot dunia yang diterima disimpan bersama waktu terimanya.
+Pemain remote digambar `delay` detik di masa lalu, di antara dua snapshot
+yang mengapit waktu itu, sehingga gerakannya tetap halus di 60 FPS walaupun
+update dari server hanya datang 10-20 kali per detik. Jika snapshot berikutnya
+terlambat, posisi diekstrapolasi dengan kecepatan terakhir paling lama
+`max_extrapolation` detik, lalu berhenti di tempat.
+"""
+from collections import deque
+
+# minimal dua interval update (20 Hz), ditambah sedikit ruang untuk jitter
+INTERPOLATION_DELAY = 0.1
+MAX_EXTRAPOLATION = 0.1
+BUFFER_SIZE = 32
+# lompatan lebih jauh dari ini (respawn) tidak diinterpolasi
+TELEPORT_DISTANCE = 150
+
+
+def delay_for_rate(rate):
+    """Delay render untuk update `rate` Hz: dua interval, minimal INTERPOLATION_DELAY."""
+    return max(INTERPOLATION_DELAY, 2.0 / rate) if rate else INTERPOLATION_DELAY
+
+
+class SnapshotBuffer:
+    """Posisi (x, y) satu pemain remote menurut waktu terima snapshot."""
+
+    def __init__(self, delay=INTERPOLATION_DELAY, max_extrapolation=MAX_EXTRAPOLATION, size=BUFFER_SIZE):
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+        # (waktu, x, y), waktu selalu naik
+        self.samples = deque(maxlen=size)
+
+    def push(self, at, position):
+        if self.samples and at <= self.samples[-1][0]:
+            return
+        self.samples.append((at, position[0], position[1]))
+
+    def clear(self):
+        self.samples.clear()
+
+    def sample(self, now):
+        """Posisi untuk digambar pada waktu `now` (digambar `delay` detik di belakang), None jika belum ada data."""
+        samples = self.samples
+        if not samples:
+            return None
+        render_at = now - self.delay
+        # buang snapshot yang sudah lewat; dua terakhir selalu disimpan untuk ekstrapolasi
+        while len(samples) > 2 and samples[1][0] <= render_at:
+            samples.popleft()
+
+        t0, x0, y0 = samples[0]
+        if render_at <= t0 or len(samples) == 1:
+            return (x0, y0)
+        t1, x1, y1 = samples[1]
+        if render_at > t1:
+            return self.extrapolate(samples[-2], samples[-1], render_at)
+        if self.teleported(x0, y0, x1, y1):
+            return (x0, y0)
+        f = (render_at - t0) / (t1 - t0)
+        return (x0 + (x1 - x0) * f, y0 + (y1 - y0) * f)
+
+    def extrapolate(self, previous, last, render_at):
+        """Lanjutkan dengan kecepatan dua snapshot terakhir, paling lama max_extrapolation."""
+        t0, x0, y0 = previous
+        t1, x1, y1 = last
+        if self.teleported(x0, y0, x1, y1):
+            return (x1, y1)
+        ahead = min(render_at - t1, self.max_extrapolation)
+        return (x1 + (x1 - x0) / (t1 - t0) * ahead, y1 + (y1 - y0) / (t1 - t0) * ahead)
+
+    def teleported(self, x0, y0, x1, y1):
+        return abs(x1 - x0) > TELEPORT_DISTANCE or abs(y1 - y0) > TELEPORT_DISTANCE
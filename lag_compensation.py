@@ -0,0 +1,101 @@
+"""
+Resolusi serangan pedang di server dengan lag compensation.
+
+Client (mode non-authoritative) melihat pemain lain pada versi dunia terakhir
+yang ia terima, bukan posisi terbaru di server. Karena itu setiap pemain
+punya jejak posisi pendek (versi, waktu, x, y); saat state penyerang masuk,
+korban "diputar mundur" ke versi yang dilihat penyerang (view_version) lalu
+diuji terhadap hitbox pedang dari game_rules.sword_rect. Rewind dibatasi
+MAX_REWIND detik supaya client tidak bisa mengklaim view yang terlalu lama.
+
+Hasilnya berupa hit event (versi, attacker, victim) yang dikirim ke client
+bersama snapshot; korban menerapkan damage sendiri (Player.check_if_hit).
+"""
+from collections import deque
+import game_rules
+
+TRAIL_SIZE = 64
+MAX_REWIND = 0.25
+EVENT_LOG_SIZE = 256
+
+# jarak maksimum pusat pemain ke pusat pedang + gerak selama rewind, untuk query grid
+REACH = (game_rules.SWORD_OFFSET_X + game_rules.SWORD_HEIGHT + game_rules.PLAYER_WIDTH
+	+ game_rules.PLAYER_SPEED * MAX_REWIND)
+
+
+class HitResolver:
+	def __init__(self):
+		# player_id -> deque (version, waktu, x, y)
+		self.trails = {}
+		# attacker_id -> set korban pada serangan yang sedang berjalan
+		self.attacks = {}
+		# (version, attacker_id, victim_id)
+		self.events = deque(maxlen=EVENT_LOG_SIZE)
+
+	def record(self, player_id, version, x, y, now):
+		trail = self.trails.get(player_id)
+		if trail is None:
+			trail = deque(maxlen=TRAIL_SIZE)
+			self.trails[player_id] = trail
+		trail.append((version, now, x, y))
+
+	def forget(self, player_id):
+		self.trails.pop(player_id, None)
+		self.attacks.pop(player_id, None)
+		# event lama tidak boleh terkirim ke pemain baru yang memakai id yang sama
+		if any(victim_id == player_id for _, _, victim_id in self.events):
+			self.events = deque((event for event in self.events if event[2] != player_id), maxlen=EVENT_LOG_SIZE)
+
+	def rewind(self, player_id, view_version, now):
+		"""Posisi (x, y) pemain pada view_version, paling lama MAX_REWIND detik lalu."""
+		trail = self.trails.get(player_id)
+		if not trail:
+			return None
+		limit = now - MAX_REWIND
+		chosen = trail[-1]
+		if view_version is None:
+			return chosen[2], chosen[3]
+		for entry in reversed(trail):
+			chosen = entry
+			if entry[0] <= view_version or entry[1] <= limit:
+				break
+		return chosen[2], chosen[3]
+
+	def resolve(self, attacker_id, state, view_version, candidates, now):
+		"""
+		Uji pedang penyerang terhadap candidates ({id: state saat ini}).
+		Return daftar id korban baru pada serangan ini.
+		"""
+		if not state.get('is_attacking', False):
+			self.attacks.pop(attacker_id, None)
+			return []
+		hit_during_attack = self.attacks.setdefault(attacker_id, set())
+		x, y = state.get('position', (0, 0))
+		attack_rect = game_rules.sword_rect(x, y, state.get('facing_right', True), True)
+		victims = []
+		for victim_id, victim in candidates.items():
+			if victim_id == attacker_id or victim_id in hit_during_attack:
+				continue
+			position = self.rewind(victim_id, view_version, now)
+			if position is None:
+				continue
+			victim_rect = (position[0], position[1], game_rules.PLAYER_WIDTH, game_rules.PLAYER_HEIGHT)
+			if game_rules.rects_collide(attack_rect, victim_rect):
+				hit_during_attack.add(victim_id)
+				if not victim['shield_active'] and victim['health'] > 0:
+					victims.append(victim_id)
+		return victims
+
+	def log(self, version, attacker_id, victims):
+		for victim_id in victims:
+			self.events.append((version, attacker_id, victim_id))
+
+	def events_since(self, since):
+		"""[[version, attacker, victim], ...] untuk event setelah versi `since`."""
+		hits = []
+		for version, attacker_id, victim_id in reversed(self.events):
+			if version <= since:
+				break
+			hits.append([version, attacker_id, victim_id])
+		hits.reverse()
+		return hits
@@ -0,0 +1,285 @@
+"""
+Load test dengan bot headless yang memakai ClientInterface (protokol sama
+persis dengan main_multiplayer.py).
+
+Setiap bot join, lalu pada setiap frame (--rate Hz) mengirim state hasil
+gerak acak (atau input jika server authoritative) dan menerima dunia dalam
+satu request /sync (--no-sync: set_player_state/send_input lalu
+get_world_state), kemudian leave. Bot dinyalakan bertahap
+selama --ramp detik; latensi hanya dihitung setelah semua bot berjalan.
+Setiap angka di --bots adalah satu tahap, hasilnya satu baris ringkasan
+(dan satu objek di file --json untuk dibandingkan antar versi).
+
+    python3 loadtest.py --bots 50 200 1000 --duration 20 --json hasil.json
+    python3 loadtest.py --server async --bots 200 --wire-format binary --udp
+    python3 loadtest.py --connect 127.0.0.1:8885 --bots 50
+
+Tanpa --connect, server (lihat bench_server.SERVERS) dijalankan sebagai
+subprocess. Bot dibagi ke --procs proses supaya generator beban (GIL) tidak
+menjadi bottleneck; bot dalam satu proses berjalan di thread masing-masing.
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+import game_rules
+from bench_server import SERVERS, wait_for_port
+from clientInterface import ClientInterface
+from metrics import Histogram
+
+OPERATIONS = ('join', 'sync', 'set_player_state', 'send_input', 'world_state', 'leave')
+# peluang bot mulai menyerang pada satu frame
+ATTACK_CHANCE = 0.02
+
+
+class OpStats:
+	"""Hitungan dan histogram latensi per operasi (bisa digabung antar proses)."""
+	def __init__(self):
+		self.latency = {op: Histogram() for op in OPERATIONS}
+		self.errors = {op: 0 for op in OPERATIONS}
+		self.lock = threading.Lock()
+
+	def record(self, op, seconds, ok, measured=True):
+		if not measured:
+			return
+		with self.lock:
+			if ok:
+				self.latency[op].observe(seconds)
+			else:
+				self.errors[op] += 1
+
+	def merge(self, other):
+		for op in OPERATIONS:
+			self.latency[op].merge(other.latency[op])
+			self.errors[op] += other.errors[op]
+
+	def __getstate__(self):
+		return {'latency': self.latency, 'errors': self.errors}
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.lock = threading.Lock()
+
+
+class Bot(threading.Thread):
+	def __init__(self, player_id, options, start_at, measure_from, stop_at, stats):
+		self.player_id = player_id
+		self.options = options
+		self.start_at = start_at
+		self.measure_from = measure_from
+		self.stop_at = stop_at
+		self.stats = stats
+		threading.Thread.__init__(self, daemon=True)
+
+	def timed(self, op, call, *args):
+		started = time.perf_counter()
+		result = call(*args)
+		# join dan leave selalu dihitung, operasi per frame hanya setelah ramp selesai
+		measured = op in ('join', 'leave') or started >= self.measure_from
+		self.stats.record(op, time.perf_counter() - started, result is not None and result is not False, measured)
+		return result
+
+	def run(self):
+		options = self.options
+		delay = self.start_at - time.perf_counter()
+		if delay > 0:
+			time.sleep(delay)
+		client = ClientInterface(options['address'], wire_format=options['wire_format'], use_udp=options['udp'],
+			use_push=options['push'], room=options['room'], view_radius=options['view_radius'])
+		if not self.timed('join', client.join_game, self.player_id):
+			return
+
+		x = random.uniform(0, game_rules.ARENA_WIDTH - game_rules.PLAYER_WIDTH)
+		y = random.uniform(0, game_rules.ARENA_HEIGHT - game_rules.PLAYER_HEIGHT)
+		angle = random.uniform(0, 2 * math.pi)
+		attack_left = 0.0
+		input_seq = 0
+		interval = 1.0 / options['rate']
+		next_frame = time.perf_counter()
+		while time.perf_counter() < self.stop_at:
+			# gerak lurus, memantul di tepi arena, kadang berbelok dan menyerang
+			if random.random() < 0.05:
+				angle += random.uniform(-1.0, 1.0)
+			vx = math.cos(angle) * game_rules.PLAYER_SPEED
+			vy = math.sin(angle) * game_rules.PLAYER_SPEED
+			x += vx * interval
+			y += vy * interval
+			if not 0 <= x <= game_rules.ARENA_WIDTH - game_rules.PLAYER_WIDTH:
+				angle = math.pi - angle
+				x = min(max(x, 0), game_rules.ARENA_WIDTH - game_rules.PLAYER_WIDTH)
+			if not 0 <= y <= game_rules.ARENA_HEIGHT - game_rules.PLAYER_HEIGHT:
+				angle = -angle
+				y = min(max(y, 0), game_rules.ARENA_HEIGHT - game_rules.PLAYER_HEIGHT)
+			if attack_left <= 0 and random.random() < ATTACK_CHANCE:
+				attack_left = game_rules.ATTACK_DURATION
+			attack_left -= interval
+
+			state = None
+			inputs = None
+			if client.authoritative:
+				buttons = ((game_rules.INPUT_RIGHT if vx > 0 else game_rules.INPUT_LEFT)
+					| (game_rules.INPUT_DOWN if vy > 0 else game_rules.INPUT_UP))
+				if attack_left > 0:
+					buttons |= game_rules.INPUT_ATTACK
+				input_seq += 1
+				inputs = [(input_seq, buttons, interval)]
+			else:
+				state = {'position': [round(x, 1), round(y, 1)], 'health': game_rules.MAX_HEALTH,
+					'facing_right': vx >= 0, 'is_attacking': attack_left > 0, 'is_hit': False,
+					'shield_active': False, 'attacker_id': None}
+
+			if options['sync']:
+				# seperti main_multiplayer: satu request /sync per frame
+				self.timed('sync', client.sync, self.player_id, state, inputs)
+			else:
+				if inputs:
+					self.timed('send_input', client.send_input, self.player_id, *inputs[0])
+				else:
+					self.timed('set_player_state', client.set_player_state, self.player_id, state)
+				self.timed('world_state', client.get_world_state)
+
+			next_frame += interval
+			delay = next_frame - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+			else:
+				# tertinggal: lewati frame, jangan mengejar
+				next_frame = time.perf_counter()
+		self.timed('leave', client.leave_game)
+
+
+def run_bots(player_ids, options, ramp, duration, queue=None):
+	"""Jalankan bot untuk player_ids (di satu proses), return OpStats."""
+	logging.disable(logging.CRITICAL)
+	stats = OpStats()
+	now = time.perf_counter()
+	measure_from = now + ramp
+	stop_at = measure_from + duration
+	step = ramp / len(player_ids) if player_ids else 0
+	bots = [Bot(player_id, options, now + index * step, measure_from, stop_at, stats)
+		for index, player_id in enumerate(player_ids)]
+	for bot in bots:
+		bot.start()
+	for bot in bots:
+		bot.join()
+	if queue is not None:
+		queue.put(stats)
+	return stats
+
+
+def run_stage(bots, options, ramp, duration, procs, first_id):
+	player_ids = list(range(first_id, first_id + bots))
+	procs = max(1, min(procs, bots))
+	if procs == 1:
+		return run_bots(player_ids, options, ramp, duration)
+	queue = multiprocessing.Queue()
+	workers = [multiprocessing.Process(target=run_bots, args=(player_ids[i::procs], options, ramp, duration, queue))
+		for i in range(procs)]
+	for worker in workers:
+		worker.start()
+	stats = OpStats()
+	for _ in workers:
+		stats.merge(queue.get())
+	for worker in workers:
+		worker.join()
+	return stats
+
+
+def summarize(bots, stats, duration, rate):
+	result = {'bots': bots, 'rate_hz': rate, 'duration': duration, 'ops': {}}
+	total = 0
+	errors = 0
+	for op in OPERATIONS:
+		histogram = stats.latency[op]
+		count = histogram.total + stats.errors[op]
+		if not count:
+			continue
+		total += histogram.total
+		errors += stats.errors[op]
+		result['ops'][op] = {
+			'count': histogram.total,
+			'errors': stats.errors[op],
+			'error_rate': stats.errors[op] / count,
+			'p50_ms': histogram.quantile(0.5) * 1000,
+			'p95_ms': histogram.quantile(0.95) * 1000,
+			'p99_ms': histogram.quantile(0.99) * 1000,
+		}
+	frame_op = 'sync' if 'sync' in result['ops'] else 'world_state'
+	frame_ops = result['ops'].get(frame_op, {}).get('count', 0)
+	result['throughput'] = total / duration
+	result['error_rate'] = errors / (total + errors) if total + errors else 0.0
+	# frame per detik yang benar-benar dicapai tiap bot (target: rate_hz)
+	result['frame_hz'] = frame_ops / duration / bots if bots else 0.0
+	return result
+
+
+def print_result(result):
+	print("bots={bots:<5} ops/s={throughput:>9.0f} frame_hz={frame_hz:5.1f}/{rate_hz} errors={error_rate:.2%}".format(**result))
+	for op, data in result['ops'].items():
+		print("    {:<17} n={count:<8} p50={p50_ms:7.2f}ms p95={p95_ms:7.2f}ms p99={p99_ms:7.2f}ms errors={errors}".format(op, **data))
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--bots', nargs='+', type=int, default=[50, 200, 1000], help="jumlah bot per tahap")
+	parser.add_argument('--rate', type=float, default=60, help="frame per detik tiap bot (main_multiplayer: 60)")
+	parser.add_argument('--ramp', type=float, default=5.0, help="lama menyalakan semua bot (detik)")
+	parser.add_argument('--duration', type=float, default=10.0, help="lama pengukuran setelah ramp (detik)")
+	parser.add_argument('--procs', type=int, default=multiprocessing.cpu_count(), help="jumlah proses generator beban")
+	parser.add_argument('--first-id', type=int, default=1)
+	parser.add_argument('--wire-format', default='json', choices=['json', 'binary'])
+	parser.add_argument('--udp', action='store_true')
+	parser.add_argument('--push', action='store_true')
+	parser.add_argument('--no-sync', action='store_true', help="kirim state dan ambil dunia dengan dua request terpisah")
+	parser.add_argument('--room')
+	parser.add_argument('--view-radius', type=float)
+	parser.add_argument('--connect', help="host:port server yang sudah berjalan")
+	parser.add_argument('--server', default='thread', choices=list(SERVERS), help="server yang dijalankan jika tanpa --connect")
+	parser.add_argument('--server-args', default='', help="argumen tambahan untuk server, misal \"--workers 256 --max-connections 2048\"")
+	parser.add_argument('--port', type=int, default=18885)
+	parser.add_argument('--json', help="simpan hasil ke file JSON")
+	args = parser.parse_args()
+
+	proc = None
+	if args.connect:
+		host, _, port = args.connect.rpartition(':')
+		address = (host, int(port))
+	else:
+		address = ('127.0.0.1', args.port)
+		command = [sys.executable, SERVERS[args.server], '--port', str(args.port),
+			'--udp-port', str(args.port + 1) if args.udp else '0', '--log-level', 'ERROR'] + shlex.split(args.server_args)
+		proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+		if not wait_for_port(args.port):
+			proc.terminate()
+			raise SystemExit("{} did not start on port {}".format(args.server, args.port))
+
+	options = {'address': address, 'wire_format': args.wire_format, 'udp': args.udp, 'push': args.push,
+		'room': args.room, 'view_radius': args.view_radius, 'rate': args.rate, 'sync': not args.no_sync}
+	results = []
+	try:
+		for bots in args.bots:
+			stats = run_stage(bots, options, args.ramp, args.duration, args.procs, args.first_id)
+			result = summarize(bots, stats, args.duration, args.rate)
+			result.update({'server': args.connect or args.server, 'wire_format': args.wire_format,
+				'udp': args.udp, 'push': args.push, 'sync': not args.no_sync})
+			print_result(result)
+			results.append(result)
+	finally:
+		if proc is not None:
+			proc.terminate()
+			proc.wait()
+
+	if args.json:
+		with open(args.json, 'w') as f:
+			json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+	main()
@@ -3,8 +3,12 @@ import sys
 import socket
 import logging
 import json
+import argparse
 
 from player import Player
+import game_rules
+import interpolation
+from sprite_cache import sprites
 
 from clientInterface import ClientInterface
 
@@ -166,8 +170,31 @@ def draw_controls_info(screen):
             text_surface = font.render(control, True, color)
         screen.blit(text_surface, (10, 10 + i * 20))
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Knightly Battle multiplayer client")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8885)
+    parser.add_argument('--udp', action='store_true', help="kirim state dan terima snapshot lewat UDP")
+    parser.add_argument('--udp-port', type=int, default=None, help="port UDP tujuan (misal udp_shim.py), default dari server")
+    parser.add_argument('--push', action='store_true', help="terima update dunia lewat /subscribe (tanpa polling)")
+    parser.add_argument('--view-radius', type=float, default=None, help="hanya terima pemain dalam radius ini (area of interest)")
+    parser.add_argument('--room', default=None, help="nama room (dibuat jika belum ada), default room bersama")
+    parser.add_argument('--net-rate', type=float, default=20, help="update jaringan per detik (thread jaringan); pemain remote diinterpolasi")
+    parser.add_argument('--no-prediction', action='store_true', help="mode server-authoritative: tunggu snapshot server untuk gerak pemain lokal")
+    parser.add_argument('--blocking-network', action='store_true', help="sync di game loop (tanpa thread jaringan)")
+    parser.add_argument('--skip-asset-download', action='store_true', help="pakai folder assets lokal apa adanya")
+    return parser.parse_args()
+
 # --- Main Game Setup ---
 def main():
+    args = parse_args()
+    udp_address = (args.host, args.udp_port) if args.udp_port else None
+
+    def new_client():
+        return ClientInterface((args.host, args.port), wire_format='binary',
+                               use_udp=args.udp, udp_address=udp_address, use_push=args.push,
+                               room=args.room, view_radius=args.view_radius)
+
     pygame.init()
 
     # Screen and Display
@@ -176,6 +203,8 @@ def main():
     pygame.display.set_caption("Multiplayer Knight Game")
     clock = pygame.time.Clock()
     FPS = 60
+    # pemain remote digambar sekitar dua interval update di belakang (interpolation.py)
+    interpolation_delay = interpolation.delay_for_rate(FPS if args.blocking_network else args.net_rate)
 
     # Show main menu first
     menu_choice = show_main_menu(screen)
@@ -188,6 +217,11 @@ def main():
     BLUE = (0, 0, 255)
 
     # --- Assets ---
+    # Gambar diambil dari server (GET /assets/), hanya file yang berubah
+    if not args.skip_asset_download:
+        updated = new_client().download_assets('assets')
+        if updated:
+            print(f"Downloaded {updated} asset(s) from server")
     try:
         background_image = pygame.image.load('assets/images/bg.png').convert()
         background_image = pygame.transform.scale(background_image, (WIDTH, HEIGHT))
@@ -197,23 +231,15 @@ def main():
     
     KNIGHT_ANIMATION_FOLDER = 'assets/images/knight'
 
-    walls = []
-
-    # 4 Corner Walls
-    walls.append(pygame.Rect(0, 0, 10, HEIGHT))
-    walls.append(pygame.Rect(WIDTH - 10, 0, 10, HEIGHT))
-    walls.append(pygame.Rect(0, 0, WIDTH, 10))
-    walls.append(pygame.Rect(0, HEIGHT - 10, WIDTH, 10))
+    # Semua gambar Player dimuat sekali di sini; pemain baru di tengah game tidak membaca disk
+    usage = sprites.preload()
+    print(f"Sprites loaded: {usage['surfaces']} surfaces, {usage['bytes'] // 1024} KiB")
 
-    # Extra Walls
-    scaling_factor = 2.307
-    walls.append(pygame.Rect(130*scaling_factor, 0, 5*scaling_factor, 45*scaling_factor))
-    walls.append(pygame.Rect(130*scaling_factor, 45*scaling_factor, 98*scaling_factor, 5*scaling_factor))
-    walls.append(pygame.Rect(145*scaling_factor, 103*scaling_factor, 115*scaling_factor, 5*scaling_factor))
-    walls.append(pygame.Rect(0, 210*scaling_factor, 160*scaling_factor, 5*scaling_factor))
+    # Tembok arena sama dengan yang dipakai simulasi server (game_rules)
+    walls = [pygame.Rect(wall) for wall in game_rules.arena_walls(WIDTH, HEIGHT)]
 
     # --- Multiplayer Setup ---
-    client = ClientInterface()
+    client = new_client()
     
     # Show main menu
     menu_result = show_main_menu(screen)
@@ -228,19 +254,23 @@ def main():
         
         # Try to join the game
         if client.join_game(selected_id):
-            player_id = selected_id
+            player_id = int(selected_id)
             print(f"Successfully joined as Player {player_id}")
         else:
             print(f"Failed to join as Player {selected_id}. ID may already be in use.")
             # Show error message for taken ID
             show_id_taken_error(screen, selected_id)
             # Reset client for next attempt
-            client = ClientInterface()
+            client = new_client()
+
+    if not args.blocking_network:
+        client.start_network(player_id, interval=1 / args.net_rate)
 
     # Create the local player
     local_player = Player(id=player_id, x=100, y=100, 
                           animation_folder=KNIGHT_ANIMATION_FOLDER, 
-                          client_interface=client, is_remote=False)
+                          client_interface=client, is_remote=False,
+                          predict=not args.no_prediction)
 
     # Dictionary to hold all players
     all_players = {player_id: local_player}
@@ -261,8 +291,12 @@ def main():
 
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r and game_over:
-                    all_players[player_id].respawn(x=100, y=100)
-                    client.set_player_state(player_id, all_players[player_id].get_state_dict())
+                    if client.authoritative:
+                        # respawn dijalankan oleh simulasi server
+                        all_players[player_id].respawn_requested = True
+                    else:
+                        # state baru terkirim lewat sync di frame ini
+                        all_players[player_id].respawn(x=100, y=100)
                     game_over = False
                     game_over_time = None
                 elif event.key == pygame.K_ESCAPE:
@@ -273,7 +307,7 @@ def main():
                         running = False
                     elif menu_choice == "play":
                         # Restart multiplayer
-                        client = ClientInterface()
+                        client = new_client()
                         # Try to join with selected ID, loop until successful
                         player_id = None
                         while player_id is None:
@@ -281,47 +315,70 @@ def main():
                             
                             # Try to join the game
                             if client.join_game(selected_id):
-                                player_id = selected_id
+                                player_id = int(selected_id)
                                 print(f"Successfully joined as Player {player_id}")
                             else:
                                 print(f"Failed to join as Player {selected_id}. ID may already be in use.")
                                 show_id_taken_error(screen, selected_id)
                                 # Reset client for next attempt
-                                client = ClientInterface()
+                                client = new_client()
                         
+                        if not args.blocking_network:
+                            client.start_network(player_id, interval=1 / args.net_rate)
+
                         # Create new local player
                         local_player = Player(id=player_id, x=100, y=100, 
                                               animation_folder=KNIGHT_ANIMATION_FOLDER, 
-                                              client_interface=client, is_remote=False)
+                                              client_interface=client, is_remote=False,
+                                              predict=not args.no_prediction)
                         all_players = {player_id: local_player}
                         game_over = False
                         game_over_time = None
                         start_time = pygame.time.get_ticks()
 
-        # --- Update Remote Players ---
-        # Dapatkan daftar semua ID pemain dari server
-        all_ids_from_server = client.get_all_player_ids()
-        # Tambahkan pemain baru yang belum ada di 'all_players'
-        for p_id in all_ids_from_server:
-            if p_id not in all_players:
-                print(f"New player {p_id} has joined.")
-                all_players[p_id] = Player(id=p_id, x=0, y=0, 
-                                           animation_folder=KNIGHT_ANIMATION_FOLDER, 
-                                           client_interface=client, is_remote=True)
-        
-        # Hapus pemain yang keluar
-        current_ids_in_game = list(all_players.keys())
-        for p_id in current_ids_in_game:
-            if p_id not in all_ids_from_server and p_id != player_id:
-                print(f"Player {p_id} has left.")
-                del all_players[p_id]
-
         # --- Update All Players ---
         for p in all_players.values():
             p.update(dt, walls, all_players)
 
+        # --- Update Remote Players ---
+        # Satu request per frame: state (atau input) pemain lokal dikirim dan
+        # state semua pemain diterima dalam response yang sama
+        local_player = all_players[player_id]
+        if client.network:
+            # Thread jaringan yang menunggu response; None = belum ada snapshot baru
+            world_state = client.network.exchange(state=local_player.get_state_dict(), inputs=local_player.pop_inputs())
+        else:
+            world_state = client.sync(player_id, state=local_player.get_state_dict(), inputs=local_player.pop_inputs())
+        if world_state is not None:
+            # Tambahkan pemain baru yang belum ada di 'all_players'
+            for p_id in world_state:
+                if p_id not in all_players:
+                    print(f"New player {p_id} has joined.")
+                    all_players[p_id] = Player(id=p_id, x=0, y=0, 
+                                               animation_folder=KNIGHT_ANIMATION_FOLDER, 
+                                               client_interface=client, is_remote=True,
+                                               interpolation_delay=interpolation_delay)
+            
+            # Hapus pemain yang keluar
+            current_ids_in_game = list(all_players.keys())
+            for p_id in current_ids_in_game:
+                if p_id not in world_state and p_id != player_id:
+                    print(f"Player {p_id} has left.")
+                    del all_players[p_id]
+
+            # waktu terima snapshot untuk buffer interpolasi
+            received_at = client.network.read_at if client.network else None
+            for p_id, state in world_state.items():
+                if all_players[p_id].is_remote:
+                    all_players[p_id].update_from_state(state, received_at)
+            # Mode server-authoritative: state pemain lokal dari server (koreksi prediksi)
+            if client.authoritative and player_id in world_state:
+                all_players[player_id].update_from_state(world_state[player_id])
+
         if player_id in all_players:
-            all_players[player_id].check_if_hit(all_players)
+            # Mode server-authoritative: hit dihitung oleh server
+            if not client.authoritative:
+                all_players[player_id].check_if_hit(all_players)
             if all_players[player_id].health <= 0 and not game_over:
                 game_over = True
                 game_over_time = pygame.time.get_ticks()
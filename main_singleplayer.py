@@ -6,6 +6,9 @@ from player import Player
 class DummyClientInterface:
     """A mock client interface that does nothing. 
     Allows the Player class to run without a real server connection."""
+    authoritative = False
+    server_hits = False
+
     def set_player_state(self, player_id, state):
         pass  # Do nothing
 
@@ -0,0 +1,307 @@
+"""
+Metrik server berbiaya rendah untuk endpoint /metrics.
+
+Setiap request dicatat di RouteStats: jumlah per status, byte masuk (body
+request) dan keluar (response lengkap), dan latensi dalam Histogram dengan
+bucket eksponensial tetap. Persentil (p50/p95/p99) dihitung dari bucket saat
+/metrics dibaca, jadi biaya per request hanya satu bisect dan beberapa
+penjumlahan. Output memakai format teks Prometheus.
+
+AccessLog menggantikan log per request: hanya satu dari setiap `sample`
+request yang disimpan, di ring buffer berukuran tetap (GET /access_log).
+
+Pada server prefork setiap worker menulis ringkasan metriknya ke satu slot
+SharedMetrics (shared memory), sehingga /metrics di worker mana pun
+menjumlahkan semua worker dan counter tidak pernah mundur.
+"""
+import bisect
+import json
+import struct
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+# batas atas bucket latensi: 10 mikrodetik sampai ~10 detik, 4 bucket per kelipatan 2
+BUCKET_BOUNDS = [10e-6 * 2 ** (i / 4) for i in range(81)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+# path di luar daftar ini dicatat sebagai 'other' supaya jumlah label tetap terbatas
+ROUTES = ('/', '/rooms', '/connections', '/metrics', '/access_log', '/get_player_ids', '/get_player_state',
+	'/world_state', '/subscribe', '/create_room', '/join_game', '/leave_game', '/set_player_state', '/send_input',
+	'/sync', '/assets', 'udp')
+
+ACCESS_LOG_SIZE = 1024
+ACCESS_LOG_SAMPLE = 100
+
+# slot SharedMetrics per worker: panjang data (uint32) lalu JSON ringkasan metrik
+SLOT_HEADER = struct.Struct('<I')
+SLOT_SIZE = 64 * 1024
+# interval worker menyalin metriknya ke shared memory
+PUBLISH_INTERVAL = 1.0
+
+
+def label(value):
+	return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+	def __init__(self, bounds=BUCKET_BOUNDS):
+		self.bounds = bounds
+		# bucket terakhir untuk nilai di atas batas tertinggi
+		self.counts = [0] * (len(bounds) + 1)
+		self.total = 0
+		self.sum = 0.0
+
+	def observe(self, value):
+		self.counts[bisect.bisect_left(self.bounds, value)] += 1
+		self.total += 1
+		self.sum += value
+
+	def merge(self, other):
+		"""Tambahkan isi histogram lain (bucket sama), misal dari proses lain."""
+		self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+		self.total += other.total
+		self.sum += other.sum
+
+	def to_list(self):
+		return [self.counts, self.total, self.sum]
+
+	@classmethod
+	def from_list(cls, data):
+		histogram = cls()
+		histogram.counts, histogram.total, histogram.sum = data
+		return histogram
+
+	def quantile(self, q):
+		"""Batas atas bucket yang memuat persentil q, 0 jika belum ada data."""
+		if not self.total:
+			return 0.0
+		rank = q * self.total
+		seen = 0
+		for index, count in enumerate(self.counts):
+			seen += count
+			if seen >= rank and count:
+				return self.bounds[min(index, len(self.bounds) - 1)]
+		return self.bounds[-1]
+
+
+class RouteStats:
+	__slots__ = ('statuses', 'bytes_in', 'bytes_out', 'latency')
+
+	def __init__(self):
+		self.statuses = {}
+		self.bytes_in = 0
+		self.bytes_out = 0
+		self.latency = Histogram()
+
+	def merge(self, other):
+		for status, count in other.statuses.items():
+			self.statuses[status] = self.statuses.get(status, 0) + count
+		self.bytes_in += other.bytes_in
+		self.bytes_out += other.bytes_out
+		self.latency.merge(other.latency)
+
+	def to_list(self):
+		return [self.statuses, self.bytes_in, self.bytes_out, self.latency.to_list()]
+
+	@classmethod
+	def from_list(cls, data):
+		stats = cls()
+		stats.statuses, stats.bytes_in, stats.bytes_out, latency = data
+		stats.latency = Histogram.from_list(latency)
+		return stats
+
+
+class AccessLog:
+	def __init__(self, size=ACCESS_LOG_SIZE, sample=ACCESS_LOG_SAMPLE):
+		self.entries = deque(maxlen=size)
+		self.sample = sample
+		self.seen = 0
+
+	def record(self, method, target, status, seconds, bytes_out):
+		self.seen += 1
+		if self.sample and self.seen % self.sample == 0:
+			self.entries.append((time.time(), method, target, status, round(seconds * 1000, 3), bytes_out))
+
+	def recent(self, limit=None):
+		entries = list(self.entries)
+		if limit is not None:
+			entries = entries[-limit:]
+		return [{'time': at, 'method': method, 'target': target, 'status': status, 'ms': ms, 'bytes': size}
+			for at, method, target, status, ms, size in entries]
+
+
+class SharedMetrics:
+	"""
+	Satu slot shared memory per worker prefork, dibuat sebelum fork.
+	Slot hanya ditulis oleh worker pemiliknya; lock (multiprocessing.Lock)
+	menjaga pembaca tidak melihat slot yang setengah tertulis.
+	"""
+	def __init__(self, lock, workers, slot_size=SLOT_SIZE):
+		self.lock = lock
+		self.workers = workers
+		self.slot_size = slot_size
+		size = slot_size * workers
+		self.shm = shared_memory.SharedMemory(create=True, size=size)
+		self.buf = self.shm.buf
+		self.buf[:size] = bytes(size)
+
+	def close(self):
+		self.buf = None
+		self.shm.close()
+
+	def unlink(self):
+		self.shm.unlink()
+
+	def publish(self, index, data):
+		if SLOT_HEADER.size + len(data) > self.slot_size:
+			raise ValueError("metrics snapshot too large ({} bytes)".format(len(data)))
+		offset = index * self.slot_size
+		with self.lock:
+			if self.buf is None:
+				# sudah ditutup (proses sedang berhenti)
+				return
+			self.buf[offset + SLOT_HEADER.size:offset + SLOT_HEADER.size + len(data)] = data
+			SLOT_HEADER.pack_into(self.buf, offset, len(data))
+
+	def read_all(self):
+		"""Isi slot setiap worker yang sudah pernah menulis."""
+		slots = []
+		with self.lock:
+			for index in range(self.workers):
+				offset = index * self.slot_size
+				length = SLOT_HEADER.unpack_from(self.buf, offset)[0]
+				if length:
+					slots.append(bytes(self.buf[offset + SLOT_HEADER.size:offset + SLOT_HEADER.size + length]))
+		return slots
+
+
+class Metrics:
+	def __init__(self, access_log_sample=ACCESS_LOG_SAMPLE):
+		self.lock = threading.Lock()
+		self.routes = {}
+		self.tick = Histogram()
+		self.access_log = AccessLog(sample=access_log_sample)
+		self.started = time.time()
+		# SharedMetrics dan nomor slot worker ini (server prefork), lihat share()
+		self.shared = None
+		self.worker = None
+		# statistik koneksi terakhir, ikut disalin ke shared memory
+		self.connections = None
+
+	def share(self, shared, worker, connections=None):
+		"""
+		Salin metrik worker ini ke slot `worker` di SharedMetrics setiap
+		PUBLISH_INTERVAL detik; render() lalu menjumlahkan semua slot.
+		connections: objek dengan stats() (misal ConnectionStats).
+		"""
+		self.shared = shared
+		self.worker = worker
+		self.connections = connections
+		self.publish()
+		threading.Thread(target=self.publish_loop, daemon=True).start()
+
+	def publish_loop(self):
+		while True:
+			time.sleep(PUBLISH_INTERVAL)
+			self.publish()
+
+	def publish(self):
+		with self.lock:
+			data = {'started': self.started,
+				'routes': {route: stats.to_list() for route, stats in self.routes.items()},
+				'tick': self.tick.to_list()}
+		data['connections'] = self.connections.stats() if self.connections is not None else None
+		self.shared.publish(self.worker, json.dumps(data, separators=(',', ':')).encode())
+
+	def collect(self):
+		"""(started, routes, tick, connections) dijumlahkan dari semua worker."""
+		# slot sendiri ditulis dulu supaya ikut terbaru; slot worker lain paling lama PUBLISH_INTERVAL
+		self.publish()
+		started = self.started
+		routes = {}
+		tick = Histogram()
+		connections = {}
+		for slot in self.shared.read_all():
+			data = json.loads(slot)
+			started = min(started, data['started'])
+			for route, values in data['routes'].items():
+				stats = RouteStats.from_list(values)
+				if route in routes:
+					routes[route].merge(stats)
+				else:
+					routes[route] = stats
+			tick.merge(Histogram.from_list(data['tick']))
+			for name, value in (data['connections'] or {}).items():
+				connections[name] = connections.get(name, 0) + value
+		return started, routes, tick, connections
+
+	def route_of(self, target):
+		path = target.split('?', 1)[0]
+		if path.startswith('/assets'):
+			# satu label untuk semua file aset
+			return '/assets'
+		return path if path in ROUTES else 'other'
+
+	def observe(self, method, target, status, seconds, bytes_in, bytes_out):
+		route = self.route_of(target)
+		with self.lock:
+			stats = self.routes.get(route)
+			if stats is None:
+				stats = RouteStats()
+				self.routes[route] = stats
+			stats.statuses[status] = stats.statuses.get(status, 0) + 1
+			stats.bytes_in += bytes_in
+			stats.bytes_out += bytes_out
+			stats.latency.observe(seconds)
+			self.access_log.record(method, target, status, seconds, bytes_out)
+
+	def observe_tick(self, seconds):
+		with self.lock:
+			self.tick.observe(seconds)
+
+	def render(self, connections=None, rooms=()):
+		"""Teks format Prometheus. connections: dict stats koneksi, rooms: list Room."""
+		if self.shared is not None:
+			started, routes, tick, connections = self.collect()
+			return self.render_lines(started, sorted(routes.items()), tick, connections, rooms)
+		with self.lock:
+			return self.render_lines(self.started, sorted(self.routes.items()), self.tick, connections, rooms)
+
+	def render_lines(self, started, routes, tick, connections, rooms):
+		lines = ['# TYPE knight_uptime_seconds gauge',
+			'knight_uptime_seconds {:.3f}'.format(time.time() - started)]
+		lines.append('# TYPE knight_requests_total counter')
+		for route, stats in routes:
+			for status, count in sorted(stats.statuses.items()):
+				lines.append('knight_requests_total{{route="{}",status="{}"}} {}'.format(route, status, count))
+		lines.append('# TYPE knight_request_bytes_total counter')
+		for route, stats in routes:
+			lines.append('knight_request_bytes_total{{route="{}",direction="in"}} {}'.format(route, stats.bytes_in))
+			lines.append('knight_request_bytes_total{{route="{}",direction="out"}} {}'.format(route, stats.bytes_out))
+		lines.append('# TYPE knight_request_duration_seconds summary')
+		for route, stats in routes:
+			lines.extend(self.summary('knight_request_duration_seconds', stats.latency, 'route="{}"'.format(route)))
+		lines.append('# TYPE knight_tick_duration_seconds summary')
+		lines.extend(self.summary('knight_tick_duration_seconds', tick))
+
+		if connections:
+			lines.append('# TYPE knight_connections gauge')
+			for name, value in sorted(connections.items()):
+				lines.append('knight_connections{{state="{}"}} {}'.format(name, value))
+		lines.append('# TYPE knight_players gauge')
+		for room in rooms:
+			lines.append('knight_players{{room="{}"}} {}'.format(label(room.name), len(room.players)))
+		lines.append('# TYPE knight_world_version gauge')
+		for room in rooms:
+			lines.append('knight_world_version{{room="{}"}} {}'.format(label(room.name), room.world_version))
+		return '\n'.join(lines) + '\n'
+
+	def summary(self, name, histogram, labels=''):
+		separator = ',' if labels else ''
+		lines = ['{}{{{}{}quantile="{}"}} {:.6f}'.format(name, labels, separator, q, histogram.quantile(q)) for q in QUANTILES]
+		suffix = '{{{}}}'.format(labels) if labels else ''
+		lines.append('{}_sum{} {:.6f}'.format(name, suffix, histogram.sum))
+		lines.append('{}_count{} {}'.format(name, suffix, histogram.total))
+		return lines
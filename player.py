@@ -1,34 +1,42 @@
 import pygame
-import os
+import time
+
+import game_rules
+import interpolation
+import prediction
+import sprite_cache
+from sprite_cache import sprites
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, id, x, y, animation_folder, client_interface, is_remote=False):
+    def __init__(self, id, x, y, animation_folder, client_interface, is_remote=False,
+                 interpolation_delay=interpolation.INTERPOLATION_DELAY, predict=True):
         super().__init__()
         self.id = id
         self.client_interface = client_interface
         self.is_remote = is_remote
-
-        self.sword_image = pygame.image.load('assets/images/sword.png').convert_alpha()
-        self.sword_image = pygame.transform.scale(self.sword_image, (self.sword_image.get_width() * 2, self.sword_image.get_height() * 2))
-        self.original_sword_image = self.sword_image
-        self.sword_offset_x = 40
-        self.sword_offset_y = 10
+        # Pemain remote digambar sedikit di masa lalu, di antara dua snapshot server
+        self.snapshots = interpolation.SnapshotBuffer(interpolation_delay) if is_remote else None
+
+        # Surface dipakai bersama semua Player (sprite_cache), tidak dimuat ulang per pemain
+        self.sword_image = sprites.image(sprite_cache.SWORD_IMAGE, sprite_cache.SPRITE_SCALE)
+        self.sword_offset_x = game_rules.SWORD_OFFSET_X
+        self.sword_offset_y = game_rules.SWORD_OFFSET_Y
+        # 4 pose pedang (arah x menyerang) dihitung sekali; render dan hitbox cukup lookup tabel
+        self.sword_poses = sprites.sword_poses(offset_x=self.sword_offset_x, offset_y=self.sword_offset_y)
         self.is_attacking = False
-        self.attack_duration = 0.25
+        self.attack_duration = game_rules.ATTACK_DURATION
         self.attack_timer = 0
         self.hit_during_attack = set()
+        self.attacker_id = None
 
-        self.max_health = 6
+        self.max_health = game_rules.MAX_HEALTH
         self.health = self.max_health
         self.is_hit = False
-        self.hit_duration = 0.2
+        self.hit_duration = game_rules.HIT_DURATION
         self.hit_timer = 0
-        self.heart_full = pygame.image.load('assets/images/heart/ui_heart_full.png').convert_alpha()
-        self.heart_half = pygame.image.load('assets/images/heart/ui_heart_half.png').convert_alpha()
-        self.heart_empty = pygame.image.load('assets/images/heart/ui_heart_empty.png').convert_alpha()
-        self.heart_full = pygame.transform.scale(self.heart_full, (32, 32))
-        self.heart_half = pygame.transform.scale(self.heart_half, (32, 32))
-        self.heart_empty = pygame.transform.scale(self.heart_empty, (32, 32))
+        self.heart_full = sprites.image(sprite_cache.HEART_IMAGES['full'], size=sprite_cache.HEART_SIZE)
+        self.heart_half = sprites.image(sprite_cache.HEART_IMAGES['half'], size=sprite_cache.HEART_SIZE)
+        self.heart_empty = sprites.image(sprite_cache.HEART_IMAGES['empty'], size=sprite_cache.HEART_SIZE)
 
         self.animation_frames = self.load_animation_frames(animation_folder)
         if not self.animation_frames:
@@ -40,30 +48,28 @@ class Player(pygame.sprite.Sprite):
 
         self.animation_speed = 10
         self.animation_timer = 0
-        self.speed = 200
+        self.speed = game_rules.PLAYER_SPEED
         self.velocity = pygame.math.Vector2(0, 0)
         self.facing_right = True
         self.display_name = f"Player {self.id}"
-        self.name_font = pygame.font.SysFont("Arial", 16, bold=True)
+        self.name_font = sprites.font("Arial", 16, bold=True)
         self.kill_score = 0
         self.shield_active = False
-        self.shield_duration = 1.5
+        self.shield_duration = game_rules.SHIELD_DURATION
         self.shield_timer = 0
-        self.shield_cooldown = 5.0
+        self.shield_cooldown = game_rules.SHIELD_COOLDOWN
         self.shield_cooldown_timer = 0
+        # Mode server-authoritative: nomor urut input dan permintaan respawn ke server
+        self.input_seq = 0
+        self.respawn_requested = False
+        # input yang belum dikirim; game loop mengirimnya lewat ClientInterface.sync
+        self.pending_inputs = []
+        # Prediksi gerak lokal + rekonsiliasi dengan snapshot server (mode server-authoritative)
+        self.predict = predict and not is_remote
+        self.predictor = None
 
     def load_animation_frames(self, folder_path):
-        frames = []
-        file_names = sorted([f for f in os.listdir(folder_path) if f.startswith('knight_m_run_anim') and f.endswith('.png')])
-        for file_name in file_names:
-            img_path = os.path.join(folder_path, file_name)
-            try:
-                img = pygame.image.load(img_path).convert_alpha()
-                img = pygame.transform.scale(img, (img.get_width() * 2, img.get_height() * 2))
-                frames.append(img)
-            except pygame.error as e:
-                print(f"Error loading frame {img_path}: {e}")
-        return frames
+        return sprites.frames(folder_path, sprite_cache.KNIGHT_RUN_PREFIX)
 
     def get_state_dict(self):
         """Mengembalikan state pemain sebagai dictionary untuk dikirim ke server."""
@@ -82,23 +88,36 @@ class Player(pygame.sprite.Sprite):
 
         return state
 
-    def update_from_state(self, state_dict):
+    def update_from_state(self, state_dict, received_at=None):
         """Memperbarui atribut pemain dari dictionary state yang diterima dari server."""
         if not state_dict:
             return
-        self.rect.topleft = state_dict.get('position', self.rect.topleft)
+        if self.predictor is not None:
+            # pemain lokal: state server dipakai sebagai koreksi prediksi, bukan langsung digambar
+            self.predictor.reconcile(state_dict)
+            self.apply_prediction()
+            return
+        if self.snapshots is not None and 'position' in state_dict:
+            # posisi diterapkan bertahap di update() lewat interpolasi
+            self.snapshots.push(received_at if received_at is not None else time.monotonic(), state_dict['position'])
+        else:
+            self.rect.topleft = state_dict.get('position', self.rect.topleft)
         self.health = state_dict.get('health', self.health)
         self.facing_right = state_dict.get('facing_right', self.facing_right)
         self.is_attacking = state_dict.get('is_attacking', self.is_attacking)
         self.is_hit = state_dict.get('is_hit', self.is_hit)
         self.shield_active = state_dict.get('shield_active', self.shield_active)
+        self.attacker_id = state_dict.get('attacker_id')
 
     def update(self, dt, walls, all_players):
         if self.is_remote:
-            state = self.client_interface.get_player_state(self.id)
-            if state:
-                self.update_from_state(state)
-            self.update_animation(dt, moving=True) 
+            # State pemain remote diisi dari world_state oleh game loop (update_from_state)
+            position = self.snapshots.sample(time.monotonic())
+            if position is not None:
+                self.rect.topleft = (round(position[0]), round(position[1]))
+            self.update_animation(dt, moving=True)
+        elif self.client_interface.authoritative:
+            self.update_authoritative(dt, walls)
         else:
 
             keys = pygame.key.get_pressed()
@@ -158,8 +177,57 @@ class Player(pygame.sprite.Sprite):
             self.rect.y += self.velocity.y * dt
             self.handle_collision(walls, 'vertical')
             self.update_animation(dt, moving)
-
-            self.client_interface.set_player_state(self.id, self.get_state_dict())
+            # state dikirim game loop bersama permintaan dunia (ClientInterface.sync)
+
+    def read_input_buttons(self):
+        """Tombol yang ditekan sebagai bit INPUT_* (game_rules) untuk dikirim ke server."""
+        keys = pygame.key.get_pressed()
+        buttons = 0
+        if keys[pygame.K_LEFT]: buttons |= game_rules.INPUT_LEFT
+        if keys[pygame.K_RIGHT]: buttons |= game_rules.INPUT_RIGHT
+        if keys[pygame.K_UP]: buttons |= game_rules.INPUT_UP
+        if keys[pygame.K_DOWN]: buttons |= game_rules.INPUT_DOWN
+        if keys[pygame.K_x]: buttons |= game_rules.INPUT_ATTACK
+        if keys[pygame.K_z]: buttons |= game_rules.INPUT_SHIELD
+        if self.respawn_requested:
+            buttons |= game_rules.INPUT_RESPAWN
+            self.respawn_requested = False
+        return buttons
+
+    def pop_inputs(self):
+        """Input sejak sync terakhir sebagai list (seq, tombol, dt)."""
+        inputs = self.pending_inputs
+        self.pending_inputs = []
+        return inputs
+
+    def update_authoritative(self, dt, walls):
+        """Server menjalankan simulasi: kirim input, gerak lokal hanya prediksi sampai snapshot server datang."""
+        buttons = self.read_input_buttons()
+        # dt dikirim dalam milidetik (wire_protocol); prediksi memakai dt yang sama dengan server
+        dt = round(dt, 3)
+        self.input_seq += 1
+        self.pending_inputs.append((self.input_seq, buttons, dt))
+        if self.predict:
+            if self.predictor is None:
+                self.predictor = prediction.Predictor(self.id, [tuple(wall) for wall in walls], *self.rect.topleft)
+            self.predictor.apply(self.input_seq, buttons, dt)
+            self.predictor.decay(dt)
+            self.apply_prediction()
+
+        movement = game_rules.INPUT_LEFT | game_rules.INPUT_RIGHT | game_rules.INPUT_UP | game_rules.INPUT_DOWN
+        moving = bool(buttons & movement) and not self.is_hit and self.health > 0
+        self.update_animation(dt, moving)
+
+    def apply_prediction(self):
+        sim = self.predictor.sim
+        x, y = self.predictor.position()
+        self.rect.topleft = (round(x), round(y))
+        self.health = sim.health
+        self.is_hit = sim.is_hit
+        self.facing_right = sim.facing_right
+        self.is_attacking = sim.is_attacking
+        self.shield_active = sim.shield_active
+        self.shield_cooldown_timer = sim.shield_cooldown_timer
 
     def perform_attack(self, all_players):
         attack_rect = self.get_sword_rect()
@@ -181,6 +249,13 @@ class Player(pygame.sprite.Sprite):
                     self.hit_during_attack.add(other_player.id)
 
     def check_if_hit(self, all_players):
+        if self.client_interface.server_hits:
+            # Hit sudah dihitung server (lag compensation), cukup terapkan event-nya
+            for attacker_id in self.client_interface.pop_hits():
+                print(f"Player {self.id} got hit by Player {attacker_id}")
+                self.register_hit()
+            return
+
         if self.is_hit: return
 
         for other_id, other_player in all_players.items():
@@ -188,8 +263,9 @@ class Player(pygame.sprite.Sprite):
                 continue
 
             if other_player.is_remote and other_player.is_attacking:
-                attacker_id = other_player.client_interface.get_player_state(other_id).get('attacker_id')
-                if attacker_id == self.id or other_id == self.id:
+                # attacker_id dari client lama bisa berupa string, encoding biner selalu angka
+                attacker_id = other_player.attacker_id
+                if str(attacker_id) == str(self.id) or other_id == self.id:
                     continue
 
                 attack_rect = other_player.get_sword_rect()
@@ -219,18 +295,9 @@ class Player(pygame.sprite.Sprite):
 
     def get_sword_render_info(self):
         """Helper to get sword image and rect for drawing and collision."""
-        sword_image_to_draw = self.original_sword_image
-        if not self.facing_right:
-            sword_image_to_draw = pygame.transform.flip(self.original_sword_image, True, False)
-
-        if self.is_attacking:
-            angle = -90 if self.facing_right else 90
-            sword_image_to_draw = pygame.transform.rotate(sword_image_to_draw, angle)
-
-        if self.facing_right:
-            sword_rect = sword_image_to_draw.get_rect(center=self.rect.center + pygame.math.Vector2(self.sword_offset_x, self.sword_offset_y))
-        else:
-            sword_rect = sword_image_to_draw.get_rect(center=self.rect.center - pygame.math.Vector2(self.sword_offset_x, -self.sword_offset_y))
+        sword_image_to_draw, dx, dy = self.sword_poses[(self.facing_right, self.is_attacking)]
+        sword_rect = pygame.Rect(self.rect.centerx + dx, self.rect.centery + dy,
+                                 sword_image_to_draw.get_width(), sword_image_to_draw.get_height())
         return sword_image_to_draw, sword_rect
 
     def update_animation(self, dt, moving=True):
@@ -263,17 +330,15 @@ class Player(pygame.sprite.Sprite):
 
         player_image_to_draw = self.image
         if not self.facing_right:
-            player_image_to_draw = pygame.transform.flip(self.image, True, False)
+            player_image_to_draw = sprites.variant(self.image, flip_x=True)
         screen.blit(player_image_to_draw, self.rect)
 
         if self.is_hit:
-            hit_surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
-            hit_surface.fill((255, 0, 0, 100)) # Red, semi-transparent
+            hit_surface = sprites.solid(self.rect.size, (255, 0, 0, 100)) # Red, semi-transparent
             screen.blit(hit_surface, self.rect.topleft)
         
         if self.shield_active:
-            shield_surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
-            shield_surface.fill((0, 200, 255, 100))  # Blue transparent
+            shield_surface = sprites.solid(self.rect.size, (0, 200, 255, 100))  # Blue transparent
             screen.blit(shield_surface, self.rect.topleft)
 
     def draw_health(self, screen):
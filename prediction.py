@@ -0,0 +1,109 @@
+"""
+Prediksi client dan rekonsiliasi untuk pemain lokal (mode server-authoritative).
+
+Setiap input langsung dijalankan di client dengan game_rules.PlayerSim yang
+sama dengan simulasi server, jadi gerak terasa tanpa menunggu RTT. Input
+disimpan bersama nomor urutnya sampai server mengakuinya lewat `input_seq`
+di snapshot. Saat snapshot datang, posisi server diambil sebagai titik awal
+lalu semua input yang belum diakui dijalankan ulang. Selisih antara posisi
+yang tadinya digambar dan hasil baru tidak langsung dilompati, melainkan
+dihilangkan bertahap (error correction) supaya koreksi kecil tidak terlihat.
+"""
+import math
+from collections import deque
+
+import game_rules
+
+# input belum diakui yang disimpan (lebih dari ini: server jauh tertinggal)
+MAX_PENDING_INPUTS = 256
+# selisih di bawah ini dianggap pembulatan posisi server (int)
+POSITION_TOLERANCE = 1.0
+# kecepatan hilangnya error koreksi (per detik, eksponensial)
+CORRECTION_RATE = 12.0
+# koreksi lebih jauh dari ini (respawn, lag besar) langsung dilompati
+SNAP_DISTANCE = 100
+
+
+class Predictor:
+    def __init__(self, player_id, walls, x=game_rules.SPAWN_POSITION[0], y=game_rules.SPAWN_POSITION[1]):
+        self.sim = game_rules.PlayerSim(player_id, x, y)
+        self.walls = walls
+        # (seq, vx, vy, dt, respawn, x, y): gerak setiap input dan posisi hasil prediksinya
+        self.pending = deque(maxlen=MAX_PENDING_INPUTS)
+        # offset gambar terhadap posisi prediksi, menuju 0
+        self.error_x = 0.0
+        self.error_y = 0.0
+        self.corrections = 0
+
+    def apply(self, seq, buttons, dt):
+        """Jalankan satu input secara lokal (tanpa hit, hit dihitung server)."""
+        sim = self.sim
+        # urutan sama dengan PlayerSim.apply_input: respawn dulu, lalu gerak jika bisa bergerak
+        respawn = bool(buttons & game_rules.INPUT_RESPAWN) and sim.health <= 0
+        can_move = respawn or (not sim.is_hit and sim.health > 0)
+        sim.apply_input(buttons, dt, self.walls)
+        sim.input_seq = seq
+        vx = vy = 0
+        if can_move:
+            if buttons & game_rules.INPUT_LEFT: vx = -game_rules.PLAYER_SPEED
+            if buttons & game_rules.INPUT_RIGHT: vx = game_rules.PLAYER_SPEED
+            if buttons & game_rules.INPUT_UP: vy = -game_rules.PLAYER_SPEED
+            if buttons & game_rules.INPUT_DOWN: vy = game_rules.PLAYER_SPEED
+        dt = max(0.0, min(dt, game_rules.MAX_INPUT_DT))
+        self.pending.append((seq, vx, vy, dt, respawn, sim.x, sim.y))
+
+    def reconcile(self, state):
+        """Terapkan state server (snapshot) lalu jalankan ulang input yang belum diakui."""
+        sim = self.sim
+        ack = state.get('input_seq', 0) or 0
+        acked = None
+        while self.pending and self.pending[0][0] <= ack:
+            acked = self.pending.popleft()
+
+        # hit dan health hanya dihitung server
+        was_hit = sim.is_hit
+        sim.health = state.get('health', sim.health)
+        sim.is_hit = state.get('is_hit', sim.is_hit)
+        if sim.is_hit and not was_hit:
+            sim.hit_timer = 0
+
+        if acked is not None:
+            predicted_x, predicted_y = acked[5], acked[6]
+        elif not self.pending:
+            predicted_x, predicted_y = sim.x, sim.y
+        else:
+            # snapshot belum memuat input baru, sudah direkonsiliasi sebelumnya
+            return
+        server_x, server_y = state.get('position', (predicted_x, predicted_y))
+        if abs(predicted_x - server_x) <= POSITION_TOLERANCE and abs(predicted_y - server_y) <= POSITION_TOLERANCE:
+            return
+
+        shown_x, shown_y = self.position()
+        x, y = float(server_x), float(server_y)
+        replayed = deque(maxlen=MAX_PENDING_INPUTS)
+        for seq, vx, vy, dt, respawn, _, _ in self.pending:
+            if respawn:
+                x, y = map(float, game_rules.SPAWN_POSITION)
+            x, y = game_rules.move_and_collide(x, y, vx, vy, dt, self.walls)
+            replayed.append((seq, vx, vy, dt, respawn, x, y))
+        self.pending = replayed
+        sim.x, sim.y = x, y
+        self.corrections += 1
+
+        # posisi gambar tidak melompat: selisihnya dihilangkan bertahap di decay()
+        self.error_x = shown_x - x
+        self.error_y = shown_y - y
+        if math.hypot(self.error_x, self.error_y) > SNAP_DISTANCE:
+            self.error_x = self.error_y = 0.0
+
+    def decay(self, dt):
+        """Kurangi error koreksi, dipanggil sekali per frame."""
+        factor = math.exp(-CORRECTION_RATE * dt)
+        self.error_x *= factor
+        self.error_y *= factor
+        if abs(self.error_x) < 0.5 and abs(self.error_y) < 0.5:
+            self.error_x = self.error_y = 0.0
+
+    def position(self):
+        """Posisi untuk digambar: prediksi ditambah sisa error koreksi."""
+        return (self.sim.x + self.error_x, self.sim.y + self.error_y)
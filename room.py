@@ -0,0 +1,236 @@
+"""
+Satu arena permainan di HttpServer.
+
+Setiap room punya state store, versi dunia + history delta, subscriber
+/subscribe, cache response, dan (mode server-authoritative) simulasinya
+sendiri. Request hanya menyentuh room-nya, sehingga biaya per request tidak
+bergantung pada jumlah pemain di room lain.
+"""
+from collections import deque
+import threading
+import time
+from state_store import StateStore
+from spatial_grid import SpatialGrid
+from lag_compensation import HitResolver, REACH
+
+# Jumlah versi terakhir yang disimpan untuk delta /world_state?since=N
+WORLD_HISTORY_SIZE = 1024
+
+RESPONSE_CACHE_SIZE = 1024
+
+# Hit event dari sekian versi terakhir ikut dikirim di snapshot penuh; client
+# membuang event yang versinya tidak lebih baru dari versi dunia miliknya
+FULL_SNAPSHOT_HIT_VERSIONS = WORLD_HISTORY_SIZE
+
+
+class Room:
+	def __init__(self, name, number):
+		self.name = name
+		# nomor kecil (uint16) untuk kanal UDP, lihat wire_protocol.UDP_ROUTE
+		self.number = number
+
+		# State semua pemain (lihat state_store.py)
+		self.players = StateStore()
+		# Posisi pemain untuk filter area of interest, diperbarui setiap state berubah.
+		# aoi_views: viewer -> (versi, set id yang terakhir dikirim ke viewer itu)
+		self.grid = SpatialGrid()
+		self.aoi_views = {}
+		# Jejak posisi dan hit event untuk resolusi serangan di server (lag_compensation.py)
+		self.hits = HitResolver()
+
+		# Versi dunia naik setiap kali isi self.players berubah.
+		# history berisi (version, changed_ids, joined_ids, left_ids)
+		self.world_version = 0
+		self.history = deque(maxlen=WORLD_HISTORY_SIZE)
+		self.version_changed = threading.Condition()
+		self.version_listeners = []
+
+		# Cache response per (alamat, biner) untuk satu versi dunia dan satu detik Date
+		self.response_cache = {}
+		self.cache_version = None
+		self.cache_second = None
+
+		# simulation.Simulation jika server berjalan dalam mode server-authoritative
+		self.simulation = None
+		# True setelah HttpServer.remove_room, join berikutnya ditolak
+		self.closed = False
+
+	def commit_change(self, changed=(), joined=(), left=()):
+		# lock store dipegang supaya versi dan history naik bersama perubahan state
+		with self.players.lock:
+			self.world_version += 1
+			self.history.append((self.world_version, frozenset(changed), frozenset(joined), frozenset(left)))
+		# bangunkan semua subscriber /subscribe
+		with self.version_changed:
+			self.version_changed.notify_all()
+		for listener in list(self.version_listeners):
+			listener(self.world_version)
+
+	def wait_for_version(self, version, timeout=None):
+		"""Tunggu sampai versi dunia lebih baru dari `version` (dipakai subscriber thread)."""
+		with self.version_changed:
+			return self.version_changed.wait_for(lambda: version is None or self.world_version > version, timeout)
+
+	def add_version_listener(self, listener):
+		"""listener(version) dipanggil setiap versi naik (dipakai server asyncio)."""
+		self.version_listeners.append(listener)
+
+	def remove_version_listener(self, listener):
+		if listener in self.version_listeners:
+			self.version_listeners.remove(listener)
+
+	def join(self, player_id):
+		"""Daftarkan pemain baru, False jika id sudah dipakai di room ini."""
+		with self.players.lock:
+			if self.closed:
+				return False
+			added = self.players.add(player_id)
+			if added:
+				x, y = self.players.get(player_id)['position']
+				if self.grid is not None:
+					self.grid.move(player_id, x, y)
+				self.commit_change(joined=[player_id])
+				if self.hits is not None:
+					self.hits.record(player_id, self.world_version, x, y, time.monotonic())
+		return added
+
+	def leave(self, player_id):
+		with self.players.lock:
+			removed = self.players.remove(player_id)
+			if removed:
+				if self.grid is not None:
+					self.grid.remove(player_id)
+				if self.hits is not None:
+					self.hits.forget(player_id)
+				self.aoi_views.pop(player_id, None)
+				self.commit_change(left=[player_id])
+		return removed
+
+	def update_player_state(self, player_id, state_data, view_version=None):
+		"""
+		Dipakai oleh /set_player_state (TCP) dan kanal UDP.
+		view_version: versi dunia yang sedang dilihat client, untuk rewind saat menyerang.
+		"""
+		with self.players.lock:
+			victims = []
+			if self.hits is not None and player_id in self.players:
+				victims = self.resolve_hits(player_id, state_data, view_version)
+			changed = self.publish_states({player_id: state_data})
+			if victims:
+				# hit event harus punya versi baru supaya ikut terkirim di delta berikutnya
+				if not changed:
+					self.commit_change()
+				self.hits.log(self.world_version, player_id, victims)
+
+	def resolve_hits(self, attacker_id, state_data, view_version):
+		candidates = {}
+		if state_data.get('is_attacking', False):
+			# hanya pemain di sekitar penyerang yang perlu diuji
+			x, y = state_data.get('position', (0, 0))
+			nearby = self.grid.query(x, y, REACH) if self.grid is not None else None
+			candidates = self.players.snapshot(nearby)
+		return self.hits.resolve(attacker_id, state_data, view_version, candidates, time.monotonic())
+
+	def publish_states(self, states):
+		"""
+		Tulis beberapa state pemain sekaligus sebagai satu versi dunia
+		(simulation.py mempublikasikan satu snapshot per tick lewat sini).
+		Return daftar id yang state-nya berubah.
+		"""
+		with self.players.lock:
+			# Versi hanya naik jika state benar-benar berubah
+			changed = self.players.update_many(states)
+			if changed:
+				self.commit_change(changed=changed)
+				now = time.monotonic()
+				for player_id in changed:
+					x, y = states[player_id].get('position', (0, 0))
+					if self.grid is not None:
+						self.grid.move(player_id, x, y)
+					if self.hits is not None:
+						self.hits.record(player_id, self.world_version, x, y, now)
+			return changed
+
+	def world_delta(self, since, viewer=None, radius=None):
+		"""
+		Perubahan sejak versi `since`: pemain yang berubah/bergabung dan yang keluar.
+		Jika `since` sudah tidak ada di history, kirim snapshot penuh.
+		Dengan viewer dan radius hanya pemain di sekitar viewer yang dikirim (aoi_delta).
+		"""
+		if viewer is not None and radius and self.grid is not None:
+			with self.players.lock:
+				if self.grid.position(viewer) is not None:
+					return self.aoi_delta(since, viewer, radius)
+		with self.players.lock:
+			oldest = self.history[0][0] if self.history else self.world_version + 1
+			if since is None or since > self.world_version or since < oldest - 1:
+				return {'status': 'OK', 'version': self.world_version, 'full': True,
+					'players': self.players.snapshot(), 'joined': [], 'left': [], 'hits': self.recent_hits()}
+
+			touched = set()
+			joined = set()
+			for version, changed_ids, joined_ids, left_ids in reversed(self.history):
+				if version <= since:
+					break
+				touched |= changed_ids | joined_ids | left_ids
+				joined |= joined_ids
+
+			players = self.players.snapshot(touched)
+			return {'status': 'OK', 'version': self.world_version, 'full': False,
+				'players': players,
+				'joined': [p_id for p_id in joined if p_id in players],
+				'left': [p_id for p_id in touched if p_id not in players],
+				# [version, attacker, victim] sejak versi since
+				'hits': self.hits.events_since(since) if self.hits is not None else []}
+
+	def recent_hits(self):
+		"""Hit event untuk snapshot penuh (client belum tentu menerima delta yang memuatnya)."""
+		if self.hits is None:
+			return []
+		return self.hits.events_since(max(0, self.world_version - FULL_SNAPSHOT_HIT_VERSIONS))
+
+	def aoi_delta(self, since, viewer, radius):
+		"""
+		world_delta yang difilter ke pemain dalam `radius` dari viewer.
+		Pemain yang baru masuk jangkauan dikirim utuh, yang keluar jangkauan
+		dilaporkan di 'left'. Delta hanya bisa dihitung jika `since` adalah versi
+		response terakhir untuk viewer ini; selain itu kirim snapshot penuh area.
+		"""
+		x, y = self.grid.position(viewer)
+		visible = self.grid.query(x, y, radius)
+		visible.add(viewer)
+		previous = self.aoi_views.get(viewer)
+		world = self.world_delta(since) if previous is not None and previous[0] == since else None
+		if world is None or world['full']:
+			world = {'status': 'OK', 'version': self.world_version, 'full': True,
+				'players': self.players.snapshot(visible), 'joined': [], 'left': [], 'hits': self.recent_hits()}
+		else:
+			seen = previous[1]
+			entered = visible - seen
+			world['players'] = self.players.snapshot((set(world['players']) & visible) | entered)
+			world['joined'] = [p_id for p_id in world['players'] if p_id in entered or p_id in world['joined']]
+			world['left'] = list(seen - visible)
+		self.aoi_views[viewer] = (world['version'], frozenset(visible))
+		return world
+
+	def cached_response(self, key, second):
+		"""Response yang sudah jadi untuk versi dunia dan detik Date saat ini, atau None."""
+		if self.cache_version != self.world_version or self.cache_second != second:
+			self.response_cache = {}
+			self.cache_version = self.world_version
+			self.cache_second = second
+			return None
+		return self.response_cache.get(key)
+
+	def store_response(self, key, version, hasil):
+		# jangan simpan jika dunia berubah selama response dibuat
+		if version != self.world_version or self.cache_version != version:
+			return
+		if len(self.response_cache) >= RESPONSE_CACHE_SIZE:
+			self.response_cache = {}
+		self.response_cache[key] = hasil
+
+	def close(self):
+		if self.simulation:
+			self.simulation.stop()
+			self.simulation = None
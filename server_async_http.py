@@ -0,0 +1,143 @@
+import asyncio
+import argparse
+import logging
+import http as game_http
+import http_parser
+from server_udp import UdpProtocol
+from metrics import ACCESS_LOG_SAMPLE
+from static_files import AssetStore
+from connection_manager import ConnectionStats, IDLE_TIMEOUT, READ_TIMEOUT, raise_open_file_limit
+
+httpserver = game_http.HttpServer()
+connections = ConnectionStats()
+httpserver.connections = connections
+
+HEADER_END = b"\r\n\r\n"
+
+
+async def process_the_client(reader, writer):
+	r"""
+	Satu coroutine per koneksi (pengganti ProcessTheClient thread).
+	Protokol sama persis dengan server_thread_http: request di-parse oleh
+	http_parser.RequestParser, response ditambah \r\n\r\n.
+	"""
+	address = writer.get_extra_info('peername')
+	logging.info("connection from {}".format(address))
+	connections.count('accepted')
+	parser = http_parser.RequestParser()
+	try:
+		while True:
+			# idle_timeout di antara request, read_timeout jika request baru terkirim sebagian
+			try:
+				data = await asyncio.wait_for(reader.read(65536), connections.timeout_for(parser))
+			except asyncio.TimeoutError:
+				connections.count('timed_out')
+				logging.info("connection {} timed out".format(address))
+				break
+			if not data:
+				break
+			try:
+				requests = parser.feed(data)
+			except http_parser.ParseError as e:
+				logging.warning("bad request from {}: {}".format(address, e))
+				writer.write(httpserver.response(400, 'Bad Request', '', {}) + HEADER_END)
+				break
+
+			subscription = None
+			for request in requests:
+				hasil = httpserver.proses_request(request.method, request.target, request.headers, request.body)
+				if isinstance(hasil, game_http.Subscription):
+					subscription = hasil
+					break
+				if isinstance(hasil, game_http.FileResponse):
+					await send_file(hasil, writer)
+					continue
+				writer.write(hasil + HEADER_END)
+			await writer.drain()
+			if subscription:
+				# koneksi dipakai untuk push sampai client menutupnya
+				await stream_subscription(subscription, reader, writer)
+				break
+	except ConnectionError as e:
+		logging.warning("connection {} dropped: {}".format(address, e))
+	finally:
+		connections.count('closed')
+		writer.close()
+
+
+async def send_file(hasil, writer):
+	# loop.sendfile memakai os.sendfile jika transport mendukung, jika tidak dibaca per potong
+	writer.write(hasil.head)
+	await writer.drain()
+	with open(hasil.path, 'rb') as f:
+		await asyncio.get_running_loop().sendfile(writer.transport, f, hasil.offset, hasil.length)
+	writer.write(HEADER_END)
+
+
+async def stream_subscription(subscription, reader, writer):
+	loop = asyncio.get_running_loop()
+	changed = asyncio.Event()
+	# commit_change bisa dipanggil dari thread lain (Simulation, UDP)
+	listener = lambda version: loop.call_soon_threadsafe(changed.set)
+	subscription.room.add_version_listener(listener)
+	# client tidak mengirim apa-apa lagi; read selesai (EOF) saat koneksi ditutup
+	closed = asyncio.ensure_future(reader.read(1))
+	try:
+		writer.write(subscription.headers())
+		while True:
+			if subscription.has_update():
+				writer.write(subscription.next_chunk())
+				await writer.drain()
+			waiter = asyncio.ensure_future(changed.wait())
+			await asyncio.wait((waiter, closed), return_when=asyncio.FIRST_COMPLETED)
+			if closed.done():
+				waiter.cancel()
+				break
+			changed.clear()
+	finally:
+		closed.cancel()
+		subscription.room.remove_version_listener(listener)
+
+
+async def serve(host='0.0.0.0', port=8885, backlog=1024, udp_port=None):
+	server = await asyncio.start_server(process_the_client, host, port, backlog=backlog, reuse_address=True)
+	if udp_port:
+		httpserver.udp_port = udp_port
+		await asyncio.get_running_loop().create_datagram_endpoint(lambda: UdpProtocol(httpserver), local_addr=(host, udp_port))
+	async with server:
+		await server.serve_forever()
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Knightly Battle server (asyncio event loop)")
+	parser.add_argument('--host', default='0.0.0.0')
+	parser.add_argument('--port', type=int, default=8885)
+	parser.add_argument('--backlog', type=int, default=1024)
+	parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT, help="tutup koneksi keep-alive yang menganggur selama ini (detik)")
+	parser.add_argument('--read-timeout', type=float, default=READ_TIMEOUT, help="batas tunggu sisa request yang baru terkirim sebagian (detik)")
+	parser.add_argument('--udp-port', type=int, default=8886, help="kanal UDP untuk state pemain, 0 = nonaktif")
+	parser.add_argument('--tick-rate', type=int, default=0, help="jalankan simulasi server-authoritative dengan tick rate ini, 0 = nonaktif")
+	parser.add_argument('--view-radius', type=float, default=0, help="radius area of interest default untuk snapshot per pemain, 0 = semua pemain")
+	parser.add_argument('--assets', help="folder aset untuk GET /assets/ (default: folder assets di samping server)")
+	parser.add_argument('--access-log-sample', type=int, default=ACCESS_LOG_SAMPLE, help="simpan 1 dari N request di /access_log, 0 = nonaktif")
+	parser.add_argument('--log-level', default='WARNING')
+	args = parser.parse_args()
+
+	logging.basicConfig(level=args.log_level.upper())
+	raise_open_file_limit()
+	print("Async Server Starting...")
+	httpserver.view_radius = args.view_radius
+	httpserver.metrics.access_log.sample = args.access_log_sample
+	if args.assets:
+		httpserver.assets = AssetStore(args.assets, httpserver.types)
+	connections.idle_timeout = args.idle_timeout
+	connections.read_timeout = args.read_timeout
+	if args.tick_rate:
+		httpserver.enable_simulation(args.tick_rate)
+	try:
+		asyncio.run(serve(args.host, args.port, args.backlog, args.udp_port))
+	except KeyboardInterrupt:
+		print("Server stopping...")
+
+if __name__=="__main__":
+	main()
@@ -0,0 +1,122 @@
+"""
+Server prefork: N proses worker menerima koneksi di port yang sama.
+
+Setiap worker menjalankan event loop server_async_http (protokol sama persis).
+Dengan SO_REUSEPORT tiap worker membuka socket sendiri dan kernel membagi
+koneksi baru; tanpa SO_REUSEPORT socket listen dibuat sekali lalu diwarisi
+worker lewat fork. State pemain room default ada di shared memory
+(shared_state.py), sehingga worker mana pun bisa membaca dan menulisnya.
+Metrik setiap worker disalin ke metrics.SharedMetrics, jadi /metrics di
+worker mana pun menampilkan jumlah semua worker.
+
+    python3 server_prefork_http.py --workers 4
+
+Batasan: hanya room default (state room lain tidak bisa dibagi antar proses)
+dan tanpa simulasi server-authoritative.
+"""
+import asyncio
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+import http as game_http
+from metrics import SharedMetrics
+from server_async_http import httpserver, connections, process_the_client, raise_open_file_limit
+from server_udp import UdpProtocol
+from shared_state import SharedStateStore, SharedRoom
+
+
+def listen_socket(host, port, backlog, reuse_port):
+	sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+	sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+	if reuse_port:
+		sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+	sock.bind((host, port))
+	sock.listen(backlog)
+	sock.setblocking(False)
+	return sock
+
+
+async def serve_worker(sock, host, udp_port):
+	server = await asyncio.start_server(process_the_client, sock=sock)
+	if udp_port:
+		# SO_REUSEPORT untuk UDP: paket dari satu client selalu masuk ke worker yang sama
+		await asyncio.get_running_loop().create_datagram_endpoint(lambda: UdpProtocol(httpserver),
+			local_addr=(host, udp_port), reuse_port=True)
+	async with server:
+		await server.serve_forever()
+
+
+def run_worker(index, sock, args, reuse_port, shared_metrics):
+	# Ctrl+C ditangani proses induk, worker dihentikan dengan SIGTERM
+	signal.signal(signal.SIGINT, signal.SIG_IGN)
+	if sock is None:
+		sock = listen_socket(args.host, args.port, args.backlog, reuse_port)
+	httpserver.default_room.start_watcher()
+	httpserver.metrics.share(shared_metrics, index, connections)
+	logging.warning("worker {} (pid {}) listening on {}:{}".format(index, os.getpid(), args.host, args.port))
+	try:
+		asyncio.run(serve_worker(sock, args.host, args.udp_port if reuse_port else 0))
+	except KeyboardInterrupt:
+		pass
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--host', default='0.0.0.0')
+	parser.add_argument('--port', type=int, default=8885)
+	parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+	parser.add_argument('--backlog', type=int, default=1024)
+	parser.add_argument('--max-players', type=int, default=1024, help="jumlah slot pemain di shared memory (id 1..N)")
+	parser.add_argument('--udp-port', type=int, default=8886, help="kanal UDP untuk state pemain, 0 = nonaktif")
+	parser.add_argument('--log-level', default='WARNING')
+	args = parser.parse_args()
+
+	logging.basicConfig(level=args.log_level.upper())
+	raise_open_file_limit()
+
+	# Lock, shared memory dan room dibuat sebelum fork supaya diwarisi semua worker
+	context = multiprocessing.get_context('fork')
+	store = SharedStateStore(context.RLock(), args.max_players)
+	httpserver.set_default_room(SharedRoom(game_http.DEFAULT_ROOM, 0, store))
+	shared_metrics = SharedMetrics(context.Lock(), args.workers)
+	# room lain hanya ada di satu proses, jadi tidak bisa dibuat
+	httpserver.max_rooms = 1
+
+	reuse_port = hasattr(socket, 'SO_REUSEPORT')
+	shared_sock = None
+	if not reuse_port:
+		shared_sock = listen_socket(args.host, args.port, args.backlog, False)
+	if args.udp_port and reuse_port:
+		httpserver.udp_port = args.udp_port
+
+	# SIGTERM (misal dari bench_server.py) juga membersihkan worker dan shared memory
+	signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+	print("Prefork Server Starting with {} workers...".format(args.workers))
+	workers = []
+	for index in range(args.workers):
+		worker = context.Process(target=run_worker, args=(index, shared_sock, args, reuse_port, shared_metrics))
+		worker.start()
+		workers.append(worker)
+	try:
+		for worker in workers:
+			worker.join()
+	except KeyboardInterrupt:
+		print("Server stopping...")
+	finally:
+		for worker in workers:
+			worker.terminate()
+		for worker in workers:
+			worker.join()
+		store.close()
+		store.unlink()
+		shared_metrics.close()
+		shared_metrics.unlink()
+
+if __name__=="__main__":
+	main()
@@ -1,93 +1,195 @@
 from socket import *
 import socket
 import threading
+import select
 import time
 import sys
 import logging
+import argparse
 import http as game_http
+import http_parser
+from server_udp import UdpServer
+from metrics import ACCESS_LOG_SAMPLE
+from static_files import AssetStore
+from connection_manager import (ConnectionManager, IDLE_TIMEOUT, READ_TIMEOUT, KEEP, CLOSE, DETACH,
+	raise_open_file_limit)
 
 httpserver = game_http.HttpServer()
 
 
-class ProcessTheClient(threading.Thread):
-	def __init__(self, connection, address):
-		self.connection = connection
-		self.address = address
-		threading.Thread.__init__(self)
+class ProcessTheClient:
+	"""
+	Melayani satu koneksi di thread worker ConnectionManager setiap kali
+	koneksi itu bisa dibaca: satu recv, jawab semua request yang sudah lengkap,
+	lalu kembalikan koneksi ke poller (KEEP) atau tutup (CLOSE).
+	"""
+	def __init__(self, client, manager):
+		self.client = client
+		self.connection = client.connection
+		self.address = client.address
+		self.manager = manager
 
 	def run(self):
-		rcv=""
-		while True:
+		try:
+			data = self.connection.recv(4096)
+			if not data:
+				return CLOSE
+			#parser menyimpan sisa data sendiri; satu recv bisa berisi
+			#beberapa request (pipelining) atau hanya sebagian request
 			try:
-				data = self.connection.recv(1024)
-				if data:
-					#merubah input dari socket (berupa bytes) ke dalam string
-					#agar bisa mendeteksi \r\n
-					d = data.decode()
-					rcv=rcv+d
-
-					if '\r\n\r\n' in rcv:
-						lines = rcv.split('\r\n')
-						request_line = lines[0]
-						method = request_line.split()[0].upper()
-
-						if method == 'POST':
-							# Ambil Content-Length header
-							content_length = 0
-							for line in lines:
-								if line.lower().startswith('content-length:'):
-									content_length = int(line.split(':')[1].strip())
-									break
-
-							header_end = rcv.find('\r\n\r\n') + 4
-							body_received = len(rcv) - header_end
-
-							if body_received < content_length:
-								continue
-
-						#end of command, proses string
-						logging.warning("data dari client: {}" . format(rcv))
-						hasil = httpserver.proses(rcv)
-						#hasil akan berupa bytes
-						#untuk bisa ditambahi dengan string, maka string harus di encode
-						hasil=hasil+"\r\n\r\n".encode()
-						logging.warning("balas ke  client: {}" . format(hasil))
-						#hasil sudah dalam bentuk bytes
-						self.connection.sendall(hasil)
-						rcv=""
-						# self.connection.close()
-				else:
+				requests = self.client.parser.feed(data)
+			except http_parser.ParseError as e:
+				logging.warning("bad request from {}: {}".format(self.address, e))
+				self.connection.sendall(httpserver.response(400, 'Bad Request', '', {}) + "\r\n\r\n".encode())
+				return CLOSE
+
+			responses = []
+			subscription = None
+			for request in requests:
+				#tidak ada log per request: lihat /metrics dan /access_log
+				hasil = httpserver.proses_request(request.method, request.target, request.headers, request.body)
+				if isinstance(hasil, game_http.Subscription):
+					subscription = hasil
 					break
-			except OSError as e:
-				pass
-		self.connection.close()
+				if isinstance(hasil, game_http.FileResponse):
+					#response sebelumnya dikirim dulu supaya urutan tetap sama
+					if responses:
+						self.connection.sendall(b"".join(responses))
+						responses = []
+					self.send_file(hasil)
+					continue
+				#hasil akan berupa bytes
+				#untuk bisa ditambahi dengan string, maka string harus di encode
+				responses.append(hasil+"\r\n\r\n".encode())
+			if responses:
+				#semua response untuk request pipelined dikirim sekaligus
+				self.connection.sendall(b"".join(responses))
+			if subscription:
+				#koneksi dipakai untuk push sampai client menutupnya, di thread sendiri
+				#supaya tidak memegang worker
+				threading.Thread(target=self.stream_and_close, args=(subscription,), daemon=True).start()
+				return DETACH
+			return KEEP
+		except socket.timeout:
+			#client berhenti membaca response
+			self.manager.count('timed_out')
+			logging.info("connection {} timed out".format(self.address))
+			return CLOSE
+		except OSError as e:
+			#koneksi rusak (reset, broken pipe): tutup, jangan diulang
+			logging.info("connection {} dropped: {}".format(self.address, e))
+			return CLOSE
+
+	def send_file(self, hasil):
+		#isi file dikirim kernel langsung dari page cache (os.sendfile jika tersedia)
+		self.connection.sendall(hasil.head)
+		with open(hasil.path, 'rb') as f:
+			self.connection.sendfile(f, hasil.offset, hasil.length)
+		self.connection.sendall("\r\n\r\n".encode())
+
+	def stream_and_close(self, subscription):
+		try:
+			self.stream(subscription)
+		finally:
+			self.manager.close_detached(self.client)
+
+	def stream(self, subscription):
+		try:
+			#socket timeout tetap berlaku untuk sendall: subscriber yang berhenti membaca diputus
+			self.connection.settimeout(self.manager.idle_timeout)
+			self.connection.sendall(subscription.headers())
+			while True:
+				chunk = subscription.wait_chunk(timeout=1.0)
+				if chunk:
+					self.connection.sendall(chunk)
+				elif self.peer_closed():
+					#tanpa update tidak ada sendall yang gagal; cek EOF supaya thread selesai
+					logging.info("subscriber {} closed the connection".format(self.address))
+					break
+		except OSError as e:
+			logging.warning("subscriber {} disconnected: {}".format(self.address, e))
 
+	def peer_closed(self):
+		readable, _, _ = select.select([self.connection], [], [], 0)
+		return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
 
 
 class Server(threading.Thread):
-	def __init__(self):
-		self.the_clients = []
+	def __init__(self, address=('0.0.0.0', 8885), backlog=128, max_workers=64, max_connections=4096,
+			idle_timeout=IDLE_TIMEOUT, read_timeout=READ_TIMEOUT):
+		self.address = address
+		self.backlog = backlog
+		self.manager = ConnectionManager(self.handle, max_workers, max_connections, idle_timeout, read_timeout)
+		httpserver.connections = self.manager
 		self.my_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 		self.my_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 		threading.Thread.__init__(self)
 
+	def handle(self, client):
+		return ProcessTheClient(client, self.manager).run()
+
+	def reject(self, connection):
+		#max_connections tercapai: jawab 503 lalu tutup, jangan biarkan client menunggu
+		self.manager.count('rejected')
+		try:
+			connection.setblocking(False)
+			connection.send(httpserver.response(503, 'Service Unavailable', '', {'Retry-After': '1'}) + "\r\n\r\n".encode())
+		except OSError:
+			pass
+		finally:
+			connection.close()
+
 	def run(self):
-		self.my_socket.bind(('0.0.0.0', 8885))
-		self.my_socket.listen(1)
+		self.my_socket.bind(self.address)
+		self.my_socket.listen(self.backlog)
+		self.manager.start()
 		while True:
-			self.connection, self.client_address = self.my_socket.accept()
-			logging.warning("connection from {}".format(self.client_address))
-
-			clt = ProcessTheClient(self.connection, self.client_address)
-			clt.start()
-			self.the_clients.append(clt)
+			try:
+				connection, client_address = self.my_socket.accept()
+			except OSError as e:
+				#misal kehabisan file descriptor: coba lagi sebentar lagi
+				logging.warning("accept failed: {}".format(e))
+				time.sleep(0.1)
+				continue
+			if not self.manager.try_acquire_slot():
+				self.reject(connection)
+				continue
+			logging.info("connection from {}".format(client_address))
+			self.manager.submit(connection, client_address)
 
 
 
 def main():
-	logging.basicConfig(level=logging.WARNING)
+	parser = argparse.ArgumentParser(description="Knightly Battle server (thread per connection)")
+	parser.add_argument('--host', default='0.0.0.0')
+	parser.add_argument('--port', type=int, default=8885)
+	parser.add_argument('--backlog', type=int, default=128)
+	parser.add_argument('--workers', type=int, default=64, help="jumlah thread worker yang memproses request")
+	parser.add_argument('--max-connections', type=int, default=4096, help="koneksi terbuka maksimum, koneksi berikutnya dijawab 503")
+	parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT, help="tutup koneksi keep-alive yang menganggur selama ini (detik)")
+	parser.add_argument('--read-timeout', type=float, default=READ_TIMEOUT, help="batas tunggu sisa request yang baru terkirim sebagian (detik)")
+	parser.add_argument('--udp-port', type=int, default=8886, help="kanal UDP untuk state pemain, 0 = nonaktif")
+	parser.add_argument('--tick-rate', type=int, default=0, help="jalankan simulasi server-authoritative dengan tick rate ini, 0 = nonaktif")
+	parser.add_argument('--view-radius', type=float, default=0, help="radius area of interest default untuk snapshot per pemain, 0 = semua pemain")
+	parser.add_argument('--assets', help="folder aset untuk GET /assets/ (default: folder assets di samping server)")
+	parser.add_argument('--access-log-sample', type=int, default=ACCESS_LOG_SAMPLE, help="simpan 1 dari N request di /access_log, 0 = nonaktif")
+	parser.add_argument('--log-level', default='WARNING')
+	args = parser.parse_args()
+
+	logging.basicConfig(level=args.log_level.upper())
+	raise_open_file_limit()
 	print("Server Starting...")
-	svr = Server()
+	httpserver.view_radius = args.view_radius
+	httpserver.metrics.access_log.sample = args.access_log_sample
+	if args.assets:
+		httpserver.assets = AssetStore(args.assets, httpserver.types)
+	if args.tick_rate:
+		httpserver.enable_simulation(args.tick_rate)
+	if args.udp_port:
+		httpserver.udp_port = args.udp_port
+		UdpServer(httpserver, (args.host, args.udp_port)).start()
+	svr = Server((args.host, args.port), args.backlog, args.workers, args.max_connections,
+		args.idle_timeout, args.read_timeout)
 	svr.start()
 	try:
 		svr.join()
@@ -0,0 +1,101 @@
+import socket
+import struct
+import asyncio
+import threading
+import time
+import logging
+import wire_protocol
+
+
+class UdpHandler:
+	"""
+	Kanal UDP untuk update state berfrekuensi tinggi.
+	Join/leave tetap lewat TCP; paket dari pemain yang belum join diabaikan.
+	Setiap paket STATE/INPUT/POLL dibalas snapshot (delta sejak versi milik client).
+	"""
+	def __init__(self, httpserver):
+		self.httpserver = httpserver
+		# (nomor room, player_id) -> (address, seq terakhir)
+		self.last_seq = {}
+
+	def handle(self, data, address):
+		started = time.perf_counter()
+		reply = self.process(data, address)
+		self.httpserver.metrics.observe('UDP', 'udp', 'ok' if reply else 'dropped',
+			time.perf_counter() - started, len(data), len(reply) if reply else 0)
+		return reply
+
+	def process(self, data, address):
+		try:
+			kind, seq, payload = wire_protocol.decode_udp(data)
+			if kind not in (wire_protocol.UDP_STATE, wire_protocol.UDP_INPUT, wire_protocol.UDP_POLL):
+				return None
+			since, room_number = wire_protocol.UDP_ROUTE.unpack_from(payload, 0)
+			offset = wire_protocol.UDP_ROUTE.size
+			if kind == wire_protocol.UDP_STATE:
+				player_id, state, _ = wire_protocol.decode_state(payload, offset)
+			elif kind == wire_protocol.UDP_INPUT:
+				player_id, input_seq, buttons, dt = wire_protocol.decode_input(payload, offset)
+			else:
+				player_id = wire_protocol.PLAYER_ID.unpack_from(payload, offset)[0]
+		except (ValueError, struct.error):
+			return None
+
+		key = (room_number, player_id)
+		room = self.httpserver.rooms_by_number.get(room_number)
+		if room is None or player_id not in room.players:
+			self.last_seq.pop(key, None)
+			return None
+
+		# Paket basi (datang terlambat / tertukar urutan) dibuang.
+		# Alamat baru berarti sesi client baru, seq dimulai ulang.
+		last = self.last_seq.get(key)
+		if last is not None and last[0] == address and seq <= last[1]:
+			return None
+		self.last_seq[key] = (address, seq)
+
+		# Mode server-authoritative: state dari client diabaikan, hanya input yang dipakai
+		simulation = room.simulation
+		# since = versi dunia terakhir yang diterima client (0 = belum pernah)
+		since = since or None
+		if kind == wire_protocol.UDP_STATE and not simulation:
+			# sekaligus view_version untuk lag compensation
+			room.update_player_state(player_id, state, since)
+		elif kind == wire_protocol.UDP_INPUT and simulation:
+			simulation.queue_input(player_id, input_seq, buttons, dt)
+		# snapshot UDP difilter ke sekitar pengirim jika server memakai --view-radius
+		return wire_protocol.encode_udp_snapshot(room.world_delta(since, player_id, self.httpserver.view_radius))
+
+
+class UdpServer(threading.Thread):
+	def __init__(self, httpserver, address=('0.0.0.0', 8886)):
+		self.handler = UdpHandler(httpserver)
+		self.address = address
+		self.my_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		threading.Thread.__init__(self, daemon=True)
+
+	def run(self):
+		self.my_socket.bind(self.address)
+		while True:
+			try:
+				data, client_address = self.my_socket.recvfrom(65535)
+				reply = self.handler.handle(data, client_address)
+				if reply:
+					self.my_socket.sendto(reply, client_address)
+			except OSError as e:
+				logging.warning("udp error: {}".format(e))
+
+
+class UdpProtocol(asyncio.DatagramProtocol):
+	"""Versi asyncio dari UdpServer untuk server_async_http."""
+	def __init__(self, httpserver):
+		self.handler = UdpHandler(httpserver)
+		self.transport = None
+
+	def connection_made(self, transport):
+		self.transport = transport
+
+	def datagram_received(self, data, address):
+		reply = self.handler.handle(data, address)
+		if reply:
+			self.transport.sendto(reply, address)
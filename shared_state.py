@@ -0,0 +1,257 @@
+"""
+State pemain di multiprocessing.shared_memory untuk server prefork.
+
+Tabel record berukuran tetap, satu slot per player_id (slot = id), sehingga
+setiap worker bisa membaca dan menulis state tanpa IPC ke proses lain.
+Semua penulisan memakai satu multiprocessing.RLock yang dibuat sebelum fork.
+
+Layout (little endian):
+
+    header: world_version (uint64) | slot tertinggi yang pernah dipakai (uint32)
+    record: status (uint8) | x (double) | y (double) | health (int32) | flags (uint8)
+            | attacker_id (uint16) | input_seq (uint32) | version (uint64)
+            | joined_version (uint64) | record_version (uint32)
+
+`version` adalah versi dunia saat record terakhir berubah (atau saat pemain
+keluar, status LEFT), jadi delta /world_state?since=N cukup dihitung dari
+tabel tanpa history per proses.
+"""
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+import wire_protocol
+from room import Room
+
+HEADER = struct.Struct('<QI')
+RECORD = struct.Struct('<BddiBHIQQI')
+
+FREE = 0
+ACTIVE = 1
+LEFT = 2
+
+# Interval worker memeriksa versi dunia yang diubah worker lain (untuk /subscribe)
+WATCH_INTERVAL = 0.005
+
+DEFAULT_STATE = (0.0, 0.0, 100, wire_protocol.FACING_RIGHT, 0, 0)
+
+
+def pack_flags(state):
+	flags = 0
+	if state.get('facing_right', True):
+		flags |= wire_protocol.FACING_RIGHT
+	if state.get('is_attacking', False):
+		flags |= wire_protocol.IS_ATTACKING
+	if state.get('is_hit', False):
+		flags |= wire_protocol.IS_HIT
+	if state.get('shield_active', False):
+		flags |= wire_protocol.SHIELD_ACTIVE
+	return flags
+
+
+def number(value):
+	# posisi disimpan sebagai double; kembalikan int jika memang bulat seperti JSON aslinya
+	return int(value) if value.is_integer() else value
+
+
+class SharedStateStore:
+	"""Padanan state_store.StateStore di shared memory (API sama)."""
+
+	def __init__(self, lock, max_player_id=1024):
+		self.lock = lock
+		self.max_player_id = max_player_id
+		size = HEADER.size + RECORD.size * (max_player_id + 1)
+		self.shm = shared_memory.SharedMemory(create=True, size=size)
+		self.buf = self.shm.buf
+		self.buf[:size] = bytes(size)
+
+	def close(self):
+		self.buf = None
+		self.shm.close()
+
+	def unlink(self):
+		self.shm.unlink()
+
+	# --- header ---
+
+	def get_world_version(self):
+		return HEADER.unpack_from(self.buf, 0)[0]
+
+	def set_world_version(self, version):
+		HEADER.pack_into(self.buf, 0, version, self.high_slot())
+
+	def high_slot(self):
+		return HEADER.unpack_from(self.buf, 0)[1]
+
+	def offset(self, player_id):
+		return HEADER.size + RECORD.size * player_id
+
+	def valid(self, player_id):
+		return isinstance(player_id, int) and 0 < player_id <= self.max_player_id
+
+	def read(self, player_id):
+		return RECORD.unpack_from(self.buf, self.offset(player_id))
+
+	def to_dict(self, record):
+		_, x, y, health, flags, attacker_id, input_seq = record[:7]
+		return {
+			'position': [number(x), number(y)],
+			'health': health,
+			'facing_right': bool(flags & wire_protocol.FACING_RIGHT),
+			'is_attacking': bool(flags & wire_protocol.IS_ATTACKING),
+			'is_hit': bool(flags & wire_protocol.IS_HIT),
+			'shield_active': bool(flags & wire_protocol.SHIELD_ACTIVE),
+			'attacker_id': attacker_id or None,
+			'input_seq': input_seq
+		}
+
+	def active_records(self):
+		for player_id in range(1, self.high_slot() + 1):
+			record = self.read(player_id)
+			if record[0] == ACTIVE:
+				yield player_id, record
+
+	# --- API StateStore ---
+
+	def __contains__(self, player_id):
+		return self.valid(player_id) and self.buf[self.offset(player_id)] == ACTIVE
+
+	def __len__(self):
+		return sum(1 for _ in self.active_records())
+
+	def ids(self):
+		with self.lock:
+			return [player_id for player_id, _ in self.active_records()]
+
+	def version_of(self, player_id):
+		if player_id not in self:
+			return None
+		return self.read(player_id)[9]
+
+	def get(self, player_id):
+		with self.lock:
+			if player_id not in self:
+				return None
+			return self.to_dict(self.read(player_id))
+
+	def snapshot(self, ids=None):
+		with self.lock:
+			if ids is None:
+				return {player_id: self.to_dict(record) for player_id, record in self.active_records()}
+			return {player_id: self.to_dict(self.read(player_id)) for player_id in ids if player_id in self}
+
+	def add(self, player_id):
+		with self.lock:
+			if not self.valid(player_id) or player_id in self:
+				return False
+			version = self.get_world_version() + 1
+			RECORD.pack_into(self.buf, self.offset(player_id), ACTIVE, *DEFAULT_STATE, version, version, 0)
+			if player_id > self.high_slot():
+				HEADER.pack_into(self.buf, 0, self.get_world_version(), player_id)
+			return True
+
+	def remove(self, player_id):
+		with self.lock:
+			if player_id not in self:
+				return False
+			record = list(self.read(player_id))
+			# tombstone: tetap disimpan supaya delta bisa melaporkan 'left'
+			record[0] = LEFT
+			record[7] = self.get_world_version() + 1
+			RECORD.pack_into(self.buf, self.offset(player_id), *record)
+			return True
+
+	def update_many(self, states):
+		changed = []
+		with self.lock:
+			version = self.get_world_version() + 1
+			for player_id, state in states.items():
+				if player_id not in self:
+					continue
+				record = self.read(player_id)
+				x, y = state.get('position', (0, 0))
+				attacker_id = state.get('attacker_id')
+				values = (float(x), float(y), int(state.get('health', 100)), pack_flags(state),
+					int(attacker_id) if attacker_id else 0, int(state.get('input_seq', 0)))
+				if values == record[1:7]:
+					continue
+				RECORD.pack_into(self.buf, self.offset(player_id), ACTIVE, *values, version, record[8], record[9] + 1)
+				changed.append(player_id)
+		return changed
+
+	def delta(self, since):
+		"""(players, joined, left) yang berubah setelah versi `since`."""
+		players = {}
+		joined = []
+		left = []
+		with self.lock:
+			for player_id in range(1, self.high_slot() + 1):
+				record = self.read(player_id)
+				if record[7] <= since:
+					continue
+				if record[0] == ACTIVE:
+					players[player_id] = self.to_dict(record)
+					if record[8] > since:
+						joined.append(player_id)
+				elif record[0] == LEFT:
+					left.append(player_id)
+		return players, joined, left
+
+
+class SharedRoom(Room):
+	"""
+	Room yang state dan versi dunianya ada di SharedStateStore.
+	Dibuat sebelum fork; setiap worker memanggil start_watcher() setelah fork
+	supaya subscriber /subscribe juga dibangunkan oleh perubahan dari worker lain.
+	"""
+	def __init__(self, name, number, store):
+		self.store = store
+		Room.__init__(self, name, number)
+		self.players = store
+		# grid dan jejak posisi hanya ada di satu proses: tanpa filter area of
+		# interest dan tanpa resolusi hit di server (client memeriksa hit sendiri)
+		self.grid = None
+		self.hits = None
+
+	@property
+	def world_version(self):
+		return self.store.get_world_version()
+
+	@world_version.setter
+	def world_version(self, version):
+		self.store.set_world_version(version)
+
+	def commit_change(self, changed=(), joined=(), left=()):
+		with self.players.lock:
+			self.world_version += 1
+		with self.version_changed:
+			self.version_changed.notify_all()
+		for listener in list(self.version_listeners):
+			listener(self.world_version)
+
+	def world_delta(self, since, viewer=None, radius=None):
+		with self.players.lock:
+			version = self.world_version
+			if since is None or since > version:
+				return {'status': 'OK', 'version': version, 'full': True,
+					'players': self.players.snapshot(), 'joined': [], 'left': [], 'hits': []}
+			players, joined, left = self.players.delta(since)
+			return {'status': 'OK', 'version': version, 'full': False,
+				'players': players, 'joined': joined, 'left': left, 'hits': []}
+
+	def start_watcher(self):
+		threading.Thread(target=self.watch, daemon=True).start()
+
+	def watch(self):
+		seen = self.world_version
+		while True:
+			time.sleep(WATCH_INTERVAL)
+			version = self.world_version
+			if version == seen:
+				continue
+			seen = version
+			with self.version_changed:
+				self.version_changed.notify_all()
+			for listener in list(self.version_listeners):
+				listener(version)
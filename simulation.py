@@ -0,0 +1,114 @@
+import time
+import threading
+from collections import deque
+import game_rules
+
+# Batas antrian input per pemain per tick (input lama dibuang)
+MAX_QUEUED_INPUTS = 32
+# Total dt input yang boleh dijalankan per pemain mengikuti waktu nyata: jatah
+# bertambah sebesar waktu sejak tick sebelumnya, paling banyak satu interval tick
+# ditambah kelonggaran ini (jitter jaringan). dt di atas jatah dipotong.
+INPUT_DT_ALLOWANCE = 0.1
+
+
+class Simulation(threading.Thread):
+	"""
+	Simulasi server-authoritative dengan tick tetap.
+	Client mengirim input command (/send_input atau UDP), setiap tick server
+	menjalankan gerak, tabrakan tembok, serangan dan shield (game_rules.PlayerSim)
+	lalu mempublikasikan satu snapshot ke room-nya (satu Simulation per room).
+	"""
+	def __init__(self, room, tick_rate=30, walls=None, metrics=None):
+		self.room = room
+		# metrics.Metrics server, untuk histogram durasi tick di /metrics
+		self.metrics = metrics
+		self.tick_rate = tick_rate
+		self.walls = walls if walls is not None else game_rules.arena_walls()
+		self.players = {}
+		self.inputs = {}
+		# player_id -> sisa jatah dt (detik) untuk input berikutnya
+		self.dt_budget = {}
+		self.last_step = None
+		self.lock = threading.Lock()
+		self.tick = 0
+		self.last_tick_duration = 0.0
+		self.running = True
+		room.simulation = self
+		threading.Thread.__init__(self, daemon=True)
+
+	def queue_input(self, player_id, seq, buttons, dt):
+		with self.lock:
+			queue = self.inputs.get(player_id)
+			if queue is None:
+				queue = deque(maxlen=MAX_QUEUED_INPUTS)
+				self.inputs[player_id] = queue
+			queue.append((seq, buttons, dt))
+
+	def sync_players(self):
+		# join/leave tetap lewat HTTP, simulasi mengikuti isi store room
+		joined_ids = set(self.room.players.ids())
+		for player_id in list(self.players):
+			if player_id not in joined_ids:
+				del self.players[player_id]
+				self.dt_budget.pop(player_id, None)
+		for player_id in joined_ids:
+			if player_id not in self.players:
+				self.players[player_id] = game_rules.PlayerSim(player_id)
+
+	def step(self, now=None):
+		"""Satu tick; `now` (detik, perf_counter) menentukan jatah dt input setiap pemain."""
+		if now is None:
+			now = time.perf_counter()
+		interval = 1.0 / self.tick_rate
+		elapsed = interval if self.last_step is None else max(0.0, now - self.last_step)
+		self.last_step = now
+		max_budget = interval + INPUT_DT_ALLOWANCE
+
+		with self.lock:
+			inputs = self.inputs
+			self.inputs = {}
+
+		self.sync_players()
+		for player_id in self.players:
+			self.dt_budget[player_id] = min(self.dt_budget.get(player_id, 0.0) + elapsed, max_budget)
+		others = list(self.players.values())
+		for player_id, queue in inputs.items():
+			player = self.players.get(player_id)
+			if player is None:
+				continue
+			budget = self.dt_budget[player_id]
+			for seq, buttons, dt in queue:
+				# input duplikat / datang terlambat
+				if seq <= player.input_seq:
+					continue
+				# burst input tidak boleh menggerakkan pemain lebih jauh dari waktu nyata;
+				# input di atas jatah tetap dijalankan (tombol serang/shield) dengan dt 0
+				dt = min(max(0.0, min(dt, game_rules.MAX_INPUT_DT)), budget)
+				budget -= dt
+				player.apply_input(buttons, dt, self.walls, others)
+				player.input_seq = seq
+			self.dt_budget[player_id] = budget
+
+		self.room.publish_states({player_id: player.to_state() for player_id, player in self.players.items()})
+		self.tick += 1
+
+	def run(self):
+		interval = 1.0 / self.tick_rate
+		next_tick = time.perf_counter()
+		while self.running:
+			started = time.perf_counter()
+			self.step(started)
+			self.last_tick_duration = time.perf_counter() - started
+			if self.metrics is not None:
+				self.metrics.observe_tick(self.last_tick_duration)
+
+			next_tick += interval
+			delay = next_tick - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+			else:
+				# tertinggal, jangan mencoba mengejar tick yang terlewat
+				next_tick = time.perf_counter()
+
+	def stop(self):
+		self.running = False
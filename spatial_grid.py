@@ -0,0 +1,75 @@
+"""
+Indeks spasial grid seragam untuk posisi pemain (area of interest).
+
+Dunia dibagi menjadi sel persegi berukuran cell_size. Setiap pemain hanya
+tercatat di satu sel; memindahkan pemain di dalam sel yang sama hanya
+mengganti posisinya. query() hanya memeriksa sel yang bersinggungan dengan
+lingkaran pandang, jadi biayanya bergantung pada kepadatan di sekitar
+viewer, bukan jumlah pemain di room.
+"""
+
+DEFAULT_CELL_SIZE = 128
+
+
+class SpatialGrid:
+	def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+		self.cell_size = cell_size
+		# (cx, cy) -> set player_id
+		self.cells = {}
+		# player_id -> (x, y, (cx, cy))
+		self.positions = {}
+
+	def __len__(self):
+		return len(self.positions)
+
+	def cell_of(self, x, y):
+		return (int(x // self.cell_size), int(y // self.cell_size))
+
+	def move(self, player_id, x, y):
+		"""Tambah pemain atau pindahkan posisinya."""
+		cell = self.cell_of(x, y)
+		old = self.positions.get(player_id)
+		if old is None or old[2] != cell:
+			if old is not None:
+				self.discard(player_id, old[2])
+			self.cells.setdefault(cell, set()).add(player_id)
+		self.positions[player_id] = (x, y, cell)
+
+	def remove(self, player_id):
+		old = self.positions.pop(player_id, None)
+		if old is not None:
+			self.discard(player_id, old[2])
+
+	def discard(self, player_id, cell):
+		members = self.cells.get(cell)
+		if members is not None:
+			members.discard(player_id)
+			if not members:
+				del self.cells[cell]
+
+	def position(self, player_id):
+		"""(x, y) pemain, atau None jika tidak ada di grid."""
+		entry = self.positions.get(player_id)
+		return entry[:2] if entry is not None else None
+
+	def query(self, x, y, radius):
+		"""Set id pemain dalam jarak `radius` dari (x, y)."""
+		min_cx, min_cy = self.cell_of(x - radius, y - radius)
+		max_cx, max_cy = self.cell_of(x + radius, y + radius)
+		radius_sq = radius * radius
+		if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.cells):
+			# radius sangat besar: lebih murah memeriksa sel yang terisi saja
+			groups = [members for (cx, cy), members in self.cells.items()
+				if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy]
+		else:
+			groups = [self.cells.get((cx, cy)) for cx in range(min_cx, max_cx + 1) for cy in range(min_cy, max_cy + 1)]
+		found = set()
+		positions = self.positions
+		for members in groups:
+			if not members:
+				continue
+			for player_id in members:
+				px, py, _ = positions[player_id]
+				if (px - x) * (px - x) + (py - y) * (py - y) <= radius_sq:
+					found.add(player_id)
+		return found
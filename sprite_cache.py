@@ -0,0 +1,164 @@
+"""
+Cache gambar (pygame.Surface) untuk satu proses client.
+
+Setiap gambar dimuat, di-convert dan diskalakan sekali, lalu Surface yang sama
+dipakai bersama oleh semua Player. Varian (flip, rotasi, tint) juga dibuat
+sekali per kombinasi dan disimpan, jadi menggambar tidak membuat Surface baru
+setiap frame. preload() dipanggil saat startup (setelah display dibuat, karena
+convert_alpha butuh display) supaya pemain baru yang muncul di tengah game
+tidak memuat apa pun dari disk.
+"""
+import os
+
+import pygame
+
+import game_rules
+
+SWORD_IMAGE = 'assets/images/sword.png'
+HEART_IMAGES = {
+    'full': 'assets/images/heart/ui_heart_full.png',
+    'half': 'assets/images/heart/ui_heart_half.png',
+    'empty': 'assets/images/heart/ui_heart_empty.png',
+}
+KNIGHT_FOLDER = 'assets/images/knight'
+KNIGHT_RUN_PREFIX = 'knight_m_run_anim'
+HEART_SIZE = (32, 32)
+SPRITE_SCALE = 2
+
+
+class SpriteCache:
+    def __init__(self):
+        # (path, scale, size, alpha) -> Surface
+        self.images = {}
+        # (folder, prefix, scale) -> list Surface
+        self.frame_lists = {}
+        # (id(base), flip_x, flip_y, angle, tint) -> (base, Surface); base disimpan supaya id tetap unik
+        self.variants = {}
+        # (size, color) -> Surface
+        self.solids = {}
+        # (name, size, bold) -> pygame.font.Font
+        self.fonts = {}
+        # (path, scale, offset_x, offset_y) -> tabel pose pedang
+        self.poses = {}
+
+    def image(self, path, scale=1, size=None, alpha=True):
+        """Gambar dari file, diskalakan dengan faktor `scale` atau ke `size` (w, h)."""
+        key = (path, scale, size, alpha)
+        surface = self.images.get(key)
+        if surface is None:
+            surface = pygame.image.load(path)
+            surface = surface.convert_alpha() if alpha else surface.convert()
+            if size is not None:
+                surface = pygame.transform.scale(surface, size)
+            elif scale != 1:
+                surface = pygame.transform.scale(surface, (surface.get_width() * scale, surface.get_height() * scale))
+            self.images[key] = surface
+        return surface
+
+    def frames(self, folder, prefix, scale=SPRITE_SCALE):
+        """Frame animasi (file `prefix*.png` di folder, urut nama); file yang gagal dimuat dilewati."""
+        key = (folder, prefix, scale)
+        frames = self.frame_lists.get(key)
+        if frames is None:
+            frames = []
+            file_names = sorted(f for f in os.listdir(folder) if f.startswith(prefix) and f.endswith('.png'))
+            for file_name in file_names:
+                img_path = os.path.join(folder, file_name)
+                try:
+                    frames.append(self.image(img_path, scale))
+                except pygame.error as e:
+                    print(f"Error loading frame {img_path}: {e}")
+            self.frame_lists[key] = frames
+        return frames
+
+    def variant(self, base, flip_x=False, flip_y=False, angle=0, tint=None):
+        """
+        Varian dari Surface `base` (dari cache ini): flip, lalu rotasi `angle`
+        derajat, lalu tint (r, g, b) dikalikan ke warna.
+        """
+        if not flip_x and not flip_y and not angle and tint is None:
+            return base
+        key = (id(base), flip_x, flip_y, angle, tint)
+        entry = self.variants.get(key)
+        if entry is None:
+            surface = base
+            if flip_x or flip_y:
+                surface = pygame.transform.flip(surface, flip_x, flip_y)
+            if angle:
+                surface = pygame.transform.rotate(surface, angle)
+            if tint is not None:
+                surface = surface.copy()
+                surface.fill(tuple(tint[:3]) + (255,), special_flags=pygame.BLEND_RGBA_MULT)
+            entry = (base, surface)
+            self.variants[key] = entry
+        return entry[1]
+
+    def solid(self, size, color):
+        """Surface berukuran `size` berisi satu warna (r, g, b, a), misal overlay hit/shield."""
+        key = (tuple(size), tuple(color))
+        surface = self.solids.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            self.solids[key] = surface
+        return surface
+
+    def sword_poses(self, path=SWORD_IMAGE, scale=SPRITE_SCALE,
+                    offset_x=game_rules.SWORD_OFFSET_X, offset_y=game_rules.SWORD_OFFSET_Y):
+        """
+        Empat pose pedang: {(facing_right, is_attacking): (Surface, dx, dy)}.
+        (dx, dy) adalah posisi kiri atas pedang relatif ke center pemain, jadi
+        rect pedang = (center_x + dx, center_y + dy, lebar, tinggi). Hasilnya
+        sama dengan flip/rotate lama di Player.get_sword_render_info.
+        """
+        key = (path, scale, offset_x, offset_y)
+        poses = self.poses.get(key)
+        if poses is None:
+            base = self.image(path, scale)
+            poses = {}
+            for facing_right in (True, False):
+                for is_attacking in (False, True):
+                    # pedang menghadap kiri dicerminkan; saat menyerang diputar 90 derajat ke depan
+                    angle = (-90 if facing_right else 90) if is_attacking else 0
+                    surface = self.variant(base, flip_x=not facing_right, angle=angle)
+                    center_x = offset_x if facing_right else -offset_x
+                    poses[(facing_right, is_attacking)] = (surface, center_x - surface.get_width() // 2,
+                                                           offset_y - surface.get_height() // 2)
+            self.poses[key] = poses
+        return poses
+
+    def font(self, name, size, bold=False):
+        """pygame.font.SysFont yang dipakai bersama (mencari font sistem cukup lambat)."""
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+    def preload(self):
+        """Muat semua gambar Player (pose pedang, varian flip frame lari) sekali di awal."""
+        self.sword_poses()
+        for path in HEART_IMAGES.values():
+            self.image(path, size=HEART_SIZE)
+        for frame in self.frames(KNIGHT_FOLDER, KNIGHT_RUN_PREFIX):
+            self.variant(frame, flip_x=True)
+        self.font("Arial", 16, bold=True)
+        return self.memory_usage()
+
+    def memory_usage(self):
+        """Jumlah Surface unik dan perkiraan byte pixel-nya."""
+        surfaces = {}
+        for surface in self.images.values():
+            surfaces[id(surface)] = surface
+        for _, surface in self.variants.values():
+            surfaces[id(surface)] = surface
+        for surface in self.solids.values():
+            surfaces[id(surface)] = surface
+        size = sum(surface.get_width() * surface.get_height() * surface.get_bytesize() for surface in surfaces.values())
+        return {'images': len(self.images), 'variants': len(self.variants), 'solids': len(self.solids),
+                'fonts': len(self.fonts), 'surfaces': len(surfaces), 'bytes': size}
+
+
+# satu cache untuk seluruh proses, dipakai bersama oleh semua Player
+sprites = SpriteCache()
@@ -0,0 +1,124 @@
+"""
+Penyimpanan state pemain yang aman dipakai banyak thread.
+
+Setiap pemain disimpan sebagai PlayerRecord (__slots__) yang di-update di
+tempat, bukan dict baru per /set_player_state. Semua perubahan lewat satu
+RLock; HttpServer memegang lock yang sama saat menaikkan versi dunia supaya
+isi store dan history selalu cocok. Pembacaan tunggal (`in`, version_of)
+tidak mengambil lock, pembacaan massal (snapshot, ids) mengambil lock sebentar
+dan mengembalikan salinan yang aman di-serialize di luar lock.
+"""
+import threading
+import wire_protocol
+
+
+class PlayerRecord:
+	__slots__ = ('x', 'y', 'health', 'facing_right', 'is_attacking', 'is_hit',
+		'shield_active', 'attacker_id', 'input_seq', 'version')
+
+	def __init__(self):
+		self.x = 0
+		self.y = 0
+		self.health = 100
+		self.facing_right = True
+		self.is_attacking = False
+		self.is_hit = False
+		self.shield_active = False
+		self.attacker_id = None
+		self.input_seq = 0
+		# naik setiap kali record ini berubah
+		self.version = 0
+
+	def update(self, state):
+		"""Salin state (format JSON /set_player_state), return True jika ada yang berubah."""
+		x, y = state.get('position', (0, 0))
+		values = (x, y,
+			state.get('health', 100),
+			state.get('facing_right', True),
+			state.get('is_attacking', False),
+			state.get('is_hit', False),
+			state.get('shield_active', False),
+			state.get('attacker_id'),
+			state.get('input_seq', 0))
+		if values == (self.x, self.y, self.health, self.facing_right, self.is_attacking,
+				self.is_hit, self.shield_active, self.attacker_id, self.input_seq):
+			return False
+		(self.x, self.y, self.health, self.facing_right, self.is_attacking,
+			self.is_hit, self.shield_active, self.attacker_id, self.input_seq) = values
+		self.version += 1
+		return True
+
+	def to_dict(self):
+		return {
+			'position': [self.x, self.y],
+			'health': self.health,
+			'facing_right': self.facing_right,
+			'is_attacking': self.is_attacking,
+			'is_hit': self.is_hit,
+			'shield_active': self.shield_active,
+			'attacker_id': self.attacker_id,
+			'input_seq': self.input_seq
+		}
+
+
+class StateStore:
+	max_player_id = wire_protocol.MAX_PLAYER_ID
+
+	def __init__(self):
+		self.lock = threading.RLock()
+		self.records = {}
+
+	def __contains__(self, player_id):
+		return player_id in self.records
+
+	def __len__(self):
+		return len(self.records)
+
+	def ids(self):
+		with self.lock:
+			return list(self.records)
+
+	def version_of(self, player_id):
+		record = self.records.get(player_id)
+		return record.version if record is not None else None
+
+	def get(self, player_id):
+		"""State satu pemain sebagai dict baru, atau None."""
+		with self.lock:
+			record = self.records.get(player_id)
+			return record.to_dict() if record is not None else None
+
+	def snapshot(self, ids=None):
+		"""{player_id: state} untuk semua pemain, atau hanya `ids` yang masih ada."""
+		with self.lock:
+			if ids is None:
+				return {player_id: record.to_dict() for player_id, record in self.records.items()}
+			records = self.records
+			return {player_id: records[player_id].to_dict() for player_id in ids if player_id in records}
+
+	def add(self, player_id):
+		"""Daftarkan pemain dengan state awal, False jika id sudah dipakai."""
+		with self.lock:
+			if player_id in self.records:
+				return False
+			self.records[player_id] = PlayerRecord()
+			return True
+
+	def remove(self, player_id):
+		with self.lock:
+			return self.records.pop(player_id, None) is not None
+
+	def update_many(self, states):
+		"""
+		Tulis beberapa state sekaligus. Pemain yang belum join (atau sudah keluar)
+		diabaikan, supaya paket terlambat tidak menghidupkan pemain lagi.
+		Return daftar id yang state-nya benar-benar berubah.
+		"""
+		changed = []
+		with self.lock:
+			records = self.records
+			for player_id, state in states.items():
+				record = records.get(player_id)
+				if record is not None and record.update(state):
+					changed.append(player_id)
+		return changed
@@ -0,0 +1,109 @@
+"""
+Penyimpanan aset statis (gambar, data level) untuk GET /assets/<path>.
+
+Setiap file diidentifikasi dengan ETag dari isi file (sha1), dihitung sekali
+per (ukuran, mtime) lewat mmap. File kecil (<= small_file_size) disimpan di
+memori selama total cache masih di bawah cache_size; file besar tidak pernah
+dibaca ke Python saat dikirim: server memakai socket.sendfile / loop.sendfile
+(os.sendfile, zero-copy) dengan offset dan panjang dari header Range.
+
+Client memakai content_etag() yang sama untuk membandingkan salinan lokal
+dengan manifest (GET /assets/).
+"""
+import hashlib
+import mmap
+import os
+import threading
+
+SMALL_FILE_SIZE = 64 * 1024
+CACHE_SIZE = 16 * 1024 * 1024
+
+
+def content_etag(path):
+	"""ETag (dengan tanda kutip) dari isi file."""
+	digest = hashlib.sha1()
+	with open(path, 'rb') as f:
+		if os.fstat(f.fileno()).st_size:
+			with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+				digest.update(data)
+	return '"{}"'.format(digest.hexdigest()[:20])
+
+
+def safe_relative_path(name):
+	"""Path relatif dengan '/', atau None jika keluar dari folder aset."""
+	parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.')]
+	if not parts or any(part == '..' or part.startswith('.') for part in parts):
+		return None
+	return '/'.join(parts)
+
+
+class Asset:
+	__slots__ = ('name', 'path', 'size', 'mtime', 'etag', 'content_type', 'data')
+
+	def __init__(self, name, path, size, mtime, etag, content_type, data):
+		self.name = name
+		self.path = path
+		self.size = size
+		self.mtime = mtime
+		self.etag = etag
+		self.content_type = content_type
+		# isi file jika kecil dan muat di cache, None = kirim dengan sendfile
+		self.data = data
+
+
+class AssetStore:
+	def __init__(self, root, types=None, small_file_size=SMALL_FILE_SIZE, cache_size=CACHE_SIZE):
+		self.root = os.path.realpath(root)
+		self.types = types if types is not None else {}
+		self.small_file_size = small_file_size
+		self.cache_size = cache_size
+		self.lock = threading.Lock()
+		self.entries = {}
+		self.cached_bytes = 0
+
+	def get(self, name):
+		"""Asset untuk path relatif `name`, atau None jika tidak ada / tidak boleh diakses."""
+		name = safe_relative_path(name)
+		if name is None:
+			return None
+		path = os.path.join(self.root, *name.split('/'))
+		# symlink yang keluar dari root juga ditolak
+		if not os.path.realpath(path).startswith(self.root + os.sep):
+			return None
+		try:
+			stat = os.stat(path)
+		except OSError:
+			return None
+		if not os.path.isfile(path):
+			return None
+
+		entry = self.entries.get(name)
+		if entry is not None and entry.size == stat.st_size and entry.mtime == stat.st_mtime_ns:
+			return entry
+
+		# file baru atau berubah: hitung ulang ETag, simpan isi file kecil
+		etag = content_etag(path)
+		data = None
+		with self.lock:
+			old = self.entries.get(name)
+			freed = len(old.data) if old is not None and old.data is not None else 0
+			if stat.st_size <= self.small_file_size and self.cached_bytes - freed + stat.st_size <= self.cache_size:
+				with open(path, 'rb') as f:
+					data = f.read()
+			self.cached_bytes += (len(data) if data is not None else 0) - freed
+			content_type = self.types.get(os.path.splitext(name)[1].lower(), 'application/octet-stream')
+			entry = Asset(name, path, stat.st_size, stat.st_mtime_ns, etag, content_type, data)
+			self.entries[name] = entry
+		return entry
+
+	def manifest(self):
+		"""[{'path', 'size', 'etag'}] untuk semua file di folder aset."""
+		files = []
+		for folder, dirnames, filenames in os.walk(self.root):
+			dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+			for filename in sorted(filenames):
+				name = os.path.relpath(os.path.join(folder, filename), self.root).replace(os.sep, '/')
+				entry = self.get(name)
+				if entry is not None:
+					files.append({'path': entry.name, 'size': entry.size, 'etag': entry.etag})
+		return files
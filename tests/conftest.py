@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modul game ada di root repo (bukan package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
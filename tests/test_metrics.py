@@ -0,0 +1,35 @@
+import re
+import threading
+
+from metrics import Metrics, SharedMetrics
+
+
+def requests_total(text, route, status='200'):
+	match = re.search(r'knight_requests_total\{{route="{}",status="{}"\}} (\d+)'.format(re.escape(route), status), text)
+	return int(match.group(1)) if match else 0
+
+
+def test_shared_metrics_sum_all_workers():
+	shared = SharedMetrics(threading.Lock(), 2)
+	try:
+		workers = [Metrics(), Metrics()]
+		for index, metrics in enumerate(workers):
+			metrics.share(shared, index)
+		# status dicatat sebagai string, seperti di HttpServer.proses_request dan server_udp
+		for _ in range(3):
+			workers[0].observe('GET', '/rooms', '200', 0.001, 0, 100)
+		workers[1].observe('GET', '/rooms', '200', 0.001, 0, 100)
+		workers[0].observe('UDP', 'udp', 'ok', 0.0001, 40, 60)
+		workers[1].observe('UDP', 'udp', 'ok', 0.0001, 40, 60)
+		workers[1].observe('UDP', 'udp', 'dropped', 0.0001, 40, 0)
+		workers[1].publish()
+
+		# worker mana pun yang melayani /metrics melihat jumlah yang sama
+		for metrics in workers:
+			text = metrics.render()
+			assert requests_total(text, '/rooms') == 4
+			assert requests_total(text, 'udp', 'ok') == 2
+			assert requests_total(text, 'udp', 'dropped') == 1
+	finally:
+		shared.close()
+		shared.unlink()
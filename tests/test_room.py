@@ -0,0 +1,34 @@
+from room import Room
+
+
+def make_room_with_hit():
+	room = Room('test', 1)
+	room.join(1)
+	room.join(2)
+	room.commit_change()
+	room.hits.log(room.world_version, 1, [2])
+	return room
+
+
+def test_full_snapshot_carries_recent_hits():
+	room = make_room_with_hit()
+	version = room.world_version
+
+	assert room.world_delta(None)['hits'] == [[version, 1, 2]]
+	# since yang lebih baru dari versi server (misal UDP basi) juga snapshot penuh
+	world = room.world_delta(version + 10)
+	assert world['full'] and world['hits'] == [[version, 1, 2]]
+	assert room.world_delta(version)['hits'] == []
+
+
+def test_aoi_fallback_carries_recent_hits():
+	room = make_room_with_hit()
+	world = room.world_delta(None, viewer=2, radius=500)
+	assert world['full'] and world['hits'] == [[room.world_version, 1, 2]]
+
+
+def test_hits_are_forgotten_when_victim_leaves():
+	room = make_room_with_hit()
+	room.leave(2)
+	room.join(2)
+	assert room.world_delta(None)['hits'] == []
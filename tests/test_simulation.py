@@ -0,0 +1,49 @@
+import game_rules
+from room import Room
+from simulation import Simulation, INPUT_DT_ALLOWANCE
+
+TICK_RATE = 30
+INTERVAL = 1.0 / TICK_RATE
+
+
+def make_simulation():
+	room = Room('test', 1)
+	room.join(1)
+	simulation = Simulation(room, tick_rate=TICK_RATE, walls=[])
+	simulation.step(0.0)
+	return simulation
+
+
+def test_burst_of_inputs_is_limited_to_real_time():
+	simulation = make_simulation()
+	start_y = simulation.players[1].y
+	# 32 input x 0.1 detik sekaligus dalam satu tick
+	for seq in range(1, 33):
+		simulation.queue_input(1, seq, game_rules.INPUT_DOWN, game_rules.MAX_INPUT_DT)
+	simulation.step(INTERVAL)
+
+	player = simulation.players[1]
+	assert player.input_seq == 32
+	assert player.y - start_y <= game_rules.PLAYER_SPEED * (INTERVAL + INPUT_DT_ALLOWANCE) + 1e-6
+
+	# jatah habis: burst berikutnya hanya mendapat waktu satu tick
+	y = player.y
+	for seq in range(33, 65):
+		simulation.queue_input(1, seq, game_rules.INPUT_DOWN, game_rules.MAX_INPUT_DT)
+	simulation.step(2 * INTERVAL)
+	assert player.y - y <= game_rules.PLAYER_SPEED * INTERVAL + 1e-6
+
+
+def test_steady_inputs_move_at_full_speed():
+	simulation = make_simulation()
+	start_y = simulation.players[1].y
+	seq = 0
+	# client 60 FPS: dua input per tick
+	for tick in range(1, TICK_RATE + 1):
+		for _ in range(2):
+			seq += 1
+			simulation.queue_input(1, seq, game_rules.INPUT_DOWN, INTERVAL / 2)
+		simulation.step(tick * INTERVAL)
+
+	moved = simulation.players[1].y - start_y
+	assert abs(moved - game_rules.PLAYER_SPEED * 1.0) < 1e-6
@@ -0,0 +1,115 @@
+"""
+Proxy UDP dengan packet loss dan delay buatan, untuk menguji kanal UDP di localhost.
+
+    python3 server_thread_http.py                     # UDP di port 8886
+    python3 udp_shim.py --listen 8887 --target 127.0.0.1:8886 --loss 0.2 --delay 80 --jitter 40
+
+Client diarahkan ke shim dengan ClientInterface(use_udp=True, udp_address=('127.0.0.1', 8887)).
+Loss dan delay berlaku untuk kedua arah.
+"""
+import argparse
+import heapq
+import random
+import selectors
+import socket
+import threading
+import time
+
+
+class LossyUdpProxy(threading.Thread):
+	def __init__(self, listen_address, target_address, loss=0.0, delay=0.0, jitter=0.0, seed=None):
+		self.listen_address = listen_address
+		self.target_address = target_address
+		self.loss = loss
+		self.delay = delay
+		self.jitter = jitter
+		self.random = random.Random(seed)
+		self.selector = selectors.DefaultSelector()
+		self.listen_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		# satu socket upstream per client supaya balasan server bisa dikembalikan
+		self.upstream = {}
+		self.pending = []
+		self.counter = 0
+		self.stats = {'forwarded': 0, 'dropped': 0}
+		self.running = True
+		threading.Thread.__init__(self, daemon=True)
+
+	def schedule(self, sock, data, address):
+		if self.random.random() < self.loss:
+			self.stats['dropped'] += 1
+			return
+		due = time.monotonic() + self.delay + self.random.uniform(0, self.jitter)
+		# counter menjaga urutan heap stabil; jitter tetap bisa menukar urutan paket
+		self.counter += 1
+		heapq.heappush(self.pending, (due, self.counter, sock, data, address))
+
+	def upstream_for(self, client_address):
+		sock = self.upstream.get(client_address)
+		if sock is None:
+			sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+			sock.bind(('127.0.0.1', 0))
+			sock.setblocking(False)
+			self.selector.register(sock, selectors.EVENT_READ, client_address)
+			self.upstream[client_address] = sock
+		return sock
+
+	def run(self):
+		self.listen_socket.bind(self.listen_address)
+		self.listen_socket.setblocking(False)
+		self.selector.register(self.listen_socket, selectors.EVENT_READ, None)
+		while self.running:
+			timeout = 0.05
+			if self.pending:
+				timeout = max(0.0, min(timeout, self.pending[0][0] - time.monotonic()))
+			for key, _ in self.selector.select(timeout):
+				try:
+					data, address = key.fileobj.recvfrom(65535)
+				except OSError:
+					continue
+				if key.data is None:
+					# client -> server
+					self.schedule(self.upstream_for(address), data, self.target_address)
+				else:
+					# server -> client
+					self.schedule(self.listen_socket, data, key.data)
+
+			now = time.monotonic()
+			while self.pending and self.pending[0][0] <= now:
+				_, _, sock, data, address = heapq.heappop(self.pending)
+				try:
+					sock.sendto(data, address)
+					self.stats['forwarded'] += 1
+				except OSError:
+					pass
+
+	def stop(self):
+		self.running = False
+
+
+def parse_address(text):
+	host, _, port = text.rpartition(':')
+	return (host or '127.0.0.1', int(port))
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--listen', type=int, default=8887)
+	parser.add_argument('--target', default='127.0.0.1:8886')
+	parser.add_argument('--loss', type=float, default=0.1, help="probabilitas paket dibuang (0-1)")
+	parser.add_argument('--delay', type=float, default=50, help="delay dasar dalam ms")
+	parser.add_argument('--jitter', type=float, default=20, help="tambahan delay acak maksimum dalam ms")
+	args = parser.parse_args()
+
+	proxy = LossyUdpProxy(('127.0.0.1', args.listen), parse_address(args.target),
+		loss=args.loss, delay=args.delay / 1000.0, jitter=args.jitter / 1000.0)
+	proxy.start()
+	print("UDP shim {} -> {} (loss={}, delay={}ms, jitter={}ms)".format(args.listen, args.target, args.loss, args.delay, args.jitter))
+	try:
+		while True:
+			time.sleep(5)
+			print("forwarded={forwarded} dropped={dropped}".format(**proxy.stats))
+	except KeyboardInterrupt:
+		proxy.stop()
+
+if __name__ == "__main__":
+	main()
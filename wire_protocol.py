@@ -0,0 +1,211 @@
+"""
+Encoding biner untuk state pemain (alternatif JSON di jalur 60 Hz).
+
+Satu record pemain berukuran tetap 15 byte (little endian):
+
+    id (uint16) | x (int16) | y (int16) | health (int16) | flags (uint8) | attacker_id (uint16) | input_seq (uint32)
+
+Posisi dikuantisasi ke int16 (piksel), boolean dipack ke dalam `flags`,
+attacker_id 0 berarti tidak ada penyerang. input_seq adalah input terakhir
+yang sudah diproses server (mode server-authoritative).
+
+Snapshot dunia = header 9 byte + record pemain + daftar id yang keluar
++ (opsional) hit event dari server:
+
+    version (uint32) | full (uint8) | jumlah pemain (uint16) | jumlah left (uint16)
+    ... | jumlah hit (uint16) | (version, attacker id, victim id) (uint32, uint16, uint16) * jumlah hit
+
+Body /set_player_state biner boleh diikuti view_version (uint32): versi dunia
+yang sedang dilihat client, dipakai server untuk lag compensation.
+
+Body /sync biner: jenis (uint8, SYNC_STATE/SYNC_INPUT) | since (uint32, 0 = belum
+punya versi) lalu satu record state atau satu/lebih record input.
+"""
+import struct
+
+CONTENT_TYPE = 'application/x-knight-state'
+
+RECORD = struct.Struct('<HhhhBHI')
+WORLD_HEADER = struct.Struct('<IBHH')
+PLAYER_ID = struct.Struct('<H')
+MAX_PLAYER_ID = 65535
+HIT = struct.Struct('<IHH')
+COUNT = struct.Struct('<H')
+VIEW_VERSION = struct.Struct('<I')
+# input command: id (uint16) | seq (uint32) | tombol (uint8, bit INPUT_* di game_rules) | dt (uint16, ms)
+INPUT = struct.Struct('<HIBH')
+SYNC = struct.Struct('<BI')
+
+SYNC_STATE = 1
+SYNC_INPUT = 2
+
+FACING_RIGHT = 0x01
+IS_ATTACKING = 0x02
+IS_HIT = 0x04
+SHIELD_ACTIVE = 0x08
+JOINED = 0x10
+
+INT16_MIN = -32768
+INT16_MAX = 32767
+
+
+def quantize(value):
+    return max(INT16_MIN, min(INT16_MAX, int(round(value))))
+
+
+def encode_state(player_id, state, joined=False):
+    x, y = state.get('position', (0, 0))
+    flags = 0
+    if state.get('facing_right', True):
+        flags |= FACING_RIGHT
+    if state.get('is_attacking', False):
+        flags |= IS_ATTACKING
+    if state.get('is_hit', False):
+        flags |= IS_HIT
+    if state.get('shield_active', False):
+        flags |= SHIELD_ACTIVE
+    if joined:
+        flags |= JOINED
+    attacker_id = state.get('attacker_id')
+    return RECORD.pack(int(player_id), quantize(x), quantize(y), quantize(state.get('health', 100)),
+                       flags, int(attacker_id) if attacker_id else 0, state.get('input_seq', 0))
+
+
+def decode_state(data, offset=0):
+    """Return (player_id, state, joined) dari satu record."""
+    player_id, x, y, health, flags, attacker_id, input_seq = RECORD.unpack_from(data, offset)
+    state = {
+        'position': [x, y],
+        'health': health,
+        'facing_right': bool(flags & FACING_RIGHT),
+        'is_attacking': bool(flags & IS_ATTACKING),
+        'is_hit': bool(flags & IS_HIT),
+        'shield_active': bool(flags & SHIELD_ACTIVE),
+        'attacker_id': attacker_id or None,
+        'input_seq': input_seq
+    }
+    return player_id, state, bool(flags & JOINED)
+
+
+def encode_input(player_id, seq, buttons, dt):
+    return INPUT.pack(int(player_id), seq, buttons, min(65535, int(round(dt * 1000))))
+
+
+def decode_input(data, offset=0):
+    """Return (player_id, seq, buttons, dt detik)."""
+    player_id, seq, buttons, dt_ms = INPUT.unpack_from(data, offset)
+    return player_id, seq, buttons, dt_ms / 1000.0
+
+
+def encode_sync_state(since, player_id, state):
+    return SYNC.pack(SYNC_STATE, since or 0) + encode_state(player_id, state)
+
+
+def encode_sync_inputs(since, player_id, inputs):
+    """inputs: list (seq, tombol, dt)."""
+    return SYNC.pack(SYNC_INPUT, since or 0) + b"".join(encode_input(player_id, seq, buttons, dt) for seq, buttons, dt in inputs)
+
+
+def decode_sync(data):
+    """Return (player_id, since atau None, state atau None, list input atau None)."""
+    kind, since = SYNC.unpack_from(data, 0)
+    if kind == SYNC_STATE:
+        player_id, state, _ = decode_state(data, SYNC.size)
+        return player_id, since or None, state, None
+    if kind == SYNC_INPUT:
+        inputs = []
+        player_id = None
+        for offset in range(SYNC.size, len(data) - INPUT.size + 1, INPUT.size):
+            player_id, seq, buttons, dt = decode_input(data, offset)
+            inputs.append((seq, buttons, dt))
+        if not inputs:
+            raise ValueError("sync without inputs")
+        return player_id, since or None, None, inputs
+    raise ValueError("unknown sync kind {}".format(kind))
+
+
+def encode_world(world):
+    """Encode hasil HttpServer.world_delta() ke bytes."""
+    players = world['players']
+    joined = set(world.get('joined', []))
+    left = world.get('left', [])
+    parts = [WORLD_HEADER.pack(world['version'], 1 if world.get('full') else 0, len(players), len(left))]
+    for player_id, state in players.items():
+        parts.append(encode_state(player_id, state, player_id in joined))
+    for player_id in left:
+        parts.append(PLAYER_ID.pack(int(player_id)))
+    hits = world.get('hits')
+    if hits:
+        parts.append(COUNT.pack(len(hits)))
+        for version, attacker_id, victim_id in hits:
+            parts.append(HIT.pack(version, int(attacker_id), int(victim_id)))
+    return b''.join(parts)
+
+
+def decode_world(data):
+    """Kebalikan encode_world, hasilnya berbentuk sama dengan response JSON /world_state."""
+    version, full, n_players, n_left = WORLD_HEADER.unpack_from(data, 0)
+    offset = WORLD_HEADER.size
+    players = {}
+    joined = []
+    for _ in range(n_players):
+        player_id, state, is_joined = decode_state(data, offset)
+        players[player_id] = state
+        if is_joined:
+            joined.append(player_id)
+        offset += RECORD.size
+    left = []
+    for _ in range(n_left):
+        left.append(PLAYER_ID.unpack_from(data, offset)[0])
+        offset += PLAYER_ID.size
+    hits = []
+    if len(data) >= offset + COUNT.size:
+        n_hits = COUNT.unpack_from(data, offset)[0]
+        offset += COUNT.size
+        for _ in range(n_hits):
+            hits.append(list(HIT.unpack_from(data, offset)))
+            offset += HIT.size
+    return {'status': 'OK', 'version': version, 'full': bool(full),
+            'players': players, 'joined': joined, 'left': left, 'hits': hits}
+
+
+# --- Datagram UDP ---
+# header: magic (2 byte) | tipe (uint8) | seq (uint32)
+# seq naik per paket dari pengirim; penerima membuang paket dengan seq <= seq terakhir.
+# Untuk snapshot, seq adalah versi dunia.
+
+UDP_MAGIC = b'KB'
+UDP_HEADER = struct.Struct('<2sBI')
+# awal payload client -> server: since (uint32) | nomor room (uint16, room_number dari /join_game)
+UDP_ROUTE = struct.Struct('<IH')
+
+UDP_STATE = 1      # payload: route + record pemain
+UDP_POLL = 2       # payload: route + player id (uint16)
+UDP_SNAPSHOT = 3   # payload: snapshot dunia (encode_world)
+UDP_INPUT = 4      # payload: route + input command
+
+
+def encode_udp_state(seq, since, player_id, state, room=0):
+    return UDP_HEADER.pack(UDP_MAGIC, UDP_STATE, seq) + UDP_ROUTE.pack(since or 0, room) + encode_state(player_id, state)
+
+
+def encode_udp_poll(seq, since, player_id, room=0):
+    return UDP_HEADER.pack(UDP_MAGIC, UDP_POLL, seq) + UDP_ROUTE.pack(since or 0, room) + PLAYER_ID.pack(int(player_id))
+
+
+def encode_udp_input(seq, since, player_id, input_seq, buttons, dt, room=0):
+    return UDP_HEADER.pack(UDP_MAGIC, UDP_INPUT, seq) + UDP_ROUTE.pack(since or 0, room) + encode_input(player_id, input_seq, buttons, dt)
+
+
+def encode_udp_snapshot(world):
+    return UDP_HEADER.pack(UDP_MAGIC, UDP_SNAPSHOT, world['version']) + encode_world(world)
+
+
+def decode_udp(data):
+    """Return (tipe, seq, payload). ValueError jika bukan paket game."""
+    if len(data) < UDP_HEADER.size:
+        raise ValueError("datagram too short")
+    magic, kind, seq = UDP_HEADER.unpack_from(data, 0)
+    if magic != UDP_MAGIC:
+        raise ValueError("bad magic")
+    return kind, seq, data[UDP_HEADER.size:]